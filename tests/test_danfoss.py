@@ -1,5 +1,6 @@
 """Tests the Danfoss quirk (all tests were written for the Popp eT093WRO)."""
 
+import asyncio
 from unittest import mock
 
 from zigpy.quirks import CustomCluster
@@ -237,3 +238,38 @@ async def test_customized_standardcluster(zigpy_device_from_quirk):
         assert result
         assert fail
         assert reports == [656]
+
+
+async def test_customized_standardcluster_concurrent(zigpy_device_from_quirk):
+    """Test the split commands are sent at the same time."""
+    device = zigpy_device_from_quirk(zhaquirks.danfoss.thermostat.DanfossThermostat)
+    cluster = device.endpoints[1].in_clusters[Thermostat.cluster_id]
+    cluster.attributes = {
+        656: ZCLAttributeDef(type=t.uint8_t, is_manufacturer_specific=True),
+        56454: ZCLAttributeDef(type=t.uint8_t, is_manufacturer_specific=False),
+    }
+
+    in_flight = []
+    both_sent = asyncio.Event()
+
+    async def mock_read_attributes(attrs, *args, **kwargs):
+        in_flight.append(attrs)
+        if len(in_flight) == 2:
+            both_sent.set()
+        await both_sent.wait()
+        return [attrs]
+
+    with mock.patch.object(
+        CustomCluster,
+        "_read_attributes",
+        mock.AsyncMock(side_effect=mock_read_attributes),
+    ):
+        result = await asyncio.wait_for(
+            cluster._read_attributes([56454, 656, 56454]), timeout=1
+        )
+
+    assert result == [[656, 56454, 56454]]
+    assert in_flight == [[656], [56454, 56454]]
+
+    # the partition of the attributes is cached
+    assert list(cluster._partitions[1]) == [(56454, 656, 56454)]
@@ -1,5 +1,6 @@
 """Tests for Ikea Starkvind quirks."""
 
+import asyncio
 from unittest import mock
 
 import pytest
@@ -9,6 +10,7 @@ from zigpy.zcl.clusters.measurement import PM25
 
 from tests.common import ClusterListener
 import zhaquirks
+from zhaquirks import FirmwareVersion, parse_sw_build_id
 import zhaquirks.ikea.starkvind
 from zhaquirks.ikea.starkvind import IkeaAirpurifier
 
@@ -250,3 +252,120 @@ async def test_double_power_config_firmware(
         # check log output if we expect a warning
         if expect_log_warning:
             assert f"sw_build_id is not a number: {firmware} for device" in caplog.text
+
+
+@mock.patch("zigpy.zcl.Cluster.bind", mock.AsyncMock())
+async def test_double_power_config_firmware_read_once(zigpy_device_from_quirk):
+    """Test battery reports share a single, retried, sw_build_id read."""
+
+    device = zigpy_device_from_quirk(zhaquirks.ikea.fivebtnremote.IkeaTradfriRemote1)
+    basic_cluster = device.endpoints[1].basic
+    power_cluster = device.endpoints[1].power
+    power_listener = ClusterListener(power_cluster)
+    battery_pct_id = PowerConfiguration.AttributeDefs.battery_percentage_remaining.id
+    sw_build_id = Basic.AttributeDefs.sw_build_id.id
+
+    firmware = FirmwareVersion.for_device(device)
+    assert FirmwareVersion.for_device(device) is firmware
+    firmware.backoff = 0.001
+    read_started = asyncio.Event()
+    read_done = asyncio.Event()
+
+    async def mock_read(attributes, manufacturer=None):
+        read_started.set()
+        if not read_done.is_set():
+            raise TimeoutError
+        return (
+            [
+                foundation.ReadAttributeRecord(
+                    sw_build_id,
+                    foundation.Status.SUCCESS,
+                    foundation.TypeValue(None, "2.3.075"),
+                )
+            ],
+        )
+
+    with mock.patch.object(
+        basic_cluster, "_read_attributes", mock.AsyncMock(side_effect=mock_read)
+    ) as request_mock:
+        power_cluster.update_attribute(battery_pct_id, 50)
+        await read_started.wait()
+        assert firmware.reading
+
+        # reports while the read is in flight don't start more reads
+        power_cluster.update_attribute(battery_pct_id, 40)
+        power_cluster.update_attribute(battery_pct_id, 30)
+        reads = [firmware.read(), firmware.read()]
+
+        read_done.set()
+        assert await asyncio.gather(*reads) == ["2.3.075", "2.3.075"]
+        await asyncio.sleep(0.01)
+
+        # one timed out attempt, then the successful retry
+        assert request_mock.await_count == 2
+        assert not firmware.reading
+        assert firmware.version == (2, 3, 75)
+
+    # the latest report is doubled once the old firmware is known
+    assert power_listener.attribute_updates == [
+        (battery_pct_id, 50),
+        (battery_pct_id, 40),
+        (battery_pct_id, 30),
+        (battery_pct_id, 60),
+    ]
+
+
+async def test_double_power_config_firmware_report_during_read(
+    zigpy_device_from_quirk,
+):
+    """Test a report arriving as the sw_build_id is read is doubled only once."""
+
+    device = zigpy_device_from_quirk(zhaquirks.ikea.fivebtnremote.IkeaTradfriRemote1)
+    basic_cluster = device.endpoints[1].basic
+    power_cluster = device.endpoints[1].power
+    power_listener = ClusterListener(power_cluster)
+    battery_pct_id = PowerConfiguration.AttributeDefs.battery_percentage_remaining.id
+    sw_build_id = Basic.AttributeDefs.sw_build_id.id
+
+    class ReportOnRead:
+        """Report the battery percentage as soon as the sw_build_id is cached."""
+
+        def attribute_updated(self, attrid, value, timestamp):
+            if attrid == sw_build_id:
+                power_cluster.update_attribute(battery_pct_id, 20)
+
+    basic_cluster.add_listener(ReportOnRead())
+
+    async def mock_read(attributes, manufacturer=None):
+        return (
+            [
+                foundation.ReadAttributeRecord(
+                    sw_build_id,
+                    foundation.Status.SUCCESS,
+                    foundation.TypeValue(None, "2.3.075"),
+                )
+            ],
+        )
+
+    with mock.patch.object(
+        basic_cluster, "_read_attributes", mock.AsyncMock(side_effect=mock_read)
+    ):
+        power_cluster.update_attribute(battery_pct_id, 50)
+        await asyncio.sleep(0.01)
+
+    # the report after the read is doubled by itself and not doubled again
+    assert power_listener.attribute_updates == [
+        (battery_pct_id, 50),
+        (battery_pct_id, 40),
+    ]
+    assert power_cluster.get(battery_pct_id) == 40
+
+
+def test_parse_sw_build_id():
+    """Test parsing of sw_build_id strings."""
+
+    assert parse_sw_build_id("2.3.075") == (2, 3, 75)
+    assert parse_sw_build_id("24.4.5") == (24, 4, 5)
+    assert parse_sw_build_id("2.x.5") == (2,)
+    assert parse_sw_build_id("invalid") == ()
+    assert parse_sw_build_id("") == ()
@@ -1,5 +1,6 @@
 """Tests for Philips quirks."""
 
+import asyncio
 from unittest import mock
 
 import pytest
@@ -634,23 +635,19 @@ def test_PhilipsRemoteCluster_long_press(
         ),
     ),
 )
-def test_ButtonPressQueue_presses_without_pause(button_presses, result_count):
+async def test_ButtonPressQueue_presses_without_pause(button_presses, result_count):
     """Test ButtonPressQueue presses without pause in between presses."""
 
     q = ButtonPressQueue()
-    q._ms_threshold = 50
     cb = mock.MagicMock()
     for btn in button_presses:
         q.press(cb, btn)
 
-    # await cluster.button_press_queue._task
-    # Instead of awaiting the job, significantly extending the time
-    # these tests need, we just abort it and call the callback
-    # ourselves.
-    assert q._task is not None
-    q._task.cancel()
-    q._ms_last_click = 0
-    q._callback(q._click_counter)
+    # Instead of waiting for the multi press window, significantly extending the
+    # time these tests need, we just fire the pending timer ourselves.
+    assert q._detector.pending
+    q._detector._handle.cancel()
+    q._detector._report_presses()
     cb.assert_called_once_with(result_count)
 
 
@@ -680,14 +677,14 @@ def test_ButtonPressQueue_presses_without_pause(button_presses, result_count):
 async def test_ButtonPressQueue_presses_with_pause(press_sequence, results):
     """Test ButtonPressQueue with pauses in between button press sequences."""
 
-    q = ButtonPressQueue()
-    q._ms_threshold = 50
+    q = ButtonPressQueue(multi_press_window=0.05)
     cb = mock.MagicMock()
 
     for seq in press_sequence:
         for btn in seq:
             q.press(cb, btn)
-        await q._task
+        await asyncio.sleep(0.06)
+        assert not q._detector.pending
 
     assert cb.call_count == len(results)
 
@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
+import asyncio
 import collections
 import importlib
 import json
+import os
 from pathlib import Path
+import sys
 from unittest import mock
 
 import pytest
@@ -21,7 +24,7 @@ from zigpy.zcl import foundation
 import zigpy.zdo.types
 
 import zhaquirks
-from zhaquirks import const
+from zhaquirks import const, quirk_loader
 import zhaquirks.bosch.motion
 import zhaquirks.centralite.cl_3310S
 from zhaquirks.const import (
@@ -123,19 +126,21 @@ def test_dev_from_signature_incomplete_sig(raw_device: zigpy.device.Device) -> N
     with pytest.raises(AssertionError):
         BadSigNoSignature.from_signature(raw_device, model="test_model")
 
+    sig_no_model = {
+        MODELS_INFO: [("manufacturer_1", "model_1")],
+        NODE_DESCRIPTOR: XIAOMI_NODE_DESC,
+        ENDPOINTS: {
+            3: {
+                PROFILE_ID: zigpy.profiles.zha.PROFILE_ID,
+                DEVICE_TYPE: zigpy.profiles.zha.DeviceType.LEVEL_CONTROL_SWITCH,
+                INPUT_CLUSTERS: [1, 6],
+                OUTPUT_CLUSTERS: [0x19],
+            }
+        },
+    }
+
     class BadSigNoModel(zhaquirks.QuickInitDevice):
-        signature = {
-            MODELS_INFO: [("manufacturer_1", "model_1")],
-            NODE_DESCRIPTOR: XIAOMI_NODE_DESC,
-            ENDPOINTS: {
-                3: {
-                    PROFILE_ID: zigpy.profiles.zha.PROFILE_ID,
-                    DEVICE_TYPE: zigpy.profiles.zha.DeviceType.LEVEL_CONTROL_SWITCH,
-                    INPUT_CLUSTERS: [1, 6],
-                    OUTPUT_CLUSTERS: [0x19],
-                }
-            },
-        }
+        signature = sig_no_model
 
     with pytest.raises(KeyError):
         BadSigNoModel.from_signature(raw_device)
@@ -143,12 +148,20 @@ def test_dev_from_signature_incomplete_sig(raw_device: zigpy.device.Device) -> N
     # require model in method, if none is present in signature
     BadSigNoModel.from_signature(raw_device, model="model_model")
 
+    # signatures are compiled once, so changed signatures need new quirks
+    def quirk_with_signature(signature):
+        return type("BadSig", (zhaquirks.QuickInitDevice,), {"signature": signature})
+
     # require manufacturer, if no signature[MODELS_INFO]
-    BadSigNoModel.signature.pop(MODELS_INFO)
+    sig_no_manufacturer = {**sig_no_model}
+    sig_no_manufacturer.pop(MODELS_INFO)
     with pytest.raises(KeyError):
-        BadSigNoModel.from_signature(raw_device, model="model_model")
-    BadSigNoModel.signature[MANUFACTURER] = "some manufacturer"
-    BadSigNoModel.from_signature(raw_device, model="model_model")
+        quirk_with_signature(sig_no_manufacturer).from_signature(
+            raw_device, model="model_model"
+        )
+    quirk_with_signature(
+        {**sig_no_manufacturer, MANUFACTURER: "some manufacturer"}
+    ).from_signature(raw_device, model="model_model")
 
     ep_sig_complete = {
         PROFILE_ID: zigpy.profiles.zha.PROFILE_ID,
@@ -156,21 +169,21 @@ def test_dev_from_signature_incomplete_sig(raw_device: zigpy.device.Device) -> N
         INPUT_CLUSTERS: [1, 6],
         OUTPUT_CLUSTERS: [0x19],
     }
+    sig_complete = {
+        MANUFACTURER: "manufacturer",
+        MODEL: "model",
+        NODE_DESCRIPTOR: XIAOMI_NODE_DESC,
+        ENDPOINTS: {3: {**ep_sig_complete}},
+    }
 
-    class BadSigIncompleteEp(zhaquirks.QuickInitDevice):
-        signature = {
-            MANUFACTURER: "manufacturer",
-            MODEL: "model",
-            NODE_DESCRIPTOR: XIAOMI_NODE_DESC,
-            ENDPOINTS: {3: {**ep_sig_complete}},
-        }
-
-    BadSigIncompleteEp.from_signature(raw_device)
+    quirk_with_signature(sig_complete).from_signature(raw_device)
 
     for missing_item in ep_sig_complete:
         incomplete_ep = {**ep_sig_complete}
         incomplete_ep.pop(missing_item)
-        BadSigIncompleteEp.signature[ENDPOINTS][3] = incomplete_ep
+        BadSigIncompleteEp = quirk_with_signature(
+            {**sig_complete, ENDPOINTS: {3: incomplete_ep}}
+        )
         with pytest.raises(KeyError):
             BadSigIncompleteEp.from_signature(raw_device)
 
@@ -284,6 +297,18 @@ def test_dev_from_signature(
         assert ep.device_type == ep_data[DEVICE_TYPE]
         assert list(ep.in_clusters) == ep_data[INPUT_CLUSTERS]
         assert list(ep.out_clusters) == ep_data[OUTPUT_CLUSTERS]
+        if 0 in ep_data[INPUT_CLUSTERS]:
+            assert ep.basic.get("manufacturer") == device.manufacturer
+            assert ep.basic.get("model") == device.model
+
+    # the signature is compiled once per quirk
+    template = QuirkDevice.quick_init_template()
+    assert QuirkDevice.quick_init_template() is template
+
+    class SubQuirkDevice(QuirkDevice):
+        signature = {**quirk_signature, MODEL: "other model"}
+
+    assert SubQuirkDevice.quick_init_template().model == "other model"
 
 
 @pytest.mark.parametrize(
@@ -577,6 +602,196 @@ class TestReplacementISWZPR1WP13(CustomDevice):
     assert type(zq.get_device(device)).__name__ == "TestReplacementISWZPR1WP13"
 
 
+LAZY_QUIRK_MODULE = """
+import zigpy.quirks
+from zigpy.quirks import CustomDevice
+from zigpy.quirks.v2 import QuirkBuilder
+
+from zhaquirks.const import ENDPOINTS, MODELS_INFO
+
+
+class LazyQuirk(CustomDevice):
+    signature = {MODELS_INFO: [("Lazy Manuf", "Lazy V1")], ENDPOINTS: {}}
+    replacement = {ENDPOINTS: {}}
+
+
+QuirkBuilder(
+    "Lazy Manuf", "Lazy V2", registry=zigpy.quirks._DEVICE_REGISTRY
+).add_to_registry()
+"""
+
+
+@pytest.fixture
+def lazy_quirks_package(tmp_path: Path, monkeypatch):
+    """Fake quirk package registering into a fresh device registry."""
+
+    package = tmp_path / "lazy_test_quirks"
+    package.mkdir()
+    (package / "__init__.py").touch()
+    (package / "lazy_quirk.py").write_text(LAZY_QUIRK_MODULE)
+    (package / "other_quirk.py").write_text(
+        LAZY_QUIRK_MODULE.replace("Lazy V", "Other V")
+    )
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(zq, "_DEVICE_REGISTRY", zq.DeviceRegistry())
+
+    yield package
+
+    for modname in list(sys.modules):
+        if modname.startswith("lazy_test_quirks"):
+            del sys.modules[modname]
+
+
+def test_lazy_quirk_loading(lazy_quirks_package: Path, tmp_path: Path) -> None:
+    """Ensure lazily set up quirks are imported only once their device is looked up."""
+
+    manifest_path = tmp_path / "quirk_manifest.json"
+
+    def setup_lazy() -> zq.DeviceRegistry:
+        for modname in ("lazy_test_quirks.lazy_quirk", "lazy_test_quirks.other_quirk"):
+            sys.modules.pop(modname, None)
+
+        registry = zq._DEVICE_REGISTRY = zq.DeviceRegistry()
+        quirk_loader.setup_lazy(
+            package_name="lazy_test_quirks",
+            package_path=lazy_quirks_package,
+            manifest_path=manifest_path,
+            registry=registry,
+        )
+        return registry
+
+    # The first start executes everything and builds the manifest
+    registry = setup_lazy()
+    assert "lazy_test_quirks.lazy_quirk" in sys.modules
+    manifest = quirk_loader.QuirkManifest.load(manifest_path)
+    assert list(manifest.modules) == [
+        "lazy_test_quirks",
+        "lazy_test_quirks.lazy_quirk",
+        "lazy_test_quirks.other_quirk",
+    ]
+    assert manifest.modules[
+        "lazy_test_quirks.lazy_quirk"
+    ].registrations == quirk_loader.ModuleRegistrations(
+        quirks={"LazyQuirk": [("Lazy Manuf", "Lazy V1")]},
+        v2=[("Lazy Manuf", "Lazy V2")],
+    )
+
+    # Later starts defer the modules until a matching device is looked up
+    registry = setup_lazy()
+    assert "lazy_test_quirks" in sys.modules
+    assert "lazy_test_quirks.lazy_quirk" not in sys.modules
+    assert not zq.get_quirk_list("Lazy Manuf", "Other Model", registry)
+    assert "lazy_test_quirks.lazy_quirk" not in sys.modules
+
+    assert ("Lazy Manuf", "Lazy V2") in registry._registry_v2
+    assert "lazy_test_quirks.lazy_quirk" in sys.modules
+    assert [
+        q.__name__ for q in zq.get_quirk_list("Lazy Manuf", "Lazy V1", registry)
+    ] == ["LazyQuirk"]
+    assert "lazy_test_quirks.other_quirk" not in sys.modules
+
+    # Touching a module without changing it keeps it deferred
+    os.utime(lazy_quirks_package / "lazy_quirk.py", ns=(0, 0))
+    setup_lazy()
+    assert "lazy_test_quirks.lazy_quirk" not in sys.modules
+
+    # Only modules that changed are executed again
+    with (lazy_quirks_package / "lazy_quirk.py").open("a") as f:
+        f.write("# changed\n")
+    setup_lazy()
+    assert "lazy_test_quirks.lazy_quirk" in sys.modules
+    assert "lazy_test_quirks.other_quirk" not in sys.modules
+
+    # Changing a shared module executes the whole tree again
+    (lazy_quirks_package / "__init__.py").write_text("# changed\n")
+    setup_lazy()
+    assert "lazy_test_quirks.lazy_quirk" in sys.modules
+    assert "lazy_test_quirks.other_quirk" in sys.modules
+
+
+@pytest.mark.parametrize(
+    "modules",
+    [
+        None,
+        [],
+        {"lazy_quirk": {}},
+        {"lazy_quirk": {"size": 1, "mtime_ns": 1, "digest": "", "registrations": 1}},
+        {
+            "lazy_quirk": {
+                "size": 1,
+                "mtime_ns": 1,
+                "digest": "",
+                "registrations": {"quirks": {"LazyQuirk": [1]}, "v2": []},
+            }
+        },
+    ],
+)
+def test_lazy_quirk_manifest_malformed(tmp_path: Path, modules) -> None:
+    """Ensure malformed manifests of the current version are started from scratch."""
+
+    manifest_path = tmp_path / "quirk_manifest.json"
+    manifest_path.write_text(
+        json.dumps({"version": quirk_loader.MANIFEST_VERSION, "modules": modules})
+    )
+    assert (
+        quirk_loader.QuirkManifest.load(manifest_path) == quirk_loader.QuirkManifest()
+    )
+
+
+def test_lazy_quirk_priority(lazy_quirks_package: Path) -> None:
+    """Ensure lazily imported quirks do not take priority over custom quirks."""
+
+    loader = quirk_loader.LazyQuirkLoader.install(zq._DEVICE_REGISTRY)
+    assert quirk_loader.LazyQuirkLoader.install(zq._DEVICE_REGISTRY) is loader
+
+    loader.rank("lazy_test_quirks.lazy_quirk")
+    loader.defer(
+        "lazy_test_quirks.lazy_quirk",
+        lazy_quirks_package / "lazy_quirk.py",
+        [("Lazy Manuf", "Lazy V1")],
+        quirk_loader.import_package_module,
+    )
+    assert loader.pending_modules == {"lazy_test_quirks.lazy_quirk"}
+
+    class CustomLazyQuirk(CustomDevice):
+        signature = {MODELS_INFO: [("Lazy Manuf", "Lazy V1")], ENDPOINTS: {}}
+        replacement = {ENDPOINTS: {}}
+
+    assert [q.__name__ for q in zq.get_quirk_list("Lazy Manuf", "Lazy V1")] == [
+        "CustomLazyQuirk",
+        "LazyQuirk",
+    ]
+    assert not loader.pending_modules
+
+
+def test_lazy_custom_quirk_loading(lazy_quirks_package: Path, tmp_path: Path) -> None:
+    """Ensure custom quirks are cached under the custom quirks path."""
+
+    custom_quirks = tmp_path / "custom_zha_quirks"
+    custom_quirks.mkdir()
+    (custom_quirks / "lazy_custom_quirk.py").write_text(LAZY_QUIRK_MODULE)
+    (custom_quirks / "broken_quirk.py").write_text("1/")
+
+    registry = zq._DEVICE_REGISTRY
+    assert quirk_loader.setup_lazy_custom(custom_quirks, registry)
+    assert zq.get_quirk_list("Lazy Manuf", "Lazy V1", registry)
+
+    # Broken modules are not cached and are retried on the next start
+    manifest = quirk_loader.QuirkManifest.load(
+        custom_quirks / quirk_loader.MANIFEST_NAME
+    )
+    assert list(manifest.modules) == ["lazy_custom_quirk"]
+
+    # Stale custom quirks are purged and their cached module is deferred again
+    registry.purge_custom_quirks(custom_quirks)
+    assert quirk_loader.setup_lazy_custom(custom_quirks, registry)
+    assert "lazy_custom_quirk" not in sys.modules
+    assert zq.get_quirk_list("Lazy Manuf", "Lazy V1", registry)
+    assert "lazy_custom_quirk" in sys.modules
+    sys.modules.pop("lazy_custom_quirk")
+
+
 def test_zigpy_custom_cluster_pollution() -> None:
     """Ensure all quirks subclass `CustomCluster`."""
     non_zigpy_clusters = {
@@ -880,3 +1095,89 @@ async def test_local_data_cluster(zigpy_device_from_v2_quirk) -> None:
         {2: None},
         {},
     )
+
+
+async def test_timer_wheel() -> None:
+    """Test timers of the shared timer wheel are re-armed and expire in batches."""
+
+    loop = asyncio.get_running_loop()
+    assert zhaquirks.TimerWheel.for_loop() is zhaquirks.TimerWheel.for_loop(loop)
+
+    wheel = zhaquirks.TimerWheel(loop, resolution=0.01)
+    calls = []
+
+    wheel.schedule("a", 0.05, lambda: calls.append("a"))
+    wheel.schedule("b", 0.05, lambda: calls.append("b"))
+    wheel.schedule("c", 0.05, lambda: calls.append("c"))
+    # re-arming replaces the previous timer
+    wheel.schedule("a", 0.2, lambda: calls.append("a2"))
+    assert wheel.cancel("c")
+    assert not wheel.cancel("c")
+
+    assert wheel.pending == 2
+    assert "a" in wheel
+    assert "c" not in wheel
+    assert (wheel.scheduled, wheel.rescheduled, wheel.cancelled) == (4, 1, 1)
+
+    await asyncio.sleep(0.1)
+    assert calls == ["b"]
+    assert wheel.pending == 1
+    assert wheel.expired == 1
+
+    # timers without delay expire right away
+    wheel.schedule("d", 0, lambda: calls.append("d"))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert calls == ["b", "d"]
+
+    await asyncio.sleep(0.2)
+    assert calls == ["b", "d", "a2"]
+    assert wheel.pending == 0
+    assert wheel.expired == 3
+
+
+async def test_multi_press_detector() -> None:
+    """Test presses are counted per sequence and long presses are reported."""
+
+    presses = mock.MagicMock()
+    long_press = mock.MagicMock()
+    detector = zhaquirks.MultiPressDetector(
+        presses,
+        on_long_press=long_press,
+        multi_press_window=0.02,
+        long_press_delay=0.05,
+    )
+
+    detector.press("a")
+    detector.press("a")
+    assert detector.pending
+    await asyncio.sleep(0.04)
+    presses.assert_called_once_with("a", 2)
+    assert not detector.pending
+
+    # pressing another button abandons the pending sequence
+    presses.reset_mock()
+    detector.press("a")
+    detector.press("b")
+    await asyncio.sleep(0.04)
+    presses.assert_called_once_with("b", 1)
+
+    # a short hold is a press
+    presses.reset_mock()
+    detector.down("a")
+    assert detector.up("a")
+    await asyncio.sleep(0.04)
+    presses.assert_called_once_with("a", 1)
+    long_press.assert_not_called()
+
+    # a long hold is a long press, not followed by a press
+    presses.reset_mock()
+    detector.down("a")
+    await asyncio.sleep(0.08)
+    long_press.assert_called_once_with("a")
+    assert not detector.up("a")
+    await asyncio.sleep(0.04)
+    presses.assert_not_called()
+
+    # releasing a button that was not held is not a press
+    assert not detector.up("a")
@@ -36,6 +36,7 @@ import zhaquirks.tuya.ts0042
 import zhaquirks.tuya.ts0043
 import zhaquirks.tuya.ts011f_plug
 import zhaquirks.tuya.ts0501_fan_switch
+import zhaquirks.tuya.ts0601_cover
 import zhaquirks.tuya.ts0601_electric_heating
 import zhaquirks.tuya.ts0601_motion
 import zhaquirks.tuya.ts0601_siren
@@ -369,6 +370,74 @@ async def test_tuya_data_conversion():
     assert Data(t.int32s(-20)) == [4, 255, 255, 255, 236]
 
 
+def test_tuya_data_bytes():
+    """Test the bytes backed legacy tuya Data payload."""
+    data, rest = Data.deserialize(b"\x04\x00\x00\x01\x27")
+    assert rest == b""
+    assert data == b"\x04\x00\x00\x01\x27"
+    assert data[1] == 0
+    assert data.serialize() == b"\x04\x00\x00\x01\x27"
+    assert int(data) == 295
+    assert repr(data) == "[4, 0, 0, 1, 39]"
+
+    # list typed values receive the little endian payload
+    assert t.data24(Data([3, 1, 2, 3])) == [3, 2, 1]
+    assert Data(t.data24([3, 2, 1])) == [3, 1, 2, 3]
+
+    assert t.int16s(Data([2, 0xFF, 0x38])) == -200
+    assert t.Bool(Data([1, 1])) == t.Bool.true
+
+    for invalid in ([0], [9] + [0] * 9, [4, 0, 1]):
+        with pytest.raises(ValueError):
+            int(Data(invalid))
+
+
+async def test_tuya_cover_position_coalescing(zigpy_device_from_quirk):
+    """Test only the latest queued cover position is sent, and stop bypasses it."""
+
+    cover_dev = zigpy_device_from_quirk(
+        zhaquirks.tuya.ts0601_cover.TuyaZemismartSmartCover0601
+    )
+    cover_cluster = cover_dev.endpoints[1].window_covering
+    tuya_cluster = cover_dev.endpoints[1].tuya_manufacturer
+    sent = asyncio.Event()
+
+    async def command(command_id, payload, **kwargs):
+        await sent.wait()
+        return payload.data[-1]
+
+    with mock.patch.object(tuya_cluster, "command", side_effect=command) as m1:
+        first = cover_cluster.command(0x0005, 10)
+        assert m1.call_count == 1
+
+        # positions set while one is in flight replace each other
+        second = cover_cluster.command(0x0005, 20)
+        third = cover_cluster.command(0x0005, 30)
+        assert m1.call_count == 1
+
+        sent.set()
+        assert await first == 90
+        assert await second == 70
+        assert await third == 70
+        assert m1.call_count == 2
+        assert m1.call_args[0][1].data == [4, 0, 0, 0, 70]
+
+        # stop is sent right away and drops the queued position
+        sent.clear()
+        moving = cover_cluster.command(0x0005, 40)
+        queued = cover_cluster.command(0x0005, 50)
+        stop = cover_cluster.command(0x0002)
+        assert m1.call_count == 4
+        assert m1.call_args[0][1].data == [1, 1]
+
+        sent.set()
+        assert (await queued).status == foundation.Status.SUCCESS
+        assert await moving == 60
+        assert await stop == 1
+        await wait_for_zigpy_tasks()
+        assert m1.call_count == 4
+
+
 class TuyaTestManufCluster(TuyaManufClusterAttributes):
     """Cluster for synthetic tests."""
 
@@ -1447,6 +1516,75 @@ async def test_moes(zigpy_device_from_quirk, quirk):
         datetime.datetime = origdatetime
 
 
+@pytest.mark.parametrize("quirk", (zhaquirks.tuya.ts0601_trv.MoesHY368_Type1,))
+async def test_moes_schedule(zigpy_device_from_quirk, quirk):
+    """Test thermostatic valve schedules only update and write changed slots."""
+
+    valve_dev = zigpy_device_from_quirk(quirk)
+    tuya_cluster = valve_dev.endpoints[1].tuya_manufacturer
+    thermostat_cluster = valve_dev.endpoints[1].thermostat
+    thermostat_listener = ClusterListener(thermostat_cluster)
+
+    def report(frame):
+        hdr, args = tuya_cluster.deserialize(frame)
+        tuya_cluster.handle_message(hdr, args)
+
+    report(ZCL_TUYA_VALVE_WORKDAY_SCHEDULE)
+    assert len(thermostat_listener.attribute_updates) == 18
+
+    # the current slot indicator in the hour is not a change
+    frame = bytearray(ZCL_TUYA_VALVE_WORKDAY_SCHEDULE)
+    frame[12] |= 0x80
+    report(bytes(frame))
+    assert len(thermostat_listener.attribute_updates) == 18
+
+    frame[17] = 0x10
+    report(bytes(frame))
+    assert thermostat_listener.attribute_updates[18:] == [(0x4132, 1600)]
+
+    # schedules of the wrong length are dropped
+    codecs, _ = thermostat_cluster.schedule_tables()
+    with pytest.raises(ValueError):
+        codecs[zhaquirks.tuya.ts0601_trv.MOES_SCHEDULE_WORKDAY_ATTR].decode(
+            b"\x00" * 17
+        )
+    thermostat_cluster.schedule_change(
+        zhaquirks.tuya.ts0601_trv.MOES_SCHEDULE_WORKDAY_ATTR, b"\x00" * 17
+    )
+    assert len(thermostat_listener.attribute_updates) == 19
+
+    async def async_success(*args, **kwargs):
+        return foundation.Status.SUCCESS
+
+    with mock.patch.object(
+        tuya_cluster.endpoint, "request", side_effect=async_success
+    ) as m1:
+        # slots of a schedule are written together, unchanged schedules are skipped
+        (status,) = await thermostat_cluster.write_attributes(
+            {
+                "workday_schedule_1_temperature": 1700,
+                "workday_schedule_1_minute": 45,
+                "weekend_schedule_1_hour": 6,
+            }
+        )
+        assert status == [
+            foundation.WriteAttributesStatusRecord(foundation.Status.SUCCESS)
+        ]
+        assert m1.call_count == 1
+        assert m1.call_args.kwargs["data"] == (
+            b"\x01\x01\x00\x00\x01\x70\x00\x00\x12\x06\x2d\x11\x08\x00\x0f"
+            b"\x0b\x1e\x10\x0c\x1e\x0f\x11\x1e\x14\x16\x00\x0f"
+        )
+
+        (status,) = await thermostat_cluster.write_attributes(
+            {"workday_schedule_2_hour": 8}
+        )
+        assert status == [
+            foundation.WriteAttributesStatusRecord(foundation.Status.SUCCESS)
+        ]
+        assert m1.call_count == 1
+
+
 @pytest.mark.parametrize("quirk", (zhaquirks.tuya.ts0601_electric_heating.MoesBHT,))
 async def test_eheating_state_report(zigpy_device_from_quirk, quirk):
     """Test thermostatic valves standard reporting from incoming commands."""
@@ -1855,7 +1993,8 @@ async def test_ts1201_ir_blaster(zigpy_device_from_quirk):
         )
         ts1201_transmit_cluster.handle_message(hdr, args)
         await wait_for_zigpy_tasks()
-        m1.assert_called_with(
+        # several chunks are requested at once
+        m1.assert_any_call(
             cluster=transmit_cluster_id,
             sequence=3,
             data=(
@@ -1865,7 +2004,22 @@ async def test_ts1201_ir_blaster(zigpy_device_from_quirk):
             ),
             command_id=2,
             timeout=5,
-            expect_reply=True,
+            expect_reply=False,
+            use_ieee=False,
+            ask_for_ack=None,
+            priority=t.PacketPriority.NORMAL,
+        )
+        m1.assert_called_with(
+            cluster=transmit_cluster_id,
+            sequence=4,
+            data=(
+                b"\x01\x04\x02\x01\x00"
+                + struct.pack("<L", part_max_length)
+                + struct.pack("<B", len(ir_code_to_learn_bytes) - part_max_length)
+            ),
+            command_id=2,
+            timeout=5,
+            expect_reply=False,
             use_ieee=False,
             ask_for_ack=None,
             priority=t.PacketPriority.NORMAL,
@@ -1891,13 +2045,14 @@ async def test_ts1201_ir_blaster(zigpy_device_from_quirk):
         )
         ts1201_transmit_cluster.handle_message(hdr, args)
         await wait_for_zigpy_tasks()
+        # the device answered with less than requested, the rest is requested again
         m1.assert_called_with(
             cluster=transmit_cluster_id,
-            sequence=4,
+            sequence=5,
             data=(
-                b"\x01\x04\x02\x01\x00"
+                b"\x01\x05\x02\x01\x00"
                 + struct.pack("<L", position)
-                + struct.pack("<B", part_max_length)
+                + struct.pack("<B", 1)
             ),
             command_id=2,
             timeout=5,
@@ -1926,8 +2081,8 @@ async def test_ts1201_ir_blaster(zigpy_device_from_quirk):
         await wait_for_zigpy_tasks()
         m1.assert_called_with(
             cluster=transmit_cluster_id,
-            sequence=5,
-            data=b"\x01\x05\x04\x00\x01\x00\x00\x00",
+            sequence=6,
+            data=b"\x01\x06\x04\x00\x01\x00\x00\x00",
             command_id=4,
             timeout=5,
             expect_reply=False,
@@ -1955,8 +2110,8 @@ async def test_ts1201_ir_blaster(zigpy_device_from_quirk):
         await wait_for_zigpy_tasks()
         m1.assert_called_with(
             cluster=control_cluster_id,
-            sequence=6,
-            data=b'\x01\x06\x00{"study":1}',
+            sequence=7,
+            data=b'\x01\x07\x00{"study":1}',
             command_id=0,
             timeout=5,
             expect_reply=True,
@@ -1987,9 +2142,9 @@ async def test_ts1201_ir_blaster(zigpy_device_from_quirk):
         # IR send must call ir transmit command id 0x00
         m1.assert_called_with(
             cluster=transmit_cluster_id,
-            sequence=7,
+            sequence=8,
             data=(
-                b"\x01\x07\x00\x01\x00"
+                b"\x01\x08\x00\x01\x00"
                 + struct.pack("<I", ir_msg_length)
                 + b"\x00\x00\x00\x00"
                 + struct.pack("<H", control_cluster_id)
@@ -2009,16 +2164,16 @@ async def test_ts1201_ir_blaster(zigpy_device_from_quirk):
         )
         ts1201_transmit_cluster.handle_message(hdr, args)
         await wait_for_zigpy_tasks()
-        m1.assert_called_with(
+        m1.assert_any_call(
             cluster=transmit_cluster_id,
-            sequence=9,
+            sequence=10,
             data=(
-                b"\x01\x09\x02\x01\x00\x00\x00\x00\x00"
+                b"\x01\x0a\x02\x01\x00\x00\x00\x00\x00"
                 + struct.pack("<B", part_max_length)
             ),
             command_id=2,
             timeout=5,
-            expect_reply=True,
+            expect_reply=False,
             use_ieee=False,
             ask_for_ack=None,
             priority=t.PacketPriority.NORMAL,
@@ -2070,8 +2225,8 @@ async def test_ts1201_ir_blaster(zigpy_device_from_quirk):
         await wait_for_zigpy_tasks()
         m1.assert_called_with(
             cluster=transmit_cluster_id,
-            sequence=11,
-            data=b"\x01\x0b\x05\x01\x00\x00\x00",
+            sequence=14,
+            data=b"\x01\x0e\x05\x01\x00\x00\x00",
             command_id=5,
             timeout=5,
             expect_reply=False,
@@ -2083,6 +2238,8 @@ async def test_ts1201_ir_blaster(zigpy_device_from_quirk):
             ts1201_transmit_listener.cluster_commands[7][2].command.name
             == "receive_ir_frame_04"
         )
+        # the sent message is dropped
+        assert not ts1201_dev.ir_msg_to_send
 
         # test raw data command
         rsp = await ts1201_control_cluster.command(
@@ -2091,8 +2248,8 @@ async def test_ts1201_ir_blaster(zigpy_device_from_quirk):
         await wait_for_zigpy_tasks()
         m1.assert_called_with(
             cluster=control_cluster_id,
-            sequence=12,
-            data=b"\x01\x0c\x00\x00\x01\x02\x03\x04",
+            sequence=15,
+            data=b"\x01\x0f\x00\x00\x01\x02\x03\x04",
             command_id=0,
             timeout=5,
             expect_reply=True,
@@ -2113,6 +2270,80 @@ async def test_ts1201_ir_blaster(zigpy_device_from_quirk):
         )
 
 
+async def test_ts1201_ir_transfer():
+    """Test windowed IR message transfer from a Zosung IR blaster."""
+    ts1201 = zhaquirks.tuya.ts1201
+    cluster = mock.MagicMock()
+    message = bytes(range(100))
+
+    transfer = ts1201.ZosungIRTransfer(
+        cluster, 1, len(message), chunk_size=30, window=2, timeout=0.01, retries=10
+    )
+    transfer.start()
+    assert cluster.request_ir_chunk.mock_calls == [
+        mock.call(1, 0, 30),
+        mock.call(1, 30, 30),
+    ]
+
+    # chunks may arrive out of order, a bad checksum requests the chunk again
+    cluster.request_ir_chunk.reset_mock()
+    part = message[30:60]
+    assert not transfer.chunk_received(30, part, ts1201.ir_checksum(part))
+    assert not transfer.chunk_received(0, message[:30], 0)
+    assert transfer.progress == 0.3
+    assert cluster.request_ir_chunk.mock_calls == [
+        mock.call(1, 60, 30),
+        mock.call(1, 0, 30),
+    ]
+
+    # unanswered chunks are requested again after the timeout
+    cluster.request_ir_chunk.reset_mock()
+    await asyncio.sleep(0.02)
+    assert cluster.request_ir_chunk.mock_calls[:2] == [
+        mock.call(1, 0, 30),
+        mock.call(1, 60, 30),
+    ]
+
+    for position in (0, 60, 90):
+        part = message[position : position + 30]
+        complete = transfer.chunk_received(position, part, ts1201.ir_checksum(part))
+    assert complete
+    assert transfer.done
+    assert transfer.data == message
+
+    # transfers without progress are given up
+    transfer = ts1201.ZosungIRTransfer(cluster, 2, 10, timeout=0.01, retries=1)
+    transfer.start()
+    await asyncio.sleep(0.1)
+    assert transfer.done
+    cluster.discard_ir_transfer.assert_called_once_with(2)
+
+
+async def test_ts1201_ir_message_store(zigpy_device_from_quirk):
+    """Test IR messages to send are stored per device and bounded."""
+    ts1201 = zhaquirks.tuya.ts1201
+    dev1 = zigpy_device_from_quirk(ts1201.ZosungIRBlaster)
+    dev2 = zigpy_device_from_quirk(ts1201.ZosungIRBlaster)
+    assert dev1.ir_msg_to_send is not dev2.ir_msg_to_send
+
+    store = ts1201.ZosungIRMessageStore(maxsize=2, timeout=0)
+    store.add(1, b"one")
+    store.add(2, b"two")
+    store.add(3, b"three")
+    assert 1 not in store
+    assert (store[2], store.get(3), len(store)) == (b"two", b"three", 2)
+
+    store.discard(2)
+    assert 2 not in store
+
+    # messages not requested in time are dropped
+    await asyncio.sleep(0.01)
+    assert not store
+
+    # repeatedly sent codes are encoded once
+    assert ts1201.ir_send_message("code") is ts1201.ir_send_message("code")
+
+
 def test_ts601_door_sensor_signature(assert_signature_matches_quirk):
     """Test TS601 Vibration Door Sensor signature against quirk."""
     signature = {
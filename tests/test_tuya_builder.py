@@ -20,7 +20,7 @@ from zhaquirks.tuya.builder import (
     TuyaTemperatureMeasurement,
     TuyaValveWaterConsumed,
 )
-from zhaquirks.tuya.mcu import TuyaMCUCluster, TuyaOnOffNM
+from zhaquirks.tuya.mcu import TuyaClusterData, TuyaMCUCluster, TuyaOnOffNM
 
 from .async_mock import sentinel
 
@@ -171,3 +171,59 @@ async def test_tuya_quirkbuilder(device_mock):
 
     assert tuya_listener.attribute_updates[0][0] == 0xEF0A
     assert tuya_listener.attribute_updates[0][1] == TestEnum.B
+
+
+async def test_tuya_quirkbuilder_duplicate_reports(device_mock):
+    """Test suppressing data points reported again with the same value."""
+
+    registry = DeviceRegistry()
+
+    (
+        TuyaQuirkBuilder(device_mock.manufacturer, device_mock.model, registry=registry)
+        .tuya_sensor(
+            dp_id=9,
+            attribute_name="test_sensor",
+            type=t.uint8_t,
+            translation_key="test_sensor",
+            fallback_name="Test sensor",
+        )
+        .tuya_suppress_duplicate_reports(refresh_interval=60)
+        .add_to_registry()
+    )
+
+    quirked = registry.get_device(device_mock)
+    tuya_cluster = quirked.endpoints[1].tuya_manufacturer
+    tuya_listener = ClusterListener(tuya_cluster)
+
+    def report(value):
+        hdr, args = tuya_cluster.deserialize(
+            b"\x09\x01\x01\x00\x01\x09\x02\x00\x04\x00\x00\x00" + bytes([value])
+        )
+        tuya_cluster.handle_message(hdr, args)
+
+    report(10)
+    report(10)
+    assert len(tuya_listener.attribute_updates) == 1
+
+    report(11)
+    assert len(tuya_listener.attribute_updates) == 2
+
+    # duplicate reports update the attribute again after the refresh interval
+    with mock.patch("time.monotonic", return_value=1e9):
+        report(11)
+    assert len(tuya_listener.attribute_updates) == 3
+
+    # a report after a write is never a duplicate
+    with mock.patch.object(tuya_cluster, "command"):
+        tuya_cluster.tuya_mcu_command(
+            TuyaClusterData(
+                endpoint_id=1,
+                cluster_name=tuya_cluster.ep_attribute,
+                cluster_attr="test_sensor",
+                attr_value=12,
+            )
+        )
+    assert len(tuya_listener.attribute_updates) == 4
+    report(11)
+    assert len(tuya_listener.attribute_updates) == 5
+    assert tuya_listener.attribute_updates[-1][1] == 11
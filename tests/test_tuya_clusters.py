@@ -4,16 +4,20 @@ from unittest import mock
 
 import pytest
 import zigpy.types as t
+from zigpy.zcl.clusters.general import OnOff
 import zigpy.zcl.foundation as zcl_f
 
+from tests.common import ClusterListener
 from zhaquirks.tuya import (
     TUYA_ACTIVE_STATUS_RPT,
     TUYA_GET_DATA,
     TUYA_SET_DATA_RESPONSE,
     TUYA_SET_TIME,
+    DPToAttributeMapping,
     TuyaCommand,
     TuyaData,
     TuyaDatapointData,
+    TuyaDPType,
     TuyaNewManufCluster,
 )
 
@@ -187,6 +191,60 @@ def test_tuya_data_bitmap_invalid():
         r.payload
 
 
+@pytest.mark.parametrize(
+    "dp_type, raw, expected",
+    [
+        (TuyaDPType.VALUE, b"\xff\xff\xff\xf8", t.int32s_be(-8)),
+        (TuyaDPType.BOOL, b"\x02", t.Bool.deserialize(b"\x02")[0]),
+        (TuyaDPType.ENUM, b"\x09", t.enum8(9)),
+        (TuyaDPType.BITMAP, b"\x40\x02", t.bitmap16(0x0240)),
+        (TuyaDPType.STRING, b"Tuya", t.CharacterString("Tuya")),
+    ],
+)
+def test_tuya_data_codec(dp_type, raw, expected):
+    """Test the Tuya payload codec table and decoded payload memoization."""
+
+    r = TuyaData()
+    r.dp_type = dp_type
+    r.raw = t.LVBytes(raw)
+
+    payload = r.payload
+    assert payload == expected
+    assert type(payload) is type(expected)
+    assert r.payload is payload
+
+    # re-encoding the decoded payload yields the same raw bytes
+    r.payload = payload
+    assert r.payload is not payload
+    if dp_type != TuyaDPType.BITMAP:
+        # bitmaps are encoded big endian but decoded little endian
+        assert r.raw == raw
+        assert r.payload == expected
+
+    for short in (TuyaDPType.VALUE, TuyaDPType.BOOL, TuyaDPType.ENUM):
+        r.dp_type = short
+        r.raw = t.LVBytes(b"")
+        with pytest.raises(ValueError):
+            r.payload
+
+
+@pytest.mark.parametrize(
+    "dp_type, value",
+    [
+        (TuyaDPType.VALUE, 2**31),
+        (TuyaDPType.ENUM, 256),
+        (TuyaDPType.BITMAP, -1),
+    ],
+)
+def test_tuya_data_encode_out_of_range(dp_type, value):
+    """Test out of range payloads are rejected."""
+
+    r = TuyaData()
+    r.dp_type = dp_type
+    with pytest.raises(ValueError):
+        r.payload = value
+
+
 def test_tuya_data_unknown():
     """Test tuya unknown datatype."""
 
@@ -291,3 +349,46 @@ def test_tuya_cluster_request_no_handler(default_rsp_mock, TuyaCluster):
 
     assert default_rsp_mock.call_count == 1
     assert default_rsp_mock.call_args[1]["status"] == zcl_f.Status.UNSUP_CLUSTER_COMMAND
+
+
+def test_tuya_cluster_misconfigured_dp_handler():
+    """Test a missing data point handler is reported when the quirk is created."""
+
+    with pytest.raises(ValueError, match="_no_such_handler"):
+
+        class MisconfiguredCluster(TuyaNewManufCluster):
+            data_point_handlers = {
+                1: "_dp_2_attr_update",
+                2: "_no_such_handler",
+            }
+
+
+def test_tuya_cluster_unmappable_dp(zigpy_device_mock):
+    """Test a data point that can't be mapped doesn't drop the rest of the report."""
+
+    class Cluster(TuyaNewManufCluster):
+        dp_to_attribute = {
+            1: DPToAttributeMapping("on_off", "on_off", endpoint_id=9),
+            2: DPToAttributeMapping("on_off", "on_off"),
+        }
+        data_point_handlers = {
+            1: "_dp_2_attr_update",
+            2: "_dp_2_attr_update",
+        }
+
+    device = zigpy_device_mock()
+    endpoint = device.add_endpoint(1)
+    on_off = endpoint.add_input_cluster(OnOff.cluster_id)
+    cluster = Cluster(endpoint)
+    on_off_listener = ClusterListener(on_off)
+
+    command = TuyaCommand(
+        status=0,
+        tsn=2,
+        datapoints=[
+            TuyaDatapointData(1, TuyaData(1, 0, b"\x01\x01")),
+            TuyaDatapointData(2, TuyaData(1, 0, b"\x01\x01")),
+        ],
+    )
+    assert cluster.handle_get_data(command) == zcl_f.Status.UNSUPPORTED_ATTRIBUTE
+    assert len(on_off_listener.attribute_updates) == 1
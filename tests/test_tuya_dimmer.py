@@ -1,5 +1,6 @@
 """Tests for Tuya quirks."""
 
+import asyncio
 from unittest import mock
 
 import pytest
@@ -116,22 +117,11 @@ async def test_command(zigpy_device_from_quirk, quirk):
         rsp = await dimmer1_cluster.command(0x0004, 25)  # move_to_level_with_on_off
         await wait_for_zigpy_tasks()
 
-        # Should switch on and then switch to level
-        m1.assert_any_call(
-            cluster=61184,
-            sequence=6,
-            data=b"\x01\x06\x00\x00\x06\x01\x01\x00\x01\x01",
-            command_id=0,
-            timeout=5,
-            expect_reply=True,
-            use_ieee=False,
-            ask_for_ack=None,
-            priority=t.PacketPriority.NORMAL,
-        )
+        # Should switch on and then switch to level, in the same set_data command
         m1.assert_called_with(
             cluster=61184,
-            sequence=7,
-            data=b"\x01\x07\x00\x00\x07\x02\x02\x00\x04\x00\x00\x00b",
+            sequence=6,
+            data=b"\x01\x06\x00\x00\x07\x01\x01\x00\x01\x01\x02\x02\x00\x04\x00\x00\x00b",
             command_id=0,
             timeout=5,
             expect_reply=True,
@@ -142,6 +132,57 @@ async def test_command(zigpy_device_from_quirk, quirk):
         assert rsp.status == foundation.Status.SUCCESS
 
 
+@pytest.mark.parametrize(
+    "quirk", (zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer,)
+)
+async def test_level_coalescing(zigpy_device_from_quirk, quirk):
+    """Test only the latest of the levels set while one is in flight is sent."""
+
+    dimmer_dev = zigpy_device_from_quirk(quirk)
+    tuya_cluster = dimmer_dev.endpoints[1].tuya_manufacturer
+    dimmer1_cluster = dimmer_dev.endpoints[1].level
+    dimmer_dev.tuya_command_pipeline.sends_responses = True
+
+    responses = []
+
+    def tuya_mcu_command(cluster_data):
+        responses.append(asyncio.get_running_loop().create_future())
+        return responses[-1]
+
+    def sent_levels():
+        return [
+            call.args[0].attr_value
+            for call in m1.call_args_list
+            if call.args[0].cluster_attr == "current_level"
+        ]
+
+    with mock.patch.object(
+        tuya_cluster, "tuya_mcu_command", side_effect=tuya_mcu_command
+    ) as m1:
+        for level in (50, 100, 150, 200):
+            rsp = await dimmer1_cluster.command(0x0000, level)
+            assert rsp.status == foundation.Status.SUCCESS
+        assert sent_levels() == [50]
+
+        # the last level is sent once the device answered the first one
+        responses[0].set_result(None)
+        await asyncio.sleep(0.01)
+        assert sent_levels() == [50, 200]
+
+        # switching off drops the queued level
+        await dimmer1_cluster.command(0x0000, 25)
+        await dimmer1_cluster.command(0x0004, 0)
+        assert m1.call_args.args[0].cluster_attr == "on_off"
+        assert m1.call_args.args[0].attr_value is False
+
+        for response in responses:
+            if not response.done():
+                response.set_result(None)
+        await asyncio.sleep(0.01)
+        assert sent_levels() == [50, 200]
+        assert m1.call_count == 3
+
+
 @pytest.mark.parametrize(
     "quirk", (zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer,)
 )
@@ -1,5 +1,6 @@
 """Tests for Tuya quirks."""
 
+import asyncio
 import datetime
 from unittest import mock
 
@@ -8,7 +9,13 @@ from zigpy.zcl import foundation
 
 from tests.common import ClusterListener, MockDatetime
 import zhaquirks
-from zhaquirks.tuya import TUYA_MCU_VERSION_RSP, TUYA_SET_TIME, TuyaDPType
+from zhaquirks.tuya import (
+    TUYA_MCU_VERSION_RSP,
+    TUYA_SET_TIME,
+    DPToAttributeMapping,
+    TuyaCommand,
+    TuyaDPType,
+)
 from zhaquirks.tuya.mcu import (
     ATTR_MCU_VERSION,
     TUYA_MCU_CONNECTION_STATUS,
@@ -343,6 +350,285 @@ async def test_tuya_methods(zigpy_device_from_quirk, quirk):
         assert m1.call_count == 11
 
 
+@pytest.mark.parametrize(
+    "quirk",
+    (
+        zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer,
+        zhaquirks.tuya.ts0601_switch.TuyaQuadrupleSwitchTO,
+    ),
+)
+def test_tuya_get_dp_mapping(zigpy_device_from_quirk, quirk):
+    """Test the data point mapping index matches all dp_to_attribute entries."""
+
+    tuya_device = zigpy_device_from_quirk(quirk)
+    tuya_cluster = tuya_device.endpoints[1].tuya_manufacturer
+
+    for endpoint_id in (*tuya_device.endpoints, 7):
+        for dp_mapping in tuya_cluster.dp_to_attribute.values():
+            attribute_names = dp_mapping.attribute_name
+            if not isinstance(attribute_names, tuple):
+                attribute_names = (attribute_names,)
+
+            for attribute_name in attribute_names:
+                expected = {
+                    dp: mapping
+                    for dp, mapping in tuya_cluster.dp_to_attribute.items()
+                    if attribute_name
+                    in (
+                        mapping.attribute_name
+                        if isinstance(mapping.attribute_name, tuple)
+                        else (mapping.attribute_name,)
+                    )
+                    and (mapping.endpoint_id or 1) == endpoint_id
+                }
+                assert (
+                    tuya_cluster.get_dp_mapping(endpoint_id, attribute_name) == expected
+                )
+
+
+@pytest.mark.parametrize(
+    "quirk", (zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer,)
+)
+def test_tuya_get_dp_mapping_late(zigpy_device_from_quirk, quirk):
+    """Test data point mappings set after the class is created are found."""
+
+    tuya_device = zigpy_device_from_quirk(quirk)
+    tuya_cluster = tuya_device.endpoints[1].tuya_manufacturer
+    on_off = DPToAttributeMapping("on_off", "on_off")
+    level = DPToAttributeMapping("level", "current_level")
+    assert tuya_cluster.get_dp_mapping(1, "on_off") == {
+        1: tuya_cluster.dp_to_attribute[1]
+    }
+
+    with mock.patch.object(type(tuya_cluster), "dp_to_attribute", {21: on_off}):
+        # replaced
+        assert tuya_cluster.get_dp_mapping(1, "on_off") == {21: on_off}
+        assert tuya_cluster.get_dp_mapping(1, "current_level") == {}
+
+        # added to
+        tuya_cluster.dp_to_attribute[22] = level
+        assert tuya_cluster.get_dp_mapping(1, "current_level") == {22: level}
+
+        # changed in place
+        tuya_cluster.dp_to_attribute[23] = tuya_cluster.dp_to_attribute.pop(22)
+        assert tuya_cluster.get_dp_mapping(1, "current_level") == {23: level}
+
+    assert tuya_cluster.get_dp_mapping(1, "on_off") == {
+        1: tuya_cluster.dp_to_attribute[1]
+    }
+
+
+@pytest.mark.parametrize(
+    "quirk", (zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer,)
+)
+async def test_tuya_set_data_batching(zigpy_device_from_quirk, quirk):
+    """Test data point writes are sent in a single set_data command."""
+
+    tuya_device = zigpy_device_from_quirk(quirk)
+    tuya_cluster = tuya_device.endpoints[1].tuya_manufacturer
+
+    tcd_level_1 = TuyaClusterData(
+        endpoint_id=1, cluster_name="level", cluster_attr="minimum_level", attr_value=5
+    )
+    tcd_level_2 = TuyaClusterData(
+        endpoint_id=2, cluster_name="level", cluster_attr="minimum_level", attr_value=7
+    )
+    tcd_level_2_again = TuyaClusterData(
+        endpoint_id=2, cluster_name="level", cluster_attr="minimum_level", attr_value=9
+    )
+
+    with mock.patch.object(tuya_cluster, "command") as m1:
+        tuya_cluster.tuya_mcu_command(tcd_level_1)
+        tuya_cluster.tuya_mcu_command(tcd_level_2)
+        assert m1.call_count == 0
+        await asyncio.sleep(0.01)
+
+        assert m1.call_count == 1
+        assert [dpd.dp for dpd in m1.call_args[0][1].datapoints] == [3, 9]
+
+    with (
+        mock.patch.object(tuya_cluster, "command") as m1,
+        mock.patch.object(tuya_cluster, "set_data_batch_window", 0.01),
+    ):
+        tuya_cluster.tuya_mcu_command(tcd_level_1)
+        tuya_cluster.tuya_mcu_command(tcd_level_2)
+        tuya_cluster.tuya_mcu_command(tcd_level_2_again)
+        await asyncio.sleep(0)
+        assert m1.call_count == 0
+
+        await asyncio.sleep(0.02)
+        assert m1.call_count == 1
+        datapoints = m1.call_args[0][1].datapoints
+        assert [dpd.dp for dpd in datapoints] == [3, 9]
+        # the latest write of a data point wins
+        assert (
+            datapoints[1]
+            == tuya_cluster.from_cluster_data(tcd_level_2_again)[0].datapoints[0]
+        )
+
+    assert tuya_device.endpoints[2].level.get("minimum_level") == 9
+
+
+@pytest.mark.parametrize(
+    "quirk", (zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer,)
+)
+async def test_tuya_write_attributes_single_command_listener(
+    zigpy_device_from_quirk, quirk
+):
+    """Test written records are sent to every listener and batched by the cluster."""
+
+    tuya_device = zigpy_device_from_quirk(quirk)
+    tuya_cluster = tuya_device.endpoints[1].tuya_manufacturer
+    level_cluster = tuya_device.endpoints[2].level
+
+    class SingleCommandListener:
+        """Listener only handling single data points."""
+
+        def __init__(self):
+            self.cluster_data = []
+
+        def tuya_mcu_command(self, cluster_data):
+            self.cluster_data.append(cluster_data)
+
+    listener = SingleCommandListener()
+    tuya_device.command_bus.add_listener(listener)
+
+    with mock.patch.object(tuya_cluster, "command") as m1:
+        await level_cluster.write_attributes({"minimum_level": 7, "bulb_type": 1})
+        await asyncio.sleep(0.01)
+
+        # the records of a single write are sent in one set_data command
+        assert m1.call_count == 1
+        assert [dpd.dp for dpd in m1.call_args[0][1].datapoints] == [9, 10]
+
+    assert [(d.cluster_attr, d.attr_value) for d in listener.cluster_data] == [
+        ("minimum_level", 7),
+        ("bulb_type", 1),
+    ]
+
+
+@pytest.mark.parametrize(
+    "quirk", (zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer,)
+)
+async def test_tuya_command_pipeline(zigpy_device_from_quirk, quirk):
+    """Test set_data commands are matched with their responses and throttled."""
+
+    tuya_device = zigpy_device_from_quirk(quirk)
+    tuya_cluster = tuya_device.endpoints[1].tuya_manufacturer
+    pipeline = tuya_device.tuya_command_pipeline
+
+    def level_data(endpoint_id, value):
+        return TuyaClusterData(
+            endpoint_id=endpoint_id,
+            cluster_name="level",
+            cluster_attr="minimum_level",
+            attr_value=value,
+        )
+
+    def response(tsn):
+        return TuyaCommand(status=0, tsn=tsn, datapoints=[])
+
+    async def send(data):
+        future = tuya_cluster.tuya_mcu_command(data)
+        # let the batch be flushed, so the next data point gets its own command
+        await asyncio.sleep(0)
+        return future
+
+    with mock.patch.object(tuya_cluster, "command") as m1:
+        future = await send(level_data(1, 5))
+        await asyncio.sleep(0)
+        assert m1.call_count == 1
+        assert pipeline.in_flight == 1
+
+        tsn = m1.call_args[0][1].tsn
+        assert not pipeline.handle_response(response(tsn + 1))
+        assert not future.done()
+
+        tuya_cluster.handle_set_data_response(response(tsn))
+        assert (await future).tsn == tsn
+        assert pipeline.in_flight == 0
+
+        # the device answers set_data, so only 3 commands are sent at once
+        futures = [
+            await send(level_data(endpoint_id, 5)) for endpoint_id in (1, 2, 1, 2)
+        ]
+        await asyncio.sleep(0)
+        assert m1.call_count == 4
+        assert pipeline.in_flight == 3
+
+        tuya_cluster.handle_set_data_response(response(m1.call_args[0][1].tsn))
+        await asyncio.sleep(0)
+        assert futures[2].done()
+        assert m1.call_count == 5
+
+        for call in m1.call_args_list[1:]:
+            tuya_cluster.handle_set_data_response(response(call[0][1].tsn))
+        assert all(future.done() for future in futures)
+        assert pipeline.in_flight == 0
+
+        # give up waiting for a response
+        with mock.patch.object(pipeline, "response_timeout", 0.01):
+            future = tuya_cluster.tuya_mcu_command(level_data(1, 7))
+            await asyncio.sleep(0.05)
+        assert m1.call_count == 6
+        assert future.done()
+        assert future.result() is None
+        assert pipeline.in_flight == 0
+
+
+@pytest.mark.parametrize(
+    "quirk", (zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer,)
+)
+async def test_tuya_command_pipeline_early_response(zigpy_device_from_quirk, quirk):
+    """Test a set_data_response arriving before the command returns is not lost."""
+
+    tuya_device = zigpy_device_from_quirk(quirk)
+    tuya_cluster = tuya_device.endpoints[1].tuya_manufacturer
+    pipeline = tuya_device.tuya_command_pipeline
+    pipeline.sends_responses = True
+
+    async def command(command_id, payload, **kwargs):
+        tuya_cluster.handle_set_data_response(
+            TuyaCommand(status=0, tsn=payload.tsn, datapoints=[])
+        )
+
+    with mock.patch.object(tuya_cluster, "command", side_effect=command) as m1:
+        future = tuya_cluster.tuya_mcu_command(
+            TuyaClusterData(
+                endpoint_id=1,
+                cluster_name="level",
+                cluster_attr="minimum_level",
+                attr_value=5,
+            )
+        )
+        response = await asyncio.wait_for(future, 1)
+        assert response.tsn == m1.call_args[0][1].tsn
+        assert pipeline.in_flight == 0
+
+    # a failed send gives its slot back
+    with mock.patch.object(
+        tuya_cluster, "command", side_effect=asyncio.TimeoutError
+    ) as m1:
+        futures = []
+        for endpoint_id in (1, 2, 1, 2):
+            futures.append(
+                tuya_cluster.tuya_mcu_command(
+                    TuyaClusterData(
+                        endpoint_id=endpoint_id,
+                        cluster_name="level",
+                        cluster_attr="minimum_level",
+                        attr_value=6,
+                    )
+                )
+            )
+            # flush each data point in its own set_data command
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+        assert m1.call_count == 4
+        assert all(isinstance(fut.exception(), asyncio.TimeoutError) for fut in futures)
+        assert pipeline.in_flight == 0
+
+
 async def test_tuya_mcu_classes():
     """Test tuya conversion from Data to ztype and reverse."""
 
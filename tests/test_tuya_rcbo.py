@@ -237,13 +237,13 @@ async def test_report_values_rcbo(zigpy_device_from_quirk, frame, cluster, attri
         ([], b"\x01\x01\x00\x00\x01t\x01\x00\x01\x00", "on_off", {"trip": 0}),
         (
             [],
-            b"\x01\x03\x00\x00\x03p\x00\x00\x03Z\x00\x00",
+            b"\x01\x01\x00\x00\x03p\x00\x00\x03Z\x00\x00",
             "device_temperature",
             {"high_temp_thres": 90, "over_temp_trip": 0, "dev_temp_alarm_mask": 0},
         ),
         (
             [],
-            b"\x01\x07\x00\x00\x07m\x00\x00\x08\x01\x00\x00\x01,\x00\x00\x00",
+            b"\x01\x01\x00\x00\x07m\x00\x00\x08\x01\x00\x00\x01,\x00\x00\x00",
             "electrical_measurement",
             {
                 "self_test_auto_days": 1,
@@ -257,7 +257,7 @@ async def test_report_values_rcbo(zigpy_device_from_quirk, frame, cluster, attri
         ),
         (
             [],
-            b'\x01\x04\x00\x00\x06n\x00\x00\x08\x0b"\x00\x00\x01\xf4\x00\x00',
+            b'\x01\x01\x00\x00\x06n\x00\x00\x08\x0b"\x00\x00\x01\xf4\x00\x00',
             "electrical_measurement",
             {
                 "rms_extreme_over_voltage": 2850,
@@ -272,7 +272,8 @@ async def test_report_values_rcbo(zigpy_device_from_quirk, frame, cluster, attri
                 b'\x09\x0e\x01\x02\x03n\x00\x00\x08\x0b"\x00\x00\x01\xf4\x00\x00',
                 b"\x09\x0f\x01\x02\x03o\x00\x00\x05\x01\x86\xa0\x00\x00",
             ],
-            b"\x01\x04\x00\x00\x04o\x00\x00\x05\x01_\x90\x01\x01",
+            b'\x01\x01\x00\x00\x04n\x00\x00\x08\x0b"\x00\x00\x01\xf4\x00\x00'
+            b"o\x00\x00\x05\x01_\x90\x01\x01",
             "electrical_measurement",
             {
                 "ac_current_overload": 90000,
@@ -293,7 +294,7 @@ async def test_report_values_rcbo(zigpy_device_from_quirk, frame, cluster, attri
         ),
         (
             [],
-            b"\x01\x02\x00\x00\x02l\x00\x00\x03\x14\xb4\x01",
+            b"\x01\x01\x00\x00\x02l\x00\x00\x03\x14\xb4\x01",
             "smartenergy_metering",
             {"cost_parameters": 5300, "cost_parameters_enabled": 1},
         ),
@@ -317,7 +318,8 @@ async def test_write_attr_rcbo(
     ) as m1:
         (status,) = await target_cluster.write_attributes(attributes)
         await wait_for_zigpy_tasks()
-        m1.assert_called_with(
+        # all attributes of a write are sent in a single set_data command
+        m1.assert_called_once_with(
             cluster=61184,
             sequence=frame[1],
             data=frame,
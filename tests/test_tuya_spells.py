@@ -1,5 +1,6 @@
 """Tests for Tuya spells."""
 
+import asyncio
 from unittest import mock
 
 import pytest
@@ -20,6 +21,7 @@ from zhaquirks.tuya import (
     TUYA_QUERY_DATA,
     EnchantedDevice,
     TuyaNewManufCluster,
+    TuyaSpellScheduler,
     TuyaZBOnOffAttributeCluster,
 )
 import zhaquirks.tuya.ts0601_valve
@@ -157,3 +159,80 @@ def test_tuya_spell_devices_valid():
             pytest.fail(
                 f"{quirk} set Tuya data query spell but has no cluster subclassing `TuyaNewManufCluster` on endpoint 1"
             )
+
+
+async def test_tuya_spell_cast_once(zigpy_device_from_quirk):
+    """Test that spells are skipped when a device is configured again."""
+    device = zigpy_device_from_quirk(TuyaTestSpellDevice)
+    scheduler = TuyaSpellScheduler.for_application(device.application)
+    assert TuyaSpellScheduler.for_application(device.application) is scheduler
+
+    request_patch = mock.patch("zigpy.zcl.Cluster.request", mock.AsyncMock())
+    with request_patch as request_mock:
+        request_mock.return_value = (foundation.Status.SUCCESS, "done")
+
+        await device.apply_custom_configuration()
+        assert request_mock.call_count == 2
+        assert scheduler.is_enchanted(device)
+
+        await device.apply_custom_configuration()
+        assert request_mock.call_count == 2
+
+        scheduler.forget(device)
+        await device.apply_custom_configuration()
+        assert request_mock.call_count == 4
+
+        # a re-paired device is a new device instance, its spells are cast again
+        repaired_device = zigpy_device_from_quirk(TuyaTestSpellDevice)
+        assert repaired_device.ieee == device.ieee
+        await repaired_device.apply_custom_configuration()
+        assert request_mock.call_count == 6
+
+
+async def test_tuya_spell_scheduler():
+    """Test that the spell scheduler limits concurrency and retries failed spells."""
+    scheduler = TuyaSpellScheduler(max_concurrent=2, jitter=0.001, backoff=0.001)
+    in_progress = 0
+    max_in_progress = 0
+
+    async def cast_spell():
+        nonlocal in_progress, max_in_progress
+        in_progress += 1
+        max_in_progress = max(max_in_progress, in_progress)
+        await asyncio.sleep(0.01)
+        in_progress -= 1
+
+    devices = []
+    for i in range(5):
+        device = mock.MagicMock(ieee=i)
+        device.spells.return_value = [mock.AsyncMock(side_effect=cast_spell)]
+        devices.append(device)
+
+    assert all(await asyncio.gather(*(scheduler.cast(device) for device in devices)))
+    assert max_in_progress == 2
+
+    # failed spells are retried, without casting the succeeded ones again
+    succeeding_spell = mock.AsyncMock()
+    failing_spell = mock.AsyncMock(side_effect=[TimeoutError, None])
+    device = mock.MagicMock(ieee=10)
+    device.spells.return_value = [succeeding_spell, failing_spell]
+    assert await scheduler.cast(device)
+    assert succeeding_spell.await_count == 1
+    assert failing_spell.await_count == 2
+    assert scheduler.is_enchanted(device)
+
+    succeeding_spell = mock.AsyncMock()
+    failing_spell = mock.AsyncMock(side_effect=TimeoutError)
+    device = mock.MagicMock(ieee=11)
+    device.spells.return_value = [succeeding_spell, failing_spell]
+    with pytest.raises(TimeoutError):
+        await scheduler.cast(device)
+    assert succeeding_spell.await_count == 1
+    assert failing_spell.await_count == scheduler.retries + 1
+    assert not scheduler.is_enchanted(device)
+
+    # only the failed spell is cast on the next configuration
+    failing_spell.side_effect = None
+    assert await scheduler.cast(device)
+    assert succeeding_spell.await_count == 1
+    assert failing_spell.await_count == scheduler.retries + 2
@@ -1,5 +1,6 @@
 """Test XBee device."""
 
+import asyncio
 from unittest import mock
 
 import pytest
@@ -190,6 +191,110 @@ async def test_receive_serial_data(zigpy_device_from_quirk):
     )
 
 
+async def test_serial_stream(zigpy_device_from_quirk):
+    """Test streaming serial data to and from XBee device."""
+
+    xbee3_device = zigpy_device_from_quirk(XBee3Sensor)
+    xbee3_device.application.request.reset_mock()
+
+    listener = mock.MagicMock()
+    xbee3_device.endpoints[XBEE_DATA_ENDPOINT].out_clusters[
+        LevelControl.cluster_id
+    ].add_listener(listener)
+
+    stream = xbee3_device.open_serial_stream(max_payload=4, max_queued=0)
+    assert xbee3_device.open_serial_stream() is stream
+
+    # writes are split into frames
+    stream.write(b"0123456789")
+    await stream.drain()
+    frames = [c.args[6] for c in xbee3_device.application.request.await_args_list]
+    assert frames == [b"0123", b"4567", b"89"]
+    assert (stream.bytes_sent, stream.frames_sent) == (10, 3)
+
+    # received frames are buffered instead of relayed as events
+    for data in (b"Test ", b"UART ", b"data\n"):
+        xbee3_device.handle_message(
+            XBEE_PROFILE_ID,
+            XBEE_DATA_CLUSTER,
+            XBEE_DATA_ENDPOINT,
+            XBEE_DATA_ENDPOINT,
+            data,
+        )
+    assert await stream.reader.readline() == b"Test UART data\n"
+    assert (stream.bytes_received, stream.frames_received) == (15, 3)
+    listener.zha_send_event.assert_not_called()
+
+    # failed frames are raised on drain
+    xbee3_device.application.request.configure_mock(
+        return_value=(foundation.Status.FAILURE, None)
+    )
+    stream.write(b"x")
+    with pytest.raises(RuntimeError):
+        await stream.drain()
+
+    # and break the stream
+    with pytest.raises(ConnectionError):
+        stream.write(b"x")
+
+    stream.close()
+    assert stream.is_closing
+    assert xbee3_device.serial_stream is None
+    assert await stream.reader.read() == b""
+    with pytest.raises(ConnectionError):
+        stream.write(b"x")
+
+
+async def test_serial_stream_backpressure(zigpy_device_from_quirk):
+    """Test serial stream writes are queued and dropped after a failed frame."""
+
+    xbee3_device = zigpy_device_from_quirk(XBee3Sensor)
+    request = xbee3_device.application.request
+    request.reset_mock()
+
+    in_flight = 0
+    max_in_flight = 0
+    sent = []
+    fail = False
+
+    async def send(device, profile, cluster, src_ep, dst_ep, sequence, data, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        if fail:
+            return foundation.Status.FAILURE, None
+        sent.append(data)
+        return foundation.Status.SUCCESS, None
+
+    request.side_effect = send
+    stream = xbee3_device.open_serial_stream(
+        max_payload=1, max_in_flight=2, max_queued=4
+    )
+
+    # drain only waits for the queue to go down to max_queued frames
+    stream.write(bytes(range(10)))
+    await stream.drain()
+    assert len(sent) >= 6
+    assert len(sent) + len(stream._frames) + len(stream._sending) == 10
+    assert max_in_flight == 2
+
+    stream.max_queued = 0
+    await stream.drain()
+    assert sent == [bytes([i]) for i in range(10)]
+
+    # the frames queued behind a failed one are never sent
+    fail = True
+    stream.write(bytes(range(10)))
+    with pytest.raises(RuntimeError):
+        await stream.drain()
+    assert len(request.await_args_list) == 10 + stream.max_in_flight
+    assert not stream._frames
+    with pytest.raises(RuntimeError):
+        await stream.drain()
+
+
 @pytest.mark.parametrize(
     "command_id, request_value, request_data, response_data, response_command, response_value",
     (
@@ -501,6 +606,59 @@ async def test_remote_at_tx_failure(zigpy_device_from_quirk):
     xbee3_device.application.request.configure_mock(side_effect=None)
 
 
+async def test_remote_at_many(zigpy_device_from_quirk):
+    """Test pipelined remote AT commands with non-XBee coordinator."""
+
+    xbee3_device = zigpy_device_from_quirk(XBee3Sensor)
+    response_cluster = xbee3_device.endpoints[XBEE_AT_ENDPOINT].in_clusters[
+        XBEE_AT_RESPONSE_CLUSTER
+    ]
+    requests = []
+
+    def mock_at_request(device, profile, cluster, src_ep, dst_ep, seq, data, **kw):
+        requests.append((data[3], data[14:16]))
+        return mock.DEFAULT
+
+    xbee3_device.application.request.reset_mock()
+    xbee3_device.application.request.configure_mock(side_effect=mock_at_request)
+
+    pins = ("D0", "D1", "D2", "D3", "D4", "D5")
+    task = asyncio.create_task(
+        xbee3_device.remote_at_many([*pins, ("NI", b"XBee")], max_in_flight=3)
+    )
+    await asyncio.sleep(0.01)
+    assert [cmd for _, cmd in requests] == [b"D0", b"D1", b"D2"]
+
+    # answer out of order, every response frees a slot for the next command
+    while not task.done():
+        frame_id, cmd = requests.pop()
+        status = b"\x03" if cmd == b"NI" else b"\x00"
+        xbee3_device.handle_message(
+            XBEE_PROFILE_ID,
+            XBEE_AT_RESPONSE_CLUSTER,
+            XBEE_AT_ENDPOINT,
+            XBEE_AT_ENDPOINT,
+            bytes([frame_id]) + cmd + status + bytes([cmd[1] - ord("0")]),
+        )
+        await asyncio.sleep(0.01)
+
+    results = task.result()
+    assert [(r.command, r.value) for r in results[:-1]] == list(
+        zip(pins, range(len(pins)))
+    )
+    assert all(r.error is None and r.latency >= 0 for r in results[:-1])
+    assert results[-1].args == (b"XBee",)
+    assert str(results[-1].error) == "AT Command response: INVALID_PARAMETER"
+    assert not response_cluster._awaiting
+
+    # the frame id of a command timing out is reclaimed
+    with mock.patch("zhaquirks.xbee.REMOTE_AT_COMMAND_TIMEOUT", 0.01):
+        (result,) = await xbee3_device.remote_at_many(["D0"])
+    assert isinstance(result.error, TimeoutError)
+    assert not response_cluster.is_awaiting(requests[-1][0])
+    xbee3_device.application.request.configure_mock(side_effect=None)
+
+
 async def test_io_sample_report(zigpy_device_from_quirk):
     """Test DigitalIOCluster cluster."""
 
@@ -234,6 +234,25 @@ def test_xiaomi_quick_init_wrong_cluster_or_message(raw_device, cluster, message
     assert raw_device.application.device_initialized.call_count == 0
 
 
+@pytest.mark.parametrize(
+    "cluster, message",
+    (
+        (1, b"\x18\x00\n\x05\x00B\x11lumi.sensor_sm0ke\x01\x00 \x01"),  # wrong cluster
+        (0, b"\x19\x00\n\x05\x00B\x11lumi.sensor_sm0ke\x01\x00 \x01"),  # cluster cmd
+        (0, b"\x18\x00\x01\x05\x00B\x11lumi.sensor_sm0ke"),  # wrong command
+        (0, b"\x1c\x5f\x11\x00\x01\x05\x00"),  # wrong manufacturer specific command
+        (0, b"\x18\x00"),  # truncated header
+        (0, b""),  # empty
+    ),
+)
+def test_xiaomi_quick_init_prefilter(raw_device, cluster, message):
+    """Test quick init ignores messages other than Basic reports without parsing."""
+
+    with mock.patch("zigpy.zcl.foundation.ZCLHeader.deserialize") as hdr_deserialize:
+        assert handle_quick_init(raw_device, 0x0260, cluster, 1, 1, message) is None
+        assert hdr_deserialize.call_count == 0
+
+
 def test_xiaomi_quick_init_wrong_quirk_type(raw_device):
     """Test quick init for existing quirk which is not enabled for quick joining."""
 
@@ -388,6 +407,31 @@ async def test_xiaomi_batt_size(zigpy_device_from_quirk, quirk, batt_size):
     assert succ["battery_size"] == batt_size
 
 
+def test_basic_cluster_deserialize_no_reparse():
+    """Test fixed up attribute reports are not serialized and parsed again."""
+    cluster = BasicCluster(mock.MagicMock())
+
+    data = b"\x1c_\x11\x12\n"
+    data += b'\x01\xffB"\x01!\xb3\x0b\x03(\x17\x04!\xa8C\x05!\xa7\x00\x06$\x15'
+    data += b"\x00\x14\x00\x00\x08!\x04\x02\n!\x00\x00d\x10\x01"
+
+    schema = foundation.GENERAL_COMMANDS[
+        foundation.GeneralCommand.Report_Attributes
+    ].schema
+
+    with mock.patch.object(
+        schema, "deserialize", wraps=schema.deserialize
+    ) as deserialize_mock:
+        hdr, report = cluster.deserialize(data)
+
+    assert deserialize_mock.call_count == 0
+    assert hdr.command_id == foundation.GeneralCommand.Report_Attributes
+    assert isinstance(report, schema)
+    assert len(report.attribute_reports) == 1
+    assert report.attribute_reports[0].attrid == XIAOMI_AQARA_ATTRIBUTE
+    assert report.attribute_reports[0].value.value == data[9:]
+
+
 @pytest.mark.parametrize(
     "raw_report",
     (
@@ -491,6 +535,83 @@ def test_attribute_parsing(raw_report):
     assert len(raw_report) == 2 * len(reports[0])
 
 
+def test_attribute_parsing_linear():
+    """Test broken Xiaomi attribute reports are parsed without backtracking."""
+    cluster = BasicCluster(mock.MagicMock())
+
+    # Every string claims one byte less than it contains
+    attr = b"\x01\xffB\x03" + b"\x01!\xb3\x0b"
+    raw_report = attr * 20
+
+    with mock.patch.object(
+        cluster, "_parse_attr_report", wraps=cluster._parse_attr_report
+    ) as parse_mock:
+        reports = cluster._interpret_attr_reports(raw_report)
+
+    assert len(reports) == 1
+    assert len(reports[0]) == 20
+    assert all(r.value.value == b"\x01!\xb3\x0b" for r in reports[0])
+
+    # The fast path plus at most a single parse per position in the report
+    assert parse_mock.call_count <= 20 + len(raw_report)
+
+    # Trailing garbage makes every interpretation invalid
+    assert cluster._interpret_attr_reports(raw_report + b"\x01") == []
+
+
+def test_attribute_parsing_no_copies():
+    """Test attributes are deserialized from the remainder of the previous one."""
+    cluster = BasicCluster(mock.MagicMock())
+    raw_report = (
+        b"\x05\x00\x20\x03" * 10 + b"\x01\xffB\x02\x01\x02" + b"\x07\x00\x20\x01"
+    )
+
+    deserialize = foundation.Attribute.deserialize
+    calls = []
+
+    def deserialize_mock(data):
+        result = deserialize(data)
+        calls.append((data, result[1]))
+        return result
+
+    with mock.patch.object(
+        foundation.Attribute, "deserialize", side_effect=deserialize_mock
+    ):
+        reports = cluster._interpret_attr_reports(memoryview(raw_report))
+
+    assert len(reports) == 1
+    assert len(reports[0]) == 12
+    assert len(calls) == 11
+
+    # each attribute continues from what the previous one left
+    for (_, rest), (data, _) in zip(calls[:9], calls[1:10]):
+        assert data is rest
+
+
+@pytest.mark.parametrize(
+    "model, tag, name",
+    (
+        ("lumi.sensor_ht", 102, "pressure_measurement"),
+        ("lumi.weather", 102, "pressure_measurement_precision"),
+        ("lumi.airmonitor.acn01", 102, "tvoc_measurement"),
+        ("lumi.weather", 1, "battery_voltage_mV"),
+        ("lumi.motion.ac01", 5, "power_outage_count"),
+        ("lumi.motion.ac02", 5, "X-attrib-5"),
+        ("lumi.unknown", 5, "X-attrib-5"),
+        ("lumi.unknown", 102, "0xff01-102"),
+    ),
+)
+def test_aqara_attribute_names(zigpy_device_from_quirk, model, tag, name):
+    """Test the Aqara attribute report tags are named from the model's table."""
+
+    device = zigpy_device_from_quirk(zhaquirks.xiaomi.aqara.weather.Weather)
+    device.model = model
+    basic_cluster = device.endpoints[1].basic
+
+    value = bytes([tag, foundation.DataTypeId.uint8, 1])
+    assert basic_cluster._parse_aqara_attributes(value) == {name: 1}
+
+
 @mock.patch("zigpy.zcl.Cluster.bind", mock.AsyncMock())
 @pytest.mark.parametrize("quirk", (zhaquirks.xiaomi.aqara.plug_eu.PlugMAEU01,))
 async def test_xiaomi_eu_plug_binding(zigpy_device_from_quirk, quirk):
@@ -3,22 +3,28 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Callable, Hashable
+import dataclasses
+import heapq
 import importlib
 import importlib.util
 import logging
+import math
 import pathlib
 import pkgutil
 import sys
 import typing
 from typing import Any
+import weakref
 
 import zigpy.device
 import zigpy.endpoint
+import zigpy.exceptions
 from zigpy.quirks import DEVICE_REGISTRY, CustomCluster, CustomDevice
 import zigpy.types as t
 from zigpy.util import ListenableMixin
 from zigpy.zcl import foundation
-from zigpy.zcl.clusters.general import PowerConfiguration
+from zigpy.zcl.clusters.general import Basic, PowerConfiguration
 from zigpy.zcl.clusters.measurement import OccupancySensing
 from zigpy.zcl.clusters.security import IasZone
 from zigpy.zdo import types as zdotypes
@@ -47,6 +53,7 @@ from .const import (
     ZHA_SEND_EVENT,
     ZONE_STATUS_CHANGE_COMMAND,
 )
+from .quirk_loader import setup_lazy, setup_lazy_custom
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -60,6 +67,351 @@ class Bus(ListenableMixin):
         self._listeners = {}
 
 
+class TimerWheel:
+    """Timers shared by the clusters of all devices, for callbacks re-armed often.
+
+    Deadlines are rounded up to `resolution` seconds and kept in buckets, so
+    (re-)arming a timer is O(1) and a single event loop timer is armed for the
+    earliest bucket. The callbacks of expired buckets run in one batch.
+    """
+
+    def __init__(
+        self, loop: asyncio.AbstractEventLoop, resolution: float = 1.0
+    ) -> None:
+        """Init."""
+        self._loop = loop
+        self.resolution = resolution
+        # tick -> {key: callback}, a tick being a multiple of the resolution
+        self._buckets: dict[int, dict[Hashable, Callable[[], Any]]] = {}
+        # ticks of the buckets, including ones of buckets emptied since
+        self._ticks: list[int] = []
+        self._deadlines: dict[Hashable, int] = {}
+        self._handle: asyncio.TimerHandle | None = None
+        self._handle_tick: int | None = None
+
+        self.scheduled = 0
+        self.rescheduled = 0
+        self.cancelled = 0
+        self.expired = 0
+
+    @classmethod
+    def for_loop(cls, loop: asyncio.AbstractEventLoop | None = None) -> TimerWheel:
+        """Return the timer wheel of the event loop."""
+        if loop is None:
+            loop = asyncio.get_running_loop()
+
+        wheel = _TIMER_WHEELS.get(loop)
+        if wheel is None:
+            wheel = _TIMER_WHEELS[loop] = cls(loop)
+        return wheel
+
+    @property
+    def pending(self) -> int:
+        """Number of armed timers."""
+        return len(self._deadlines)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Return whether the timer of `key` is armed."""
+        return key in self._deadlines
+
+    def schedule(self, key: Hashable, delay: float, callback: Callable[[], Any]):
+        """Arm the timer of `key` to call `callback` in `delay` seconds.
+
+        An already armed timer of `key` is replaced.
+        """
+        if self._remove(key):
+            self.rescheduled += 1
+        self.scheduled += 1
+
+        deadline = self._loop.time() + delay
+        if delay > 0:
+            tick = math.ceil(deadline / self.resolution)
+        else:
+            # expire on the next loop iteration
+            tick = math.floor(deadline / self.resolution)
+
+        bucket = self._buckets.get(tick)
+        if bucket is None:
+            bucket = self._buckets[tick] = {}
+            heapq.heappush(self._ticks, tick)
+        bucket[key] = callback
+        self._deadlines[key] = tick
+
+        if self._handle_tick is None or tick < self._handle_tick:
+            self._arm()
+
+    def cancel(self, key: Hashable) -> bool:
+        """Disarm the timer of `key`, return whether it was armed."""
+        if not self._remove(key):
+            return False
+        self.cancelled += 1
+        return True
+
+    def _remove(self, key: Hashable) -> bool:
+        tick = self._deadlines.pop(key, None)
+        if tick is None:
+            return False
+
+        bucket = self._buckets[tick]
+        del bucket[key]
+        if not bucket:
+            # its tick is dropped from the heap once it expires
+            del self._buckets[tick]
+        return True
+
+    def _arm(self) -> None:
+        """Arm the event loop timer for the earliest bucket."""
+        while self._ticks and self._ticks[0] not in self._buckets:
+            heapq.heappop(self._ticks)
+
+        tick = self._ticks[0] if self._ticks else None
+        if tick == self._handle_tick:
+            return
+
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._handle_tick = tick
+        if tick is not None:
+            self._handle = self._loop.call_at(tick * self.resolution, self._expire)
+
+    def _expire(self) -> None:
+        """Run the callbacks of the expired buckets."""
+        last_tick = max(
+            self._handle_tick, math.floor(self._loop.time() / self.resolution)
+        )
+        self._handle = None
+        self._handle_tick = None
+
+        callbacks = []
+        while self._ticks and self._ticks[0] <= last_tick:
+            bucket = self._buckets.pop(heapq.heappop(self._ticks), None)
+            if bucket:
+                for key, callback in bucket.items():
+                    del self._deadlines[key]
+                    callbacks.append(callback)
+        self.expired += len(callbacks)
+
+        self._arm()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                _LOGGER.exception("Error calling timer callback %s", callback)
+
+
+_TIMER_WHEELS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, TimerWheel] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class MultiPressDetector:
+    """Derive multi press and long press events from the presses of buttons.
+
+    A press within `multi_press_window` seconds of the previous press of the same
+    button continues its sequence, the number of presses is reported once the
+    window passes without another press. Pressing another button abandons the
+    pending sequence. A button held for `long_press_delay` seconds between `down`
+    and `up` is reported as a long press instead of a press.
+
+    A single event loop timer is armed at a time and re-armed on every press.
+    """
+
+    def __init__(
+        self,
+        on_presses: Callable[[Hashable, int], Any] | None = None,
+        *,
+        on_long_press: Callable[[Hashable], Any] | None = None,
+        multi_press_window: float = 0.3,
+        long_press_delay: float = 1.0,
+    ) -> None:
+        """Init."""
+        self.on_presses = on_presses
+        self.on_long_press = on_long_press
+        self.multi_press_window = multi_press_window
+        self.long_press_delay = long_press_delay
+
+        self.button: Hashable | None = None
+        self.presses = 0
+        self._held = False
+        self._long_pressed = False
+        self._handle: asyncio.TimerHandle | None = None
+
+    @property
+    def pending(self) -> bool:
+        """Return whether a press sequence or a long press is pending."""
+        return self._handle is not None
+
+    def press(self, button: Hashable) -> None:
+        """Count a short press of `button`."""
+        self._select(button)
+        self.presses += 1
+        if self.multi_press_window <= 0:
+            self._report_presses()
+        else:
+            self._handle = asyncio.get_running_loop().call_later(
+                self.multi_press_window, self._report_presses
+            )
+
+    def down(self, button: Hashable) -> None:
+        """Start holding `button`."""
+        self._select(button)
+        self._held = True
+        self._long_pressed = False
+        self._handle = asyncio.get_running_loop().call_later(
+            self.long_press_delay, self._report_long_press
+        )
+
+    def up(self, button: Hashable) -> bool:
+        """Release `button`, return whether it was pressed short."""
+        if button != self.button or not self._held:
+            return False
+
+        self._held = False
+        if self._long_pressed:
+            self._long_pressed = False
+            return False
+
+        self.press(button)
+        return True
+
+    def cancel(self) -> None:
+        """Abandon the pending press sequence or long press."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self.presses = 0
+        self._held = False
+        self._long_pressed = False
+
+    def _select(self, button: Hashable) -> None:
+        """Disarm the timer, starting a new sequence for another button."""
+        if button != self.button:
+            self.cancel()
+            self.button = button
+        elif self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _report_presses(self) -> None:
+        self._handle = None
+        presses, self.presses = self.presses, 0
+        if self.on_presses is not None:
+            self.on_presses(self.button, presses)
+
+    def _report_long_press(self) -> None:
+        self._handle = None
+        self._long_pressed = True
+        # the long press ends the sequence of presses before it
+        if self.presses:
+            self._report_presses()
+        if self.on_long_press is not None:
+            self.on_long_press(self.button)
+
+
+def parse_sw_build_id(sw_build_id: str) -> tuple[int, ...]:
+    """Return the leading numeric, dot separated parts of a sw_build_id."""
+    version = []
+    for part in sw_build_id.split("."):
+        try:
+            version.append(int(part))
+        except ValueError:
+            break
+    return tuple(version)
+
+
+class FirmwareVersion:
+    """sw_build_id of a device, parsed once and read at most once at a time.
+
+    Concurrent callers of `read` share the read in flight, which is retried
+    `retries` times with exponential backoff while the device does not answer.
+    """
+
+    def __init__(
+        self,
+        device: zigpy.device.Device,
+        *,
+        retries: int = 2,
+        backoff: float = 1.0,
+    ) -> None:
+        """Init."""
+        self._device = device
+        self.retries = retries
+        self.backoff = backoff
+        # last parsed sw_build_id and its version
+        self._parsed: tuple[str, tuple[int, ...]] | None = None
+        self._read: asyncio.Future[str | None] | None = None
+
+    @classmethod
+    def for_device(cls, device: zigpy.device.Device) -> FirmwareVersion:
+        """Return the firmware version of the device."""
+        firmware = _FIRMWARE_VERSIONS.get(device)
+        if firmware is None:
+            firmware = _FIRMWARE_VERSIONS[device] = cls(device)
+        return firmware
+
+    @property
+    def basic(self) -> Basic | None:
+        """Basic cluster holding the sw_build_id."""
+        for endpoint_id, endpoint in self._device.endpoints.items():
+            if endpoint_id and Basic.cluster_id in endpoint.in_clusters:
+                return endpoint.in_clusters[Basic.cluster_id]
+        return None
+
+    @property
+    def sw_build_id(self) -> str | None:
+        """Cached sw_build_id, if any."""
+        basic = self.basic
+        if basic is None:
+            return None
+        return basic.get(Basic.AttributeDefs.sw_build_id.id)
+
+    @property
+    def version(self) -> tuple[int, ...] | None:
+        """Parsed cached sw_build_id, None if it is unknown."""
+        sw_build_id = self.sw_build_id
+        if sw_build_id is None:
+            return None
+        if self._parsed is None or self._parsed[0] != sw_build_id:
+            self._parsed = (sw_build_id, parse_sw_build_id(sw_build_id))
+        return self._parsed[1]
+
+    @property
+    def reading(self) -> bool:
+        """Whether the sw_build_id is being read from the device."""
+        return self._read is not None and not self._read.done()
+
+    async def read(self) -> str | None:
+        """Read the sw_build_id from the device, sharing the read in flight."""
+        if not self.reading:
+            self._read = asyncio.ensure_future(self._read_with_retries())
+        return await asyncio.shield(self._read)
+
+    async def _read_with_retries(self) -> str | None:
+        attrid = Basic.AttributeDefs.sw_build_id.id
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+            basic = self.basic
+            if basic is None:
+                return None
+            try:
+                success, _ = await basic.read_attributes([attrid])
+            except (TimeoutError, zigpy.exceptions.ZigbeeException) as exc:
+                _LOGGER.debug(
+                    "Failed to read sw_build_id of %s: %r", self._device.ieee, exc
+                )
+                continue
+            # the device answered, possibly that it doesn't have a sw_build_id
+            return success.get(attrid)
+        return None
+
+
+_FIRMWARE_VERSIONS: weakref.WeakKeyDictionary[zigpy.device.Device, FirmwareVersion] = (
+    weakref.WeakKeyDictionary()
+)
+
+
 class LocalDataCluster(CustomCluster):
     """Cluster meant to prevent remote calls.
 
@@ -255,10 +607,13 @@ class _Motion(CustomCluster, IasZone):
         """Init."""
         super().__init__(*args, **kwargs)
         self._loop = asyncio.get_running_loop()
-        self._timer_handle = None
+        self._timer_wheel = TimerWheel.for_loop(self._loop)
+
+    def _schedule_turn_off(self):
+        """Reset the motion sensor in reset_s seconds, unless triggered again."""
+        self._timer_wheel.schedule(self, self.reset_s, self._turn_off)
 
     def _turn_off(self):
-        self._timer_handle = None
         self.debug("%s - Resetting motion sensor", self.endpoint.device.ieee)
         self.listener_event(
             CLUSTER_COMMAND, 253, ZONE_STATUS_CHANGE_COMMAND, [OFF, 0, 0, 0]
@@ -284,9 +639,7 @@ class MotionWithReset(_Motion):
         """Handle the cluster command."""
         # check if the command is for a zone status change of ZoneStatus.Alarm_1 or ZoneStatus.Alarm_2
         if hdr.command_id == ZONE_STATUS_CHANGE_COMMAND and args[0] & 3:
-            if self._timer_handle:
-                self._timer_handle.cancel()
-            self._timer_handle = self._loop.call_later(self.reset_s, self._turn_off)
+            self._schedule_turn_off()
             if self.send_occupancy_event:
                 self.endpoint.device.occupancy_bus.listener_event(OCCUPANCY_EVENT)
 
@@ -309,10 +662,7 @@ class MotionOnEvent(_Motion):
 
         self.debug("%s - Received motion event message", self.endpoint.device.ieee)
 
-        if self._timer_handle:
-            self._timer_handle.cancel()
-
-        self._timer_handle = self._loop.call_later(self.reset_s, self._turn_off)
+        self._schedule_turn_off()
 
 
 class _Occupancy(CustomCluster, OccupancySensing):
@@ -323,11 +673,14 @@ class _Occupancy(CustomCluster, OccupancySensing):
     def __init__(self, *args, **kwargs):
         """Init."""
         super().__init__(*args, **kwargs)
-        self._timer_handle = None
         self._loop = asyncio.get_running_loop()
+        self._timer_wheel = TimerWheel.for_loop(self._loop)
+
+    def _schedule_turn_off(self):
+        """Reset the occupancy in reset_s seconds, unless triggered again."""
+        self._timer_wheel.schedule(self, self.reset_s, self._turn_off)
 
     def _turn_off(self):
-        self._timer_handle = None
         self._update_attribute(OCCUPANCY_STATE, OFF)
 
 
@@ -343,10 +696,7 @@ class OccupancyOnEvent(_Occupancy):
         """Occupancy event."""
         self._update_attribute(OCCUPANCY_STATE, ON)
 
-        if self._timer_handle:
-            self._timer_handle.cancel()
-
-        self._timer_handle = self._loop.call_later(self.reset_s, self._turn_off)
+        self._schedule_turn_off()
 
 
 class OccupancyWithReset(_Occupancy):
@@ -356,58 +706,100 @@ class OccupancyWithReset(_Occupancy):
         super()._update_attribute(attrid, value)
 
         if attrid == OCCUPANCY_STATE and value == ON:
-            if self._timer_handle:
-                self._timer_handle.cancel()
             self.endpoint.device.motion_bus.listener_event(MOTION_EVENT)
-            self._timer_handle = self._loop.call_later(self.reset_s, self._turn_off)
+            self._schedule_turn_off()
 
 
-class QuickInitDevice(CustomDevice):
-    """Devices with quick initialization from quirk signature."""
+@dataclasses.dataclass(frozen=True)
+class QuickInitTemplate:
+    """Quirk signature compiled for quick initialization of devices."""
 
-    signature: dict[str, Any] | None = None
+    manufacturer: str
+    model: str | None
+    node_desc: zdotypes.NodeDescriptor
+    # (endpoint id, profile id, device type, input cluster ids, output cluster ids)
+    endpoints: tuple[tuple[int, int, int, tuple[int, ...], tuple[int, ...]], ...]
 
     @classmethod
-    def from_signature(
-        cls, device: zigpy.device.Device, model: str | None = None
-    ) -> zigpy.device.Device:
-        """Update device accordingly to quirk signature."""
-
-        assert isinstance(cls.signature, dict)
-        if model is None:
-            model = cls.signature[MODEL]
-        manufacturer = cls.signature.get(MANUFACTURER)
+    def from_signature(cls, signature: dict[str, Any]) -> QuickInitTemplate:
+        """Compile a quirk signature."""
+        manufacturer = signature.get(MANUFACTURER)
         if manufacturer is None:
-            manufacturer = cls.signature[MODELS_INFO][0][0]
+            manufacturer = signature[MODELS_INFO][0][0]
+
+        return cls(
+            manufacturer=manufacturer,
+            model=signature.get(MODEL),
+            node_desc=signature[NODE_DESCRIPTOR],
+            endpoints=tuple(
+                (
+                    ep_id,
+                    ep_data[PROFILE_ID],
+                    ep_data[DEVICE_TYPE],
+                    tuple(ep_data[INPUT_CLUSTERS]),
+                    tuple(ep_data[OUTPUT_CLUSTERS]),
+                )
+                for ep_id, ep_data in signature[ENDPOINTS].items()
+            ),
+        )
 
-        device.node_desc = cls.signature[NODE_DESCRIPTOR]
+    def apply(
+        self, device: zigpy.device.Device, model: str | None = None
+    ) -> zigpy.device.Device:
+        """Update the device accordingly to the template."""
+        if model is None:
+            model = self.model
+        if model is None:
+            raise KeyError(MODEL)
 
-        endpoints = cls.signature[ENDPOINTS]
-        for ep_id, ep_data in endpoints.items():
+        device.node_desc = self.node_desc
+        for ep_id, profile_id, device_type, in_clusters, out_clusters in self.endpoints:
             endpoint = device.add_endpoint(ep_id)
-            endpoint.profile_id = ep_data[PROFILE_ID]
-            endpoint.device_type = ep_data[DEVICE_TYPE]
-            for cluster_id in ep_data[INPUT_CLUSTERS]:
+            endpoint.profile_id = profile_id
+            endpoint.device_type = device_type
+            for cluster_id in in_clusters:
                 cluster = endpoint.add_input_cluster(cluster_id)
-                if cluster.ep_attribute == "basic":
-                    manuf_attr_id = cluster.attributes_by_name[MANUFACTURER].id
+                if cluster_id == Basic.cluster_id:
                     cluster._update_attribute(  # pylint: disable=W0212
-                        manuf_attr_id, manufacturer
+                        Basic.AttributeDefs.manufacturer.id, self.manufacturer
                     )
                     cluster._update_attribute(  # pylint: disable=W0212
-                        cluster.attributes_by_name[MODEL].id, model
+                        Basic.AttributeDefs.model.id, model
                     )
-            for cluster_id in ep_data[OUTPUT_CLUSTERS]:
+            for cluster_id in out_clusters:
                 endpoint.add_output_cluster(cluster_id)
             endpoint.status = zigpy.endpoint.Status.ZDO_INIT
 
         device.status = zigpy.device.Status.ENDPOINTS_INIT
-        device.manufacturer = manufacturer
+        device.manufacturer = self.manufacturer
         device.model = model
 
         return device
 
 
+class QuickInitDevice(CustomDevice):
+    """Devices with quick initialization from quirk signature."""
+
+    signature: dict[str, Any] | None = None
+
+    @classmethod
+    def quick_init_template(cls) -> QuickInitTemplate:
+        """Return the quirk signature compiled for quick initialization."""
+        template = cls.__dict__.get("_quick_init_template")
+        if template is None:
+            assert isinstance(cls.signature, dict)
+            template = QuickInitTemplate.from_signature(cls.signature)
+            cls._quick_init_template = template
+        return template
+
+    @classmethod
+    def from_signature(
+        cls, device: zigpy.device.Device, model: str | None = None
+    ) -> zigpy.device.Device:
+        """Update device accordingly to quirk signature."""
+        return cls.quick_init_template().apply(device, model)
+
+
 class NoReplyMixin:
     """A simple mixin.
 
@@ -446,19 +838,28 @@ class NoReplyMixin:
         return rsp
 
 
-def setup(custom_quirks_path: str | None = None) -> None:
-    """Register all quirks with zigpy, including optional custom quirks."""
+def setup(custom_quirks_path: str | None = None, *, lazy: bool = False) -> None:
+    """Register all quirks with zigpy, including optional custom quirks.
+
+    With `lazy`, quirk modules are only imported once a device with a matching
+    manufacturer and model is looked up in the registry. A manifest cached next to
+    the package and under `custom_quirks_path` lets modules that did not change
+    since the previous start be registered without executing them.
+    """
 
     if custom_quirks_path is not None:
         DEVICE_REGISTRY.purge_custom_quirks(custom_quirks_path)
 
     # Import all quirks in the `zhaquirks` package first
-    for _importer, modname, _ispkg in pkgutil.walk_packages(
-        path=__path__,
-        prefix=__name__ + ".",
-    ):
-        _LOGGER.debug("Loading quirks module %r", modname)
-        importlib.import_module(modname)
+    if lazy:
+        setup_lazy()
+    else:
+        for _importer, modname, _ispkg in pkgutil.walk_packages(
+            path=__path__,
+            prefix=__name__ + ".",
+        ):
+            _LOGGER.debug("Loading quirks module %r", modname)
+            importlib.import_module(modname)
 
     if custom_quirks_path is None:
         return
@@ -466,21 +867,26 @@ def setup(custom_quirks_path: str | None = None) -> None:
     path = pathlib.Path(custom_quirks_path)
     _LOGGER.debug("Loading custom quirks from %r", path)
 
-    loaded = False
-
-    # Treat the custom quirk path (e.g. `/config/custom_quirks/`) itself as a module
-    for importer, modname, _ispkg in pkgutil.walk_packages(path=[str(path)]):
-        _LOGGER.debug("Loading custom quirk module %r", modname)
-
-        try:
-            spec = importer.find_spec(modname)
-            module = importlib.util.module_from_spec(spec)
-            sys.modules[modname] = module
-            spec.loader.exec_module(module)
-        except Exception:
-            _LOGGER.exception("Unexpected exception importing custom quirk %r", modname)
-        else:
-            loaded = True
+    if lazy:
+        loaded = setup_lazy_custom(path)
+    else:
+        loaded = False
+
+        # Treat the custom quirk path (e.g. `/config/custom_quirks/`) itself as a module
+        for importer, modname, _ispkg in pkgutil.walk_packages(path=[str(path)]):
+            _LOGGER.debug("Loading custom quirk module %r", modname)
+
+            try:
+                spec = importer.find_spec(modname)
+                module = importlib.util.module_from_spec(spec)
+                sys.modules[modname] = module
+                spec.loader.exec_module(module)
+            except Exception:
+                _LOGGER.exception(
+                    "Unexpected exception importing custom quirk %r", modname
+                )
+            else:
+                loaded = True
 
     if loaded:
         _LOGGER.warning(
@@ -28,8 +28,10 @@ Broken ZCL attributes:
     0x0204 - TemperatureDisplayMode (0x0000): Writing doesn't seem to do anything
 """
 
+import asyncio
 from collections.abc import Callable
 from datetime import UTC, datetime
+import itertools
 import time
 from typing import Any
 
@@ -183,6 +185,26 @@ class CustomizedStandardCluster(CustomCluster):
         else:
             return [success_global]
 
+    # send the manufacturer specific and the standard command at the same time
+    concurrent_split_commands: bool = True
+
+    _partitions: tuple[dict, dict] | None = None
+
+    def _partition(self, attr_ids: tuple[int, ...]) -> tuple[tuple[bool, ...], ...]:
+        """Return masks of the manufacturer specific and standard attributes."""
+        cache = self._partitions
+        if cache is None or cache[0] is not self.attributes:
+            cache = self._partitions = (self.attributes, {})
+
+        masks = cache[1].get(attr_ids)
+        if masks is None:
+            specific = tuple(
+                self.attributes[attr_id].is_manufacturer_specific
+                for attr_id in attr_ids
+            )
+            masks = cache[1][attr_ids] = (specific, tuple(not s for s in specific))
+        return masks
+
     async def split_command(
         self,
         records: list[Any],
@@ -192,16 +214,16 @@ class CustomizedStandardCluster(CustomCluster):
         **kwargs,
     ):
         """Split execution of command in one for manufacturer specific and one for standard attributes."""
-        records_specific = [
-            e
-            for e in records
-            if self.attributes[extract_attrid(e)].is_manufacturer_specific
-        ]
-        records_standard = [
-            e
-            for e in records
-            if not self.attributes[extract_attrid(e)].is_manufacturer_specific
-        ]
+        specific, standard = self._partition(tuple(map(extract_attrid, records)))
+        records_specific = list(itertools.compress(records, specific))
+        records_standard = list(itertools.compress(records, standard))
+
+        if records_specific and records_standard and self.concurrent_split_commands:
+            result_specific, result_standard = await asyncio.gather(
+                func(records_specific, *args, **kwargs),
+                func(records_standard, *args, **kwargs),
+            )
+            return self.combine_results(result_specific, result_standard)
 
         result_specific = (
             await func(records_specific, *args, **kwargs) if records_specific else []
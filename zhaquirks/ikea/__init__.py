@@ -5,9 +5,9 @@ import logging
 from zigpy.quirks import CustomCluster
 import zigpy.types as t
 from zigpy.zcl import foundation
-from zigpy.zcl.clusters.general import Basic, PowerConfiguration, Scenes
+from zigpy.zcl.clusters.general import PowerConfiguration, Scenes
 
-from zhaquirks import EventableCluster
+from zhaquirks import EventableCluster, FirmwareVersion
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -204,56 +204,62 @@ class DoublingPowerConfigClusterIKEA(CustomCluster, PowerConfiguration):
     This implementation doubles battery pct remaining for IKEA devices with old firmware.
     """
 
+    _updating_battery_pct = False
+    # latest raw battery percentage reported while the firmware was unknown
+    _unknown_fw_battery_pct = None
+
     async def bind(self):
         """Bind cluster and read the sw_build_id for later use."""
         result = await super().bind()
-        await self.endpoint.basic.read_attributes([Basic.AttributeDefs.sw_build_id.id])
+        await FirmwareVersion.for_device(self.endpoint.device).read()
         return result
 
     def _is_firmware_new(self):
         """Check if new firmware is installed that does not require battery doubling."""
-        # get sw_build_id from attribute cache if available
-        sw_build_id = self.endpoint.basic.get(Basic.AttributeDefs.sw_build_id.id)
+        firmware = FirmwareVersion.for_device(self.endpoint.device)
+        sw_build_id = firmware.sw_build_id
 
         # sw_build_id is not cached or empty, so we consider it new firmware for now
         if not sw_build_id:
             return True
 
-        # split sw_build_id into parts to check for new firmware
-        split_fw_version = sw_build_id.split(".")
-        if len(split_fw_version) >= 2:
-            # guard against possible future version formatting which includes more than just numbers
-            try:
-                first_part = int(split_fw_version[0])
-                second_part = int(split_fw_version[1])
-
-                # new firmware is either 24.4.5 or above, or 2.4.5 or above
-                # old firmware is 2.3.x or below
-                return first_part >= 3 or (first_part >= 2 and second_part >= 4)
-            except ValueError:
-                _LOGGER.warning(
-                    "sw_build_id is not a number: %s for device %s",
-                    sw_build_id,
-                    self.endpoint.device.ieee,
-                )
-                # sw_build_id is not a number, so it must be new firmware
-                return True
+        version = firmware.version
+        if len(version) >= 2:
+            # new firmware is either 24.4.5 or above, or 2.4.5 or above
+            # old firmware is 2.3.x or below
+            return version[0] >= 3 or (version[0] >= 2 and version[1] >= 4)
+
+        # guard against possible future version formatting which includes more than just numbers
+        if "." in sw_build_id:
+            _LOGGER.warning(
+                "sw_build_id is not a number: %s for device %s",
+                sw_build_id,
+                self.endpoint.device.ieee,
+            )
 
         # unknown formatting of sw_build_id, so it must be new firmware
         return True
 
-    async def _read_fw_and_update_battery_pct(self, reported_battery_pct):
+    async def _read_fw_and_update_battery_pct(self):
         """Read firmware version and update battery percentage remaining if necessary."""
-        # read sw_build_id from device
-        await self.endpoint.basic.read_attributes([Basic.AttributeDefs.sw_build_id.id])
+        battery_pct_id = (
+            PowerConfiguration.AttributeDefs.battery_percentage_remaining.id
+        )
+
+        # read sw_build_id from device, together with any read already in flight
+        try:
+            await FirmwareVersion.for_device(self.endpoint.device).read()
+        finally:
+            self._updating_battery_pct = False
 
         # check if sw_build_id was read successfully and old firmware is installed
-        # if so, update cache with reported battery percentage (doubled)
-        if not self._is_firmware_new():
-            self._update_attribute(
-                PowerConfiguration.AttributeDefs.battery_percentage_remaining.id,
-                reported_battery_pct * 2,
-            )
+        # if so, update cache with the latest raw battery percentage (doubled)
+        # reports arriving once the firmware is known are doubled on their own
+        reported_battery_pct = self._unknown_fw_battery_pct
+        self._unknown_fw_battery_pct = None
+        if reported_battery_pct is not None and not self._is_firmware_new():
+            # bypass the doubling of _update_attribute, the firmware is known by now
+            super()._update_attribute(battery_pct_id, reported_battery_pct * 2)
 
     def _update_attribute(self, attrid, value):
         """Update attribute to double battery percentage if firmware is old.
@@ -262,12 +268,16 @@ class DoublingPowerConfigClusterIKEA(CustomCluster, PowerConfiguration):
         but the percentage is not doubled for now then, as that task happens asynchronously.
         """
         if attrid == PowerConfiguration.AttributeDefs.battery_percentage_remaining.id:
+            firmware = FirmwareVersion.for_device(self.endpoint.device)
+            # keep the raw percentage for the task below, it may need doubling later
+            self._unknown_fw_battery_pct = (
+                value if firmware.sw_build_id is None else None
+            )
             # if sw_build_id is not cached, create task to read from device, since it should be awake now
-            if (
-                self.endpoint.basic.get(Basic.AttributeDefs.sw_build_id.id, None)
-                is None
-            ):
-                self.create_catching_task(self._read_fw_and_update_battery_pct(value))
+            # a task already waiting for the read updates the percentage with the latest report
+            if firmware.sw_build_id is None and not self._updating_battery_pct:
+                self._updating_battery_pct = True
+                self.create_catching_task(self._read_fw_and_update_battery_pct())
 
             # double percentage if the firmware is confirmed old
             # The coroutine above will not have executed yet if the firmware is unknown,
@@ -1,9 +1,7 @@
 """Module for Philips quirks implementations."""
 
-import asyncio
 import itertools
 import logging
-import time
 from typing import Any, Final, Optional, Union
 
 from zigpy.quirks import CustomCluster
@@ -13,6 +11,7 @@ from zigpy.zcl.clusters.general import Basic
 from zigpy.zcl.clusters.measurement import OccupancySensing
 from zigpy.zcl.foundation import ZCLAttributeDef
 
+from zhaquirks import MultiPressDetector
 from zhaquirks.const import (
     ARGS,
     BUTTON,
@@ -79,38 +78,20 @@ class PhilipsBasicCluster(CustomCluster, Basic):
 class ButtonPressQueue:
     """Philips button queue to derive multiple press events."""
 
-    def __init__(self):
+    def __init__(self, multi_press_window: float = 0.3):
         """Init."""
-        self._ms_threshold = 300
-        self._ms_last_click = 0
-        self._click_counter = 1
-        self._button = None
         self._callback = lambda x: None
-        self._task = None
-
-    async def _job(self):
-        await asyncio.sleep(self._ms_threshold / 1000)
-        self._callback(self._click_counter)
+        self._detector = MultiPressDetector(
+            self._presses_done, multi_press_window=multi_press_window
+        )
 
-    def _reset(self, button):
-        if self._task:
-            self._task.cancel()
-        self._click_counter = 1
-        self._button = button
+    def _presses_done(self, button, click_count):
+        self._callback(click_count)
 
     def press(self, callback, button):
         """Process a button press."""
         self._callback = callback
-        now_ms = time.time() * 1000
-        if self._button != button:
-            self._reset(button)
-        elif now_ms - self._ms_last_click > self._ms_threshold:
-            self._click_counter = 1
-        else:
-            self._task.cancel()
-            self._click_counter += 1
-        self._ms_last_click = now_ms
-        self._task = asyncio.ensure_future(self._job())
+        self._detector.press(button)
 
 
 class Button:
@@ -0,0 +1,490 @@
+"""Manifest-driven lazy loading of quirk modules."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+import contextlib
+import dataclasses
+import functools
+import hashlib
+import importlib
+import importlib.util
+import json
+import logging
+import os
+import pathlib
+import sys
+from typing import Any
+
+from zigpy.quirks import DEVICE_REGISTRY
+from zigpy.quirks.registry import DeviceRegistry
+
+from zhaquirks.const import MANUFACTURER, MODEL, MODELS_INFO
+
+_LOGGER = logging.getLogger(__name__)
+
+PACKAGE_NAME = __package__
+PACKAGE_PATH = pathlib.Path(__file__).parent
+MANIFEST_NAME = "quirk_manifest.json"
+MANIFEST_PATH = PACKAGE_PATH / MANIFEST_NAME
+MANIFEST_VERSION = 2
+
+RegistryKey = tuple[str | None, str | None]
+
+# Imports a module, returning whether it was imported successfully
+ModuleImporter = Callable[[str, pathlib.Path], bool]
+
+
+def signature_keys(signature: dict[str, Any]) -> list[RegistryKey]:
+    """Return the registry keys a v1 quirk signature is registered under."""
+    models_info = signature.get(MODELS_INFO)
+    if models_info:
+        return [tuple(info) for info in models_info]
+    return [(signature.get(MANUFACTURER), signature.get(MODEL))]
+
+
+def iter_module_files(
+    path: pathlib.Path, prefix: str = ""
+) -> Iterator[tuple[str, pathlib.Path]]:
+    """Yield quirk modules in `pkgutil.walk_packages` order, without importing them."""
+    for name in sorted(os.listdir(path)):
+        file = path / name
+        if file.is_dir():
+            if "." not in name and (file / "__init__.py").is_file():
+                yield prefix + name, file / "__init__.py"
+                yield from iter_module_files(file, prefix + name + ".")
+        elif name.endswith(".py") and name != "__init__.py" and name.count(".") == 1:
+            yield prefix + name[:-3], file
+
+
+def file_digest(path: pathlib.Path) -> str:
+    """Return the SHA-256 digest of a module's source."""
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+@dataclasses.dataclass
+class ModuleRegistrations:
+    """Quirks registered by the body of a single module."""
+
+    # v1 quirk class names and the registry keys of their signatures
+    quirks: dict[str, list[RegistryKey]] = dataclasses.field(default_factory=dict)
+    # Registry keys of v2 `QuirkBuilder` entries
+    v2: list[RegistryKey] = dataclasses.field(default_factory=list)
+
+    @property
+    def keys(self) -> list[RegistryKey]:
+        """Return every registry key the module registers, in order."""
+        quirk_keys = (key for keys in self.quirks.values() for key in keys)
+        return list(dict.fromkeys([*quirk_keys, *self.v2]))
+
+    @property
+    def is_lazy(self) -> bool:
+        """Return whether the module can be imported on demand.
+
+        Modules that register nothing are imported for their side effects and
+        modules registering wildcard (`None`) keys can match any device.
+        """
+        keys = self.keys
+        return bool(keys) and all(None not in key for key in keys)
+
+
+@dataclasses.dataclass
+class ModuleManifest:
+    """Cached registrations of a module, keyed by the state of its source file."""
+
+    size: int
+    mtime_ns: int
+    digest: str
+    registrations: ModuleRegistrations
+
+
+@dataclasses.dataclass
+class QuirkManifest:
+    """Registrations of every module in a quirk tree, in import order."""
+
+    modules: dict[str, ModuleManifest] = dataclasses.field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> QuirkManifest:
+        """Load a manifest from disk, starting from scratch if none is usable."""
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return cls()
+
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return cls()
+
+        modules = {}
+        try:
+            for modname, module in data["modules"].items():
+                registrations = module["registrations"]
+                modules[modname] = ModuleManifest(
+                    size=module["size"],
+                    mtime_ns=module["mtime_ns"],
+                    digest=module["digest"],
+                    registrations=ModuleRegistrations(
+                        quirks={
+                            name: [tuple(key) for key in keys]
+                            for name, keys in registrations["quirks"].items()
+                        },
+                        v2=[tuple(key) for key in registrations["v2"]],
+                    ),
+                )
+        except (AttributeError, KeyError, TypeError):
+            # written by hand or truncated, but with the right version
+            return cls()
+        return cls(modules=modules)
+
+    def save(self, path: pathlib.Path) -> None:
+        """Write the manifest to disk."""
+        data = {"version": MANIFEST_VERSION, **dataclasses.asdict(self)}
+        path.write_text(json.dumps(data))
+
+    def current(self, modname: str, path: pathlib.Path) -> ModuleManifest | None:
+        """Return the entry for a module if it still matches its source file.
+
+        The digest is only computed when the size or mtime of the file changed.
+        """
+        module = self.modules.get(modname)
+        if module is None:
+            return None
+
+        stat = path.stat()
+        if module.size == stat.st_size and module.mtime_ns == stat.st_mtime_ns:
+            return module
+        if module.size != stat.st_size or module.digest != file_digest(path):
+            return None
+
+        return dataclasses.replace(module, mtime_ns=stat.st_mtime_ns)
+
+
+def _importing_module() -> str | None:
+    """Return the name of the module whose body is currently executing."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        if frame.f_code.co_name == "<module>":
+            return frame.f_globals.get("__name__")
+        frame = frame.f_back
+    return None
+
+
+@contextlib.contextmanager
+def record_registrations(
+    registry: DeviceRegistry = DEVICE_REGISTRY,
+) -> Iterator[dict[str, ModuleRegistrations]]:
+    """Record the quirks each module registers while the context is active."""
+    registrations: dict[str, ModuleRegistrations] = {}
+    add_to_registry = registry.add_to_registry
+    add_to_registry_v2 = registry.add_to_registry_v2
+
+    def _registrations() -> ModuleRegistrations | None:
+        modname = _importing_module()
+        if modname is None:
+            return None
+        return registrations.setdefault(modname, ModuleRegistrations())
+
+    def _add_to_registry(custom_device) -> None:
+        if (module := _registrations()) is not None:
+            module.quirks[custom_device.__name__] = signature_keys(
+                custom_device.signature
+            )
+        add_to_registry(custom_device)
+
+    def _add_to_registry_v2(manufacturer: str, model: str, entry) -> None:
+        module = _registrations()
+        if module is not None and (manufacturer, model) not in module.v2:
+            module.v2.append((manufacturer, model))
+        add_to_registry_v2(manufacturer, model, entry)
+
+    registry.add_to_registry = _add_to_registry
+    registry.add_to_registry_v2 = _add_to_registry_v2
+    try:
+        yield registrations
+    finally:
+        del registry.add_to_registry
+        del registry.add_to_registry_v2
+
+
+class _LazyModelRegistry(dict):
+    """Model to quirk list mapping that imports pending modules on lookup."""
+
+    def __init__(self, loader: LazyQuirkLoader, manufacturer: str | None, *args):
+        super().__init__(*args)
+        self._loader = loader
+        self._manufacturer = manufacturer
+
+    def __missing__(self, model: str | None) -> list:
+        quirks = self[model] = []
+        return quirks
+
+    def __getitem__(self, model: str | None) -> list:
+        self._loader.load((self._manufacturer, model))
+        return super().__getitem__(model)
+
+
+class _LazyManufacturerRegistry(dict):
+    """Manufacturer to model mapping creating lazy model registries."""
+
+    def __init__(self, loader: LazyQuirkLoader, registry: dict):
+        super().__init__()
+        self._loader = loader
+        for manufacturer, models in registry.items():
+            self[manufacturer] = _LazyModelRegistry(loader, manufacturer, models)
+
+    def __missing__(self, manufacturer: str | None) -> _LazyModelRegistry:
+        models = self[manufacturer] = _LazyModelRegistry(self._loader, manufacturer)
+        return models
+
+
+class _LazyV2Registry(dict):
+    """Quirks v2 registry that imports pending modules on lookup."""
+
+    def __init__(self, loader: LazyQuirkLoader, registry: dict):
+        super().__init__(registry)
+        self._loader = loader
+
+    def __missing__(self, key: RegistryKey) -> set:
+        entries = self[key] = set()
+        return entries
+
+    def __contains__(self, key: RegistryKey) -> bool:
+        self._loader.load(key)
+        return super().__contains__(key)
+
+    def __getitem__(self, key: RegistryKey) -> set:
+        self._loader.load(key)
+        return super().__getitem__(key)
+
+
+class LazyQuirkLoader:
+    """Defer importing quirk modules until a device they apply to is looked up."""
+
+    def __init__(self, registry: DeviceRegistry = DEVICE_REGISTRY) -> None:
+        """Init."""
+        self._pending: dict[RegistryKey, list[str]] = {}
+        self._importers: dict[str, Callable[[], bool]] = {}
+        self._paths: dict[str, pathlib.Path] = {}
+        self._rank: dict[str, int] = {}
+        self._loading: bool = False
+        self._touched: set[RegistryKey] = set()
+        self._v1 = _LazyManufacturerRegistry(self, registry._registry)
+        registry._registry = self._v1
+        registry._registry_v2 = _LazyV2Registry(self, registry._registry_v2)
+
+    @classmethod
+    def install(cls, registry: DeviceRegistry = DEVICE_REGISTRY) -> LazyQuirkLoader:
+        """Return the loader installed on `registry`, installing one if needed."""
+        if isinstance(registry._registry, _LazyManufacturerRegistry):
+            return registry._registry._loader
+        return cls(registry)
+
+    @property
+    def pending_modules(self) -> set[str]:
+        """Return the modules that have not been imported yet."""
+        return {modname for modnames in self._pending.values() for modname in modnames}
+
+    def rank(self, modname: str) -> None:
+        """Record the import order of a module, later modules taking priority."""
+        self._rank.setdefault(modname, len(self._rank))
+
+    def defer(
+        self,
+        modname: str,
+        path: pathlib.Path,
+        keys: list[RegistryKey],
+        importer: ModuleImporter,
+    ) -> None:
+        """Import `modname` once one of `keys` is looked up."""
+        self._importers[modname] = functools.partial(importer, modname, path)
+        self._paths[modname] = path
+        for key in keys:
+            modnames = self._pending.setdefault(key, [])
+            if modname not in modnames:
+                modnames.append(modname)
+
+    def forget(self, root: pathlib.Path) -> None:
+        """Drop pending modules located under `root`."""
+        for key, modnames in list(self._pending.items()):
+            modnames[:] = [
+                modname
+                for modname in modnames
+                if not self._paths[modname].is_relative_to(root)
+            ]
+            if not modnames:
+                del self._pending[key]
+
+    def load(self, key: RegistryKey) -> None:
+        """Import the modules registering quirks for `key`."""
+        if key not in self._pending:
+            return
+        if self._loading:
+            self._touched.add(key)
+            return
+
+        self._loading = True
+        self._touched.add(key)
+        try:
+            for modname in self._pending.pop(key):
+                _LOGGER.debug("Lazily loading quirks module %r for %s", modname, key)
+                self._importers[modname]()
+            for touched in self._touched:
+                self._restore_priority(touched)
+        finally:
+            self._loading = False
+            self._touched.clear()
+
+    def _restore_priority(self, key: RegistryKey) -> None:
+        """Order quirks as if every module had been imported up front.
+
+        Quirks registered later take priority, so lazily imported quirks must
+        not jump ahead of custom quirks or of modules later in import order.
+        """
+        manufacturer, model = key
+        models = dict.get(self._v1, manufacturer)
+        quirks = None if models is None else dict.get(models, model)
+        if not quirks:
+            return
+        last = len(self._rank)
+        quirks.sort(key=lambda q: self._rank.get(q.__module__, last), reverse=True)
+
+
+def import_package_module(modname: str, path: pathlib.Path) -> bool:
+    """Import a module of the `zhaquirks` package."""
+    _LOGGER.debug("Loading quirks module %r", modname)
+    importlib.import_module(modname)
+    return True
+
+
+def import_custom_module(modname: str, path: pathlib.Path) -> bool:
+    """Execute a custom quirk module, logging any errors."""
+    _LOGGER.debug("Loading custom quirk module %r", modname)
+    try:
+        spec = importlib.util.spec_from_file_location(
+            modname,
+            path,
+            submodule_search_locations=(
+                [str(path.parent)] if path.name == "__init__.py" else None
+            ),
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[modname] = module
+        spec.loader.exec_module(module)
+    except Exception:
+        _LOGGER.exception("Unexpected exception importing custom quirk %r", modname)
+        return False
+    return True
+
+
+def load_quirks(
+    modules: list[tuple[str, pathlib.Path]],
+    manifest_path: pathlib.Path,
+    importer: ModuleImporter,
+    registry: DeviceRegistry = DEVICE_REGISTRY,
+) -> list[str]:
+    """Register the quirks of a module tree, resolving unchanged modules lazily.
+
+    Only modules whose source changed since the manifest was written are executed,
+    unless a shared module changed: quirk modules may derive their signatures from
+    it, so the whole tree is executed again. Returns the registered modules.
+    """
+    manifest = QuirkManifest.load(manifest_path)
+    current = {
+        modname: module
+        for modname, path in modules
+        if (module := manifest.current(modname, path)) is not None
+    }
+    rebuild = any(
+        not module.registrations.is_lazy
+        for modname, module in manifest.modules.items()
+        if modname not in current
+    )
+    if rebuild:
+        current.clear()
+
+    loader = LazyQuirkLoader.install(registry)
+    updated = QuirkManifest()
+    executed = []
+
+    with record_registrations(registry) as registrations:
+        for modname, path in modules:
+            loader.rank(modname)
+
+            if (module := current.get(modname)) is not None:
+                updated.modules[modname] = module
+                if module.registrations.is_lazy:
+                    loader.defer(modname, path, module.registrations.keys, importer)
+                else:
+                    importer(modname, path)
+                continue
+
+            stat = path.stat()
+            if not importer(modname, path):
+                continue
+
+            executed.append(modname)
+            updated.modules[modname] = ModuleManifest(
+                size=stat.st_size,
+                mtime_ns=stat.st_mtime_ns,
+                digest=file_digest(path),
+                registrations=ModuleRegistrations(),
+            )
+
+    for modname in executed:
+        # Modules imported before recording started appear to register nothing,
+        # which keeps them imported eagerly
+        updated.modules[modname].registrations = registrations.get(
+            modname, ModuleRegistrations()
+        )
+
+    if updated != manifest:
+        _LOGGER.debug("Writing quirk manifest %s", manifest_path)
+        try:
+            updated.save(manifest_path)
+        except OSError as exc:
+            _LOGGER.debug("Failed to write quirk manifest %s: %r", manifest_path, exc)
+
+    return list(updated.modules)
+
+
+def setup_lazy(
+    package_name: str = PACKAGE_NAME,
+    package_path: pathlib.Path = PACKAGE_PATH,
+    manifest_path: pathlib.Path = MANIFEST_PATH,
+    registry: DeviceRegistry = DEVICE_REGISTRY,
+) -> None:
+    """Register the quirks of the `zhaquirks` package, importing modules on demand."""
+    load_quirks(
+        [
+            (package_name, package_path / "__init__.py"),
+            *iter_module_files(package_path, package_name + "."),
+        ],
+        manifest_path,
+        import_package_module,
+        registry,
+    )
+
+
+def setup_lazy_custom(
+    custom_quirks_path: pathlib.Path,
+    registry: DeviceRegistry = DEVICE_REGISTRY,
+) -> bool:
+    """Register custom quirks, caching their manifest under the custom quirks path.
+
+    Returns whether any custom quirk module was loaded or deferred.
+    """
+    LazyQuirkLoader.install(registry).forget(custom_quirks_path)
+    modules = list(iter_module_files(custom_quirks_path))
+
+    # Custom quirk modules are executed again on every setup
+    for modname, _path in modules:
+        sys.modules.pop(modname, None)
+
+    return bool(
+        load_quirks(
+            modules,
+            custom_quirks_path / MANIFEST_NAME,
+            import_custom_module,
+            registry,
+        )
+    )
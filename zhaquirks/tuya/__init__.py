@@ -1,11 +1,16 @@
 """Tuya devices."""
 
-from collections.abc import Callable
+import asyncio
+from collections.abc import Awaitable, Callable
 import dataclasses
 import datetime
 import enum
 import logging
+import random
+import struct
+import time
 from typing import Any, Optional, Union
+import weakref
 
 from zigpy.quirks import CustomCluster, CustomDevice
 import zigpy.types as t
@@ -144,6 +149,86 @@ class TuyaDPType(t.enum8):
     BITMAP = 0x05
 
 
+_INT32S_BE = struct.Struct(">i")
+_BITMAP_TYPES = (t.bitmap8, t.bitmap16, t.bitmap32)
+_BITMAPS_BY_LENGTH = {1: t.bitmap8, 2: t.bitmap16, 4: t.bitmap32}
+_BOOL_BYTES = {False: b"\x00", True: b"\x01"}
+
+
+def _uint_to_bytes(value: int, size: int, order: str = "little") -> bytes:
+    """Pack an unsigned integer, raising ValueError when it does not fit."""
+    try:
+        return int(value).to_bytes(size, order)
+    except OverflowError as exc:
+        raise ValueError(f"{value} is not an unsigned {size * 8} bit integer") from exc
+
+
+def _decode_value(raw: bytes) -> t.int32s_be:
+    if len(raw) < _INT32S_BE.size:
+        raise ValueError(f"Data is too short to contain {_INT32S_BE.size} bytes")
+    return t.int32s_be(_INT32S_BE.unpack_from(raw)[0])
+
+
+def _decode_bool(raw: bytes) -> t.Bool:
+    if not raw:
+        raise ValueError("Data is too short to contain 1 bytes")
+    return t.Bool(raw[0])
+
+
+def _decode_enum(raw: bytes) -> t.enum8:
+    if not raw:
+        raise ValueError("Data is too short to contain 1 bytes")
+    return t.enum8(raw[0])
+
+
+def _decode_bitmap(raw: bytes) -> Union[t.bitmap8, t.bitmap16, t.bitmap32]:
+    try:
+        bitmap_type = _BITMAPS_BY_LENGTH[len(raw)]
+    except KeyError as exc:
+        raise ValueError(f"Wrong bitmap length: {len(raw)}") from exc
+    return bitmap_type(int.from_bytes(raw, "little"))
+
+
+def _encode_value(value) -> bytes:
+    try:
+        return _INT32S_BE.pack(int(value))
+    except struct.error as exc:
+        raise ValueError(f"{value} is not an signed 32 bit integer") from exc
+
+
+def _encode_bool(value) -> bytes:
+    try:
+        return _BOOL_BYTES[value]
+    except (KeyError, TypeError):
+        return t.Bool(value).serialize()
+
+
+def _encode_bitmap(value) -> bytes:
+    # bitmaps are sent big endian, while reports are parsed as little endian
+    if isinstance(value, _BITMAP_TYPES):
+        return _uint_to_bytes(value, value._bits // 8, "big")
+    return _uint_to_bytes(value, 1, "big")
+
+
+TUYA_DP_DECODERS: dict[TuyaDPType, Callable[[bytes], Any]] = {
+    TuyaDPType.RAW: lambda raw: raw,
+    TuyaDPType.BOOL: _decode_bool,
+    TuyaDPType.VALUE: _decode_value,
+    TuyaDPType.STRING: lambda raw: t.CharacterString(raw.decode("utf8")),
+    TuyaDPType.ENUM: _decode_enum,
+    TuyaDPType.BITMAP: _decode_bitmap,
+}
+
+TUYA_DP_ENCODERS: dict[TuyaDPType, Callable[[Any], bytes]] = {
+    TuyaDPType.RAW: lambda value: value.serialize(),
+    TuyaDPType.BOOL: _encode_bool,
+    TuyaDPType.VALUE: _encode_value,
+    TuyaDPType.STRING: lambda value: value.encode("utf8"),
+    TuyaDPType.ENUM: lambda value: _uint_to_bytes(value, 1),
+    TuyaDPType.BITMAP: _encode_bitmap,
+}
+
+
 class TuyaData(t.Struct):
     """Tuya Data type."""
 
@@ -151,6 +236,9 @@ class TuyaData(t.Struct):
     function: t.uint8_t
     raw: t.LVBytes
 
+    # (raw, dp_type, payload) of the last decoded payload
+    _decoded = None
+
     @property
     def payload(
         self,
@@ -165,44 +253,29 @@ class TuyaData(t.Struct):
         t.LVBytes,
     ]:
         """Payload accordingly to data point type."""
-        if self.dp_type == TuyaDPType.VALUE:
-            return t.int32s_be.deserialize(self.raw)[0]
-        elif self.dp_type == TuyaDPType.BOOL:
-            return t.Bool.deserialize(self.raw)[0]
-        elif self.dp_type == TuyaDPType.STRING:
-            return t.CharacterString(self.raw.decode("utf8"))
-        elif self.dp_type == TuyaDPType.ENUM:
-            return t.enum8.deserialize(self.raw)[0]
-        elif self.dp_type == TuyaDPType.BITMAP:
-            bitmaps = {1: t.bitmap8, 2: t.bitmap16, 4: t.bitmap32}
-            try:
-                return bitmaps[len(self.raw)].deserialize(self.raw)[0]
-            except KeyError as exc:
-                raise ValueError(f"Wrong bitmap length: {len(self.raw)}") from exc
-        elif self.dp_type == TuyaDPType.RAW:
-            return self.raw
-        else:
-            raise ValueError(f"Unknown {self.dp_type} datapoint type")
+        raw, dp_type = self.raw, self.dp_type
+        decoded = self._decoded
+        if decoded is not None and decoded[0] is raw and decoded[1] == dp_type:
+            return decoded[2]
+
+        try:
+            decoder = TUYA_DP_DECODERS[dp_type]
+        except KeyError as exc:
+            raise ValueError(f"Unknown {dp_type} datapoint type") from exc
+
+        value = decoder(raw)
+        self._decoded = (raw, dp_type, value)
+        return value
 
     @payload.setter
     def payload(self, value):
         """Set payload accordingly to data point type."""
-        if self.dp_type == TuyaDPType.VALUE:
-            self.raw = t.int32s_be(value).serialize()
-        elif self.dp_type == TuyaDPType.BOOL:
-            self.raw = t.Bool(value).serialize()
-        elif self.dp_type == TuyaDPType.STRING:
-            self.raw = value.encode("utf8")
-        elif self.dp_type == TuyaDPType.ENUM:
-            self.raw = t.enum8(value).serialize()
-        elif self.dp_type == TuyaDPType.BITMAP:
-            if not isinstance(value, (t.bitmap8, t.bitmap16, t.bitmap32)):
-                value = t.bitmap8(value)
-            self.raw = value.serialize()[::-1]
-        elif self.dp_type == TuyaDPType.RAW:
-            self.raw = value.serialize()
-        else:
-            raise ValueError(f"Unknown {self.dp_type} datapoint type")
+        try:
+            encoder = TUYA_DP_ENCODERS[self.dp_type]
+        except KeyError as exc:
+            raise ValueError(f"Unknown {self.dp_type} datapoint type") from exc
+
+        self.raw = encoder(value)
 
     def __new__(cls, *args, **kwargs):
         """Disable copy constructor."""
@@ -230,47 +303,58 @@ class TuyaData(t.Struct):
         self.payload = value
 
 
-class Data(t.List, item_type=t.uint8_t):
-    """list of uint8_t."""
+class Data(bytes):
+    """Tuya data payload: a length byte followed by a big endian value."""
 
-    def __init__(self, value=None):
+    def __new__(cls, value=None):
         """Convert from a zigpy typed value to a tuya data payload."""
         if value is None:
-            super().__init__()
-            return
-        if type(value) is list or type(value) is bytes:  # noqa: E721
-            super().__init__(value)
-            return
+            return super().__new__(cls)
+        if type(value) is list or type(value) is bytes or isinstance(value, Data):  # noqa: E721
+            return super().__new__(cls, value)
         # serialized in little-endian by zigpy
-        super().__init__(value.serialize())
+        raw = value.serialize()
         # we want big-endian, with length prepended
-        self.append(len(self))
-        self.reverse()
+        return super().__new__(cls, bytes((len(raw),)) + raw[::-1])
 
     def __int__(self):
         """Convert from a tuya data payload to an int typed value."""
         # first uint8_t is the length of the remaining data
-        # tuya data is in big endian whereas ztypes use little endian
-        ints = {
-            1: t.int8s,
-            2: t.int16s,
-            3: t.int24s,
-            4: t.int32s,
-            5: t.int40s,
-            6: t.int48s,
-            7: t.int56s,
-            8: t.int64s,
-        }
-        return ints[self[0]].deserialize(bytes(reversed(self[1:])))[0]
+        length = self[0]
+        if not 1 <= length <= 8:
+            raise ValueError(f"Wrong data length: {length}")
+        if len(self) <= length:
+            raise ValueError(f"Data is too short to contain {length} bytes")
+        return int.from_bytes(self[-length:], "big", signed=True)
 
     def __iter__(self):
         """Convert from a tuya data payload to a list typed value."""
-        return iter(reversed(self[1:]))
+        return iter(self[:0:-1])
+
+    def __eq__(self, other):
+        """Compare equal to the list of uint8_t it replaces."""
+        if isinstance(other, list):
+            return list(bytes.__iter__(self)) == other
+        return bytes.__eq__(self, other)
+
+    def __ne__(self, other):
+        """Compare unequal to the list of uint8_t it replaces."""
+        return not self == other
+
+    __hash__ = bytes.__hash__
+
+    def __repr__(self) -> str:
+        """Represent as the list of uint8_t it replaces."""
+        return repr(list(bytes.__iter__(self)))
 
     def serialize(self) -> bytes:
-        """Overload serialize to avoid prior implicit conversion to list."""
-        assert self._item_type is not None
-        return b"".join([self._item_type(i).serialize() for i in self[:]])
+        """Serialize without per byte conversion."""
+        return bytes(self)
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> tuple["Data", bytes]:
+        """Consume all the remaining data."""
+        return cls(bytes(data)), b""
 
 
 class TuyaDatapointData(t.Struct):
@@ -529,10 +613,121 @@ class TuyaManufClusterAttributes(TuyaManufCluster):
         return [[foundation.WriteAttributesStatusRecord(foundation.Status.SUCCESS)]]
 
 
+class TuyaSpellScheduler:
+    """Casts the spells of the enchanted devices of an application.
+
+    At most `max_concurrent` devices are enchanted at a time. While other spells
+    are being cast, each one waits a random delay of up to `jitter` seconds
+    first. Failing spells are retried `retries` times with exponential backoff,
+    skipping the spells which already succeeded. Spells cast on a device within
+    the last `record_ttl` seconds are skipped, a re-paired device being a new
+    device instance which gets all of its spells again.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrent: int = 4,
+        jitter: float = 1.0,
+        retries: int = 2,
+        backoff: float = 2.0,
+        record_ttl: float = 300,
+    ) -> None:
+        """Init."""
+        self.jitter = jitter
+        self.retries = retries
+        self.backoff = backoff
+        self.record_ttl = record_ttl
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._casting = 0
+        # device -> spell function -> loop time the spell was cast
+        # (not the bound method, which would keep the device alive)
+        self._enchanted: weakref.WeakKeyDictionary[
+            CustomDevice, dict[Callable[..., Awaitable[Any]], float]
+        ] = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def for_application(cls, application) -> "TuyaSpellScheduler":
+        """Return the spell scheduler of the application."""
+        scheduler = _SPELL_SCHEDULERS.get(application)
+        if scheduler is None:
+            scheduler = _SPELL_SCHEDULERS[application] = cls()
+        return scheduler
+
+    def _pending_spells(
+        self, device: "EnchantedDevice"
+    ) -> list[Callable[[], Awaitable[Any]]]:
+        """Return the enabled spells of the device which weren't cast recently."""
+        cast = self._enchanted.get(device, {})
+        now = asyncio.get_running_loop().time()
+        pending = []
+        for spell in device.spells():
+            cast_at = cast.get(_spell_key(spell))
+            if cast_at is None or now - cast_at >= self.record_ttl:
+                pending.append(spell)
+        return pending
+
+    def is_enchanted(self, device: "EnchantedDevice") -> bool:
+        """Return whether the spells of the device were cast recently."""
+        return not self._pending_spells(device)
+
+    def forget(self, device: CustomDevice) -> None:
+        """Cast the spells of the device again on its next configuration."""
+        self._enchanted.pop(device, None)
+
+    async def cast(self, device: "EnchantedDevice") -> bool:
+        """Cast the spells of the device, return whether they were cast."""
+        spells = self._pending_spells(device)
+        if not spells:
+            device.debug("Tuya spells were already cast on %s", device.ieee)
+            return False
+
+        self._casting += 1
+        try:
+            async with self._slots:
+                if self._casting > 1 and self.jitter:
+                    await asyncio.sleep(random.uniform(0, self.jitter))
+                for attempt in range(self.retries + 1):
+                    try:
+                        while spells:
+                            await spells[0]()
+                            cast = self._enchanted.setdefault(device, {})
+                            cast[_spell_key(spells.pop(0))] = (
+                                asyncio.get_running_loop().time()
+                            )
+                        break
+                    except Exception as exc:
+                        if attempt == self.retries:
+                            raise
+                        delay = self.backoff * 2**attempt
+                        device.debug(
+                            "Tuya spells failed on %s, retrying in %ss: %r",
+                            device.ieee,
+                            delay,
+                            exc,
+                        )
+                        await asyncio.sleep(delay)
+        finally:
+            self._casting -= 1
+
+        return True
+
+
+def _spell_key(spell: Callable[[], Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Return the function of a spell, to record it without its device."""
+    return getattr(spell, "__func__", spell)
+
+
+_SPELL_SCHEDULERS: weakref.WeakKeyDictionary[Any, TuyaSpellScheduler] = (
+    weakref.WeakKeyDictionary()
+)
+
+
 class EnchantedDevice(CustomDevice):
     """Class for Tuya devices which need to be unlocked by casting a 'spell'.
 
-    The spell is applied during device configuration.
+    The spell is applied during device configuration, scheduled by the
+    TuyaSpellScheduler of the application.
     """
 
     # These values can be overridden from a quirk to enable (or disable) additional Tuya spells:
@@ -541,15 +736,25 @@ class EnchantedDevice(CustomDevice):
 
     async def apply_custom_configuration(self, *args, **kwargs):
         """Hooks device configuration to apply custom configuration."""
-        # cast Tuya spell
-        if self.tuya_spell_read_attributes:
-            await self.spell_attribute_reads()
-        if self.tuya_spell_data_query:
-            await self.spell_data_query()
+        await TuyaSpellScheduler.for_application(self.application).cast(self)
 
         # also apply custom configuration to clusters if defined
         await super().apply_custom_configuration(*args, **kwargs)
 
+    def spells(self) -> list[Callable[[], Awaitable[Any]]]:
+        """Return the enabled Tuya spells, in the order they are cast."""
+        spells = []
+        if self.tuya_spell_read_attributes:
+            spells.append(self.spell_attribute_reads)
+        if self.tuya_spell_data_query:
+            spells.append(self.spell_data_query)
+        return spells
+
+    async def cast_spells(self):
+        """Cast the enabled Tuya spells."""
+        for spell in self.spells():
+            await spell()
+
     async def spell_attribute_reads(self):
         """Cast 'attribute read' spell, so the Tuya device works correctly."""
         self.debug(
@@ -1194,6 +1399,98 @@ class TuyaManufacturerWindowCover(TuyaManufCluster):
             )
 
 
+class TuyaCommandCoalescer:
+    """Latest-wins queue for commands setting an absolute target.
+
+    The first command is sent right away. While it is in flight, and for
+    `debounce` seconds after, newer commands replace the queued one so that only
+    the last target is sent. Callers of replaced commands get the result of the
+    command that replaced them.
+    """
+
+    def __init__(
+        self, send: Callable[..., Awaitable[Any]], debounce: float = 0
+    ) -> None:
+        """Init."""
+        self._send = send
+        self.debounce = debounce
+        self._queued: Optional[tuple[tuple, dict[str, Any]]] = None
+        self._waiters: list[asyncio.Future] = []
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def busy(self) -> bool:
+        """Whether a command is in flight or inside the debounce window."""
+        return self._task is not None
+
+    def submit(self, *args, **kwargs) -> asyncio.Future:
+        """Send or queue a command, returning a future of its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # callers are free to not await the result
+        future.add_done_callback(lambda fut: fut.cancelled() or fut.exception() is None)
+        if self._task is not None:
+            self._queued = (args, kwargs)
+            self._waiters.append(future)
+            return future
+
+        result = self._send(*args, **kwargs)
+        if asyncio.isfuture(result) and result.done() and not self.debounce:
+            # nothing in flight, no need to hold back the next command
+            self._resolve([future], result)
+            return future
+        self._task = loop.create_task(self._run(result, [future]))
+        return future
+
+    def clear(self, result: Any = None) -> None:
+        """Drop the queued command, resolving its callers with `result`."""
+        self._queued = None
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(result)
+
+    @staticmethod
+    def _resolve(waiters: list[asyncio.Future], result: asyncio.Future) -> None:
+        for waiter in waiters:
+            if waiter.done():
+                continue
+            if result.cancelled():
+                waiter.cancel()
+            elif result.exception() is not None:
+                waiter.set_exception(result.exception())
+            else:
+                waiter.set_result(result.result())
+
+    async def _run(
+        self, pending: Awaitable[Any], waiters: list[asyncio.Future]
+    ) -> None:
+        try:
+            while True:
+                result = asyncio.ensure_future(pending)
+                await asyncio.wait([result])
+                self._resolve(waiters, result)
+
+                if self.debounce:
+                    await asyncio.sleep(self.debounce)
+                if self._queued is None:
+                    return
+
+                (args, kwargs), self._queued = self._queued, None
+                waiters, self._waiters = self._waiters, []
+                try:
+                    pending = self._send(*args, **kwargs)
+                except Exception as exc:  # noqa: BLE001
+                    pending = asyncio.get_running_loop().create_future()
+                    pending.set_exception(exc)
+        except asyncio.CancelledError:
+            for waiter in waiters + self._waiters:
+                waiter.cancel()
+            raise
+        finally:
+            self._task = None
+
+
 class TuyaWindowCoverControl(LocalDataCluster, WindowCovering):
     """Manufacturer Specific Cluster of Device cover."""
 
@@ -1202,10 +1499,16 @@ class TuyaWindowCoverControl(LocalDataCluster, WindowCovering):
     attributes.update({ATTR_COVER_DIRECTION: ("motor_direction", t.Bool)})
     attributes.update({ATTR_COVER_INVERTED: ("cover_inverted", t.Bool)})
 
+    # seconds newer positions keep replacing the queued one after a position is sent
+    position_debounce: float = 0
+
     def __init__(self, *args, **kwargs):
         """Initialize instance."""
         super().__init__(*args, **kwargs)
         self.endpoint.device.cover_bus.add_listener(self)
+        self._position_coalescer = TuyaCommandCoalescer(
+            self._send_tuya_command, self.position_debounce
+        )
 
     def cover_event(self, attribute, value):
         """Event listener for cover events."""
@@ -1290,25 +1593,41 @@ class TuyaWindowCoverControl(LocalDataCluster, WindowCovering):
             tuya_payload = None
         # Send the command
         if tuya_payload.command_id:
-            _LOGGER.debug(
-                "%s Sending Tuya Command. Paylod values [endpoint_id : %s, "
-                "Status : %s, TSN: %s, Command: 0x%04x, Function: %s, Data: %s]",
-                self.endpoint.device.ieee,
-                self.endpoint.endpoint_id,
-                tuya_payload.status,
-                tuya_payload.tsn,
-                tuya_payload.command_id,
-                tuya_payload.function,
-                tuya_payload.data,
-            )
-
-            return self.endpoint.tuya_manufacturer.command(
-                TUYA_SET_DATA, tuya_payload, expect_reply=True
+            # only the latest of the positions set while one is in flight is sent
+            if command_id == WINDOW_COVER_COMMAND_LIFTPERCENT:
+                return self._position_coalescer.submit(tuya_payload)
+            # anything else overrides the positions still queued
+            self._position_coalescer.clear(
+                foundation.GENERAL_COMMANDS[
+                    foundation.GeneralCommand.Default_Response
+                ].schema(
+                    command_id=WINDOW_COVER_COMMAND_LIFTPERCENT,
+                    status=foundation.Status.SUCCESS,
+                )
             )
+            return self._send_tuya_command(tuya_payload)
         else:
             _LOGGER.debug("Unrecognised command: %x", command_id)
             return foundation.Status.UNSUP_CLUSTER_COMMAND
 
+    def _send_tuya_command(self, tuya_payload: TuyaManufCluster.Command):
+        """Send a set_data command to the Tuya manufacturer cluster."""
+        _LOGGER.debug(
+            "%s Sending Tuya Command. Paylod values [endpoint_id : %s, "
+            "Status : %s, TSN: %s, Command: 0x%04x, Function: %s, Data: %s]",
+            self.endpoint.device.ieee,
+            self.endpoint.endpoint_id,
+            tuya_payload.status,
+            tuya_payload.tsn,
+            tuya_payload.command_id,
+            tuya_payload.function,
+            tuya_payload.data,
+        )
+
+        return self.endpoint.tuya_manufacturer.command(
+            TUYA_SET_DATA, tuya_payload, expect_reply=True
+        )
+
 
 class TuyaWindowCover(CustomDevice):
     """Tuya Window cover device."""
@@ -1372,10 +1691,16 @@ class TuyaManufacturerLevelControl(TuyaManufCluster):
 class TuyaLevelControl(CustomCluster, LevelControl):
     """Tuya Level cluster for dimmable device."""
 
+    # seconds newer levels keep replacing the queued one after a level is sent
+    level_debounce: float = 0
+
     def __init__(self, *args, **kwargs):
         """Init."""
         super().__init__(*args, **kwargs)
         self.endpoint.device.dimmer_bus.add_listener(self)
+        self._level_coalescer = TuyaCommandCoalescer(
+            self._send_level, self.level_debounce
+        )
 
     def level_event(self, channel, state):
         """Level event."""
@@ -1426,12 +1751,17 @@ class TuyaLevelControl(CustomCluster, LevelControl):
             val2 = brightness & 0xFF
             cmd_payload.data = [4, 0, 0, val1, val2]  # Custom Command
 
-            return self.endpoint.tuya_manufacturer.command(
-                TUYA_SET_DATA, cmd_payload, expect_reply=True
-            )
+            # only the latest of the levels set while one is in flight is sent
+            return self._level_coalescer.submit(cmd_payload)
 
         return foundation.Status.UNSUP_CLUSTER_COMMAND
 
+    def _send_level(self, cmd_payload: TuyaManufCluster.Command):
+        """Send a set_data command to the Tuya manufacturer cluster."""
+        return self.endpoint.tuya_manufacturer.command(
+            TUYA_SET_DATA, cmd_payload, expect_reply=True
+        )
+
 
 @dataclasses.dataclass
 class DPToAttributeMapping:
@@ -1512,10 +1842,46 @@ class TuyaNewManufCluster(CustomCluster):
 
     dp_to_attribute: dict[int, DPToAttributeMapping] = {}
     data_point_handlers: dict[int, str] = {}
+    # skip attribute updates from data points reported again with the same value
+    suppress_duplicate_reports: bool = False
+    # seconds after which a duplicate report updates the attributes anyway
+    duplicate_report_refresh_interval: float = 600
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        """Check the data point handlers when the quirk is registered."""
+        super().__init_subclass__(**kwargs)
+        misconfigured = {
+            dp: handler_name
+            for dp, handler_name in cls.data_point_handlers.items()
+            if not callable(getattr(cls, handler_name, None))
+        }
+        if misconfigured:
+            raise ValueError(
+                f"{cls.__name__} has no handlers for data points: {misconfigured}"
+            )
 
     def __init__(self, *args, **kwargs):
         """Initialize the cluster and mark attributes as valid on LocalDataClusters."""
         super().__init__(*args, **kwargs)
+
+        # resolve the command and data point handlers once instead of on every frame,
+        # command handlers are still looked up on the instance so they can be replaced
+        self._command_handlers: dict[tuple[foundation.Direction, int], str] = {}
+        for direction, commands in (
+            (foundation.Direction.Server_to_Client, self.client_commands),
+            (foundation.Direction.Client_to_Server, self.server_commands),
+        ):
+            for command_id, command in commands.items():
+                handler_name = f"handle_{command.name}"
+                if hasattr(self, handler_name):
+                    self._command_handlers[(direction, command_id)] = handler_name
+        self._data_point_handlers: dict[int, Callable[[TuyaDatapointData], Any]] = {
+            dp: getattr(self, handler_name)
+            for dp, handler_name in self.data_point_handlers.items()
+        }
+        # dp -> last reported (dp_type, raw) and when it updated the attributes
+        self._last_dp_reports: dict[int, tuple[tuple[TuyaDPType, bytes], float]] = {}
+
         for dp_map in self.dp_to_attribute.values():
             # get the endpoint that is being mapped to
             endpoint = self.endpoint
@@ -1552,30 +1918,32 @@ class TuyaNewManufCluster(CustomCluster):
         """Handle cluster specific request."""
 
         try:
+            handler_name = self._command_handlers[(hdr.direction, hdr.command_id)]
+        except KeyError:
             if hdr.direction == foundation.Direction.Server_to_Client:
                 # server_cluster -> client_cluster cluster specific command
-                handler_name = f"handle_{self.client_commands[hdr.command_id].name}"
+                commands = self.client_commands
             else:
-                handler_name = f"handle_{self.server_commands[hdr.command_id].name}"
-        except KeyError:
-            self.debug(
-                "Received unknown manufacturer command %s: %s", hdr.command_id, args
-            )
-            if not hdr.frame_control.disable_default_response:
-                self.send_default_rsp(
-                    hdr, status=foundation.Status.UNSUP_CLUSTER_COMMAND
+                commands = self.server_commands
+
+            if hdr.command_id not in commands:
+                self.debug(
+                    "Received unknown manufacturer command %s: %s", hdr.command_id, args
                 )
+                if not hdr.frame_control.disable_default_response:
+                    self.send_default_rsp(
+                        hdr, status=foundation.Status.UNSUP_CLUSTER_COMMAND
+                    )
                 return
 
-        try:
-            status = getattr(self, handler_name)(*args)
-        except AttributeError:
             self.warning(
                 "No '%s' tuya handler found for %s",
-                handler_name,
+                f"handle_{commands[hdr.command_id].name}",
                 args,
             )
             status = foundation.Status.UNSUP_CLUSTER_COMMAND
+        else:
+            status = getattr(self, handler_name)(*args)
 
         if not hdr.frame_control.disable_default_response:
             self.send_default_rsp(hdr, status=status)
@@ -1585,8 +1953,7 @@ class TuyaNewManufCluster(CustomCluster):
         dp_error = False
         for record in command.datapoints:
             try:
-                dp_handler = self.data_point_handlers[record.dp]
-                getattr(self, dp_handler)(record)
+                self._data_point_handlers[record.dp](record)
             except (AttributeError, KeyError):
                 self.debug("No datapoint handler for %s", record)
                 dp_error = True
@@ -1601,6 +1968,22 @@ class TuyaNewManufCluster(CustomCluster):
     handle_set_data_response = handle_get_data
     handle_active_status_report = handle_get_data
 
+    def _is_duplicate_report(self, datapoint: TuyaDatapointData) -> bool:
+        """Check whether the data point value was already reported recently."""
+        now = time.monotonic()
+        report = (datapoint.data.dp_type, bytes(datapoint.data.raw))
+        last = self._last_dp_reports.get(datapoint.dp)
+        if (
+            last is not None
+            and last[0] == report
+            and now - last[1] < self.duplicate_report_refresh_interval
+        ):
+            self.debug("Ignoring duplicate report of %s data point", datapoint.dp)
+            return True
+
+        self._last_dp_reports[datapoint.dp] = (report, now)
+        return False
+
     def handle_set_time_request(self, payload: t.uint16_t) -> foundation.Status:
         """Handle Time set request."""
         return foundation.Status.SUCCESS
@@ -1613,6 +1996,9 @@ class TuyaNewManufCluster(CustomCluster):
             self.debug("No attribute mapping for %s data point", datapoint.dp)
             return
 
+        if self.suppress_duplicate_reports and self._is_duplicate_report(datapoint):
+            return
+
         endpoint = self.endpoint
         if dp_map.endpoint_id:
             endpoint = self.endpoint.device.endpoints[dp_map.endpoint_id]
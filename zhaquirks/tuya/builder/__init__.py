@@ -72,8 +72,19 @@ class TuyaQuirkBuilder(QuirkBuilder):
         self.tuya_data_point_handlers: dict[int, str] = {}
         self.tuya_dp_to_attribute: dict[int, DPToAttributeMapping] = {}
         self.new_attributes: set[foundation.ZCLAttributeDef] = set()
+        self.tuya_duplicate_report_refresh_interval: float | None = None
         super().__init__(manufacturer, model, registry)
 
+    def tuya_suppress_duplicate_reports(
+        self, refresh_interval: float = TuyaMCUCluster.duplicate_report_refresh_interval
+    ) -> QuirkBuilder:
+        """Skip attribute updates from data points reported again with the same value.
+
+        A duplicate report still updates the attributes after `refresh_interval` seconds.
+        """
+        self.tuya_duplicate_report_refresh_interval = refresh_interval
+        return self
+
     def tuya_battery(
         self,
         dp_id: int,
@@ -481,8 +492,13 @@ class TuyaQuirkBuilder(QuirkBuilder):
         class TuyaReplacementCluster(TuyaMCUCluster):
             """Replacement Tuya Cluster."""
 
-            data_point_handlers: dict[int, str]
-            dp_to_attribute: dict[int, DPToAttributeMapping]
+            data_point_handlers: dict[int, str] = self.tuya_data_point_handlers
+            if self.tuya_duplicate_report_refresh_interval is not None:
+                suppress_duplicate_reports = True
+                duplicate_report_refresh_interval = (
+                    self.tuya_duplicate_report_refresh_interval
+                )
+            dp_to_attribute: dict[int, DPToAttributeMapping] = self.tuya_dp_to_attribute
 
             class AttributeDefs(NewAttributeDefs):
                 """Attribute Definitions."""
@@ -494,8 +510,5 @@ class TuyaQuirkBuilder(QuirkBuilder):
                     attributes, manufacturer=foundation.ZCLHeader.NO_MANUFACTURER_ID
                 )
 
-        TuyaReplacementCluster.data_point_handlers = self.tuya_data_point_handlers
-        TuyaReplacementCluster.dp_to_attribute = self.tuya_dp_to_attribute
-
         self.replaces(TuyaReplacementCluster)
         return super().add_to_registry()
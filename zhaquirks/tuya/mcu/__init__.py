@@ -1,5 +1,6 @@
 """Tuya MCU communications."""
 
+import asyncio
 from collections.abc import Callable
 import dataclasses
 import datetime
@@ -21,6 +22,7 @@ from zhaquirks.tuya import (
     NoManufacturerCluster,
     PowerOnState,
     TuyaCommand,
+    TuyaCommandCoalescer,
     TuyaDatapointData,
     TuyaLocalCluster,
     TuyaNewManufCluster,
@@ -124,6 +126,129 @@ class TuyaAttributesCluster(TuyaLocalCluster):
         return [[foundation.WriteAttributesStatusRecord(foundation.Status.SUCCESS)]]
 
 
+class TuyaCommandPipeline:
+    """Outgoing set_data commands of a Tuya MCU device.
+
+    Limits the number of commands waiting for their set_data_response, which is
+    matched by tsn, so bursts of writes don't overflow the buffer of the MCU.
+    Until the device is seen answering with set_data_response, commands only
+    occupy a slot while they are being sent.
+    """
+
+    def __init__(
+        self,
+        cluster: TuyaNewManufCluster,
+        max_in_flight: int,
+        response_timeout: float,
+    ) -> None:
+        """Init."""
+        self._cluster = cluster
+        self._slots = asyncio.Semaphore(max_in_flight)
+        # tsn -> future of the response, the timer giving up on it and whether the
+        # command still occupies a slot
+        self._responses: dict[
+            int,
+            tuple[asyncio.Future[Optional[TuyaCommand]], asyncio.TimerHandle, bool],
+        ] = {}
+        self.response_timeout = response_timeout
+        self.sends_responses = False
+
+    @property
+    def in_flight(self) -> int:
+        """Number of commands waiting for their response."""
+        return len(self._responses)
+
+    def send(
+        self,
+        command: TuyaCommand,
+        *,
+        expect_reply: bool,
+        manufacturer: Optional[int],
+        future: Optional[asyncio.Future[Optional[TuyaCommand]]] = None,
+    ) -> asyncio.Future[Optional[TuyaCommand]]:
+        """Queue a set_data command.
+
+        The returned future resolves to the set_data_response of the command,
+        or None if the device did not answer in time.
+        """
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+        # callers are free to not await the result
+        future.add_done_callback(lambda fut: fut.cancelled() or fut.exception() is None)
+        self._cluster.create_catching_task(
+            self._send(command, future, expect_reply, manufacturer)
+        )
+        return future
+
+    async def _send(
+        self,
+        command: TuyaCommand,
+        future: asyncio.Future[Optional[TuyaCommand]],
+        expect_reply: bool,
+        manufacturer: Optional[int],
+    ) -> None:
+        await self._slots.acquire()
+        # a previous command with the same tsn won't be answered anymore
+        self._expire(command.tsn)
+        # the response may arrive before the command returns, so wait for it first
+        self._responses[command.tsn] = (
+            future,
+            asyncio.get_running_loop().call_later(
+                self.response_timeout, self._expire, command.tsn
+            ),
+            True,
+        )
+        try:
+            await self._cluster.command(
+                TUYA_SET_DATA,
+                command,
+                expect_reply=expect_reply,
+                manufacturer=manufacturer,
+            )
+        except BaseException as exc:
+            pending = self._responses.get(command.tsn)
+            if pending is not None and pending[0] is future:
+                del self._responses[command.tsn]
+                pending[1].cancel()
+                self._slots.release()
+            if not future.done():
+                future.set_exception(exc)
+            raise
+
+        # the slot is released by the response, or when giving up waiting for it
+        pending = self._responses.get(command.tsn)
+        if pending is not None and pending[0] is future and not self.sends_responses:
+            self._slots.release()
+            self._responses[command.tsn] = (future, pending[1], False)
+
+    def _expire(self, tsn: int) -> None:
+        """Stop waiting for the response of a command."""
+        if (pending := self._responses.pop(tsn, None)) is None:
+            return
+
+        future, timer, holds_slot = pending
+        timer.cancel()
+        if holds_slot:
+            self._slots.release()
+        if not future.done():
+            self._cluster.debug("No set_data_response for tsn %s", tsn)
+            future.set_result(None)
+
+    def handle_response(self, response: TuyaCommand) -> bool:
+        """Resolve the command answered by a set_data_response."""
+        self.sends_responses = True
+        if (pending := self._responses.pop(response.tsn, None)) is None:
+            return False
+
+        future, timer, holds_slot = pending
+        timer.cancel()
+        if holds_slot:
+            self._slots.release()
+        if not future.done():
+            future.set_result(response)
+        return True
+
+
 class TuyaMCUCluster(TuyaAttributesCluster, TuyaNewManufCluster):
     """Manufacturer specific cluster for sending Tuya MCU commands."""
 
@@ -204,12 +329,43 @@ class TuyaMCUCluster(TuyaAttributesCluster, TuyaNewManufCluster):
         }
     )
 
+    # seconds to wait for more data point writes to send them in the same set_data
+    # command, only the data points written in one event loop iteration (as those of
+    # a single write) are batched when 0
+    set_data_batch_window: float = 0
+    # set_data commands sent before waiting for their set_data_response
+    set_data_max_in_flight: int = 3
+    # seconds to wait for the set_data_response of a command
+    set_data_response_timeout: float = 5
+
+    # dp_to_attribute it was built from, with its size, and the index:
+    # (endpoint_id, attribute_name) -> {dp: mapping}, a None endpoint_id standing for
+    # the endpoint of the cluster itself
+    _dp_index: Optional[
+        tuple[
+            dict[int, DPToAttributeMapping],
+            int,
+            dict[tuple[Optional[int], str], dict[int, DPToAttributeMapping]],
+        ]
+    ] = None
+
     def __init__(self, *args, **kwargs):
         """Init."""
         super().__init__(*args, **kwargs)
         # Cluster for endpoint: 1 (listen MCU commands)
         self.endpoint.device.command_bus = Bus()
         self.endpoint.device.command_bus.add_listener(self)
+        self.endpoint.device.tuya_command_pipeline = TuyaCommandPipeline(
+            self, self.set_data_max_in_flight, self.set_data_response_timeout
+        )
+        # (expect_reply, manufacturer) -> set_data command waiting to be sent, with
+        # the future of its response
+        self._set_data_batches: dict[
+            tuple[bool, Optional[int]],
+            tuple[TuyaCommand, asyncio.Future[Optional[TuyaCommand]]],
+        ] = {}
+        self._set_data_timer: Optional[asyncio.TimerHandle] = None
+        self._set_data_flush: Optional[asyncio.Task] = None
 
     def from_cluster_data(self, data: TuyaClusterData) -> Optional[TuyaCommand]:
         """Convert from cluster data to a tuya data payload."""
@@ -254,8 +410,14 @@ class TuyaMCUCluster(TuyaAttributesCluster, TuyaNewManufCluster):
             tuya_commands.append(cmd_payload)
         return tuya_commands
 
-    def tuya_mcu_command(self, cluster_data: TuyaClusterData):
-        """Tuya MCU command listener. Only manufacturer endpoint must listen to MCU commands."""
+    def tuya_mcu_command(
+        self, cluster_data: TuyaClusterData
+    ) -> Optional[asyncio.Future[Optional[TuyaCommand]]]:
+        """Tuya MCU command listener. Only manufacturer endpoint must listen to MCU commands.
+
+        The data points written until the set_data batch is sent are merged into a
+        single command. Returns a future of its set_data_response, if one is sent.
+        """
 
         self.debug(
             "tuya_mcu_command: cluster_data=%s",
@@ -269,46 +431,137 @@ class TuyaMCUCluster(TuyaAttributesCluster, TuyaNewManufCluster):
                 "no MCU command for data %s",
                 cluster_data,
             )
-            return
+            return None
 
-        for tuya_command in tuya_commands:
-            self.create_catching_task(
-                self.command(
-                    TUYA_SET_DATA,
-                    tuya_command,
-                    expect_reply=cluster_data.expect_reply,
-                    manufacturer=cluster_data.manufacturer,
-                )
+        key = (cluster_data.expect_reply, cluster_data.manufacturer)
+        if key not in self._set_data_batches:
+            self._set_data_batches[key] = (
+                tuya_commands.pop(0),
+                asyncio.get_running_loop().create_future(),
             )
+        batch, future = self._set_data_batches[key]
+        for tuya_command in tuya_commands:
+            batch.tsn = tuya_command.tsn
+            for datapoint in tuya_command.datapoints:
+                # a later write of the same data point replaces the pending one
+                batch.datapoints = [
+                    dpd for dpd in batch.datapoints if dpd.dp != datapoint.dp
+                ]
+                batch.datapoints.append(datapoint)
+
+        # the device reporting the previous value again is not a duplicate
+        for datapoint in batch.datapoints:
+            self._last_dp_reports.pop(datapoint.dp, None)
 
         endpoint = self.endpoint.device.endpoints[cluster_data.endpoint_id]
         cluster = getattr(endpoint, cluster_data.cluster_name)
         cluster.update_attribute(cluster_data.cluster_attr, cluster_data.attr_value)
 
+        # the records of a single write arrive one by one, without yielding to the
+        # event loop in between, so they are sent together by a task started now
+        if self.set_data_batch_window:
+            if self._set_data_timer is None:
+                self._set_data_timer = asyncio.get_running_loop().call_later(
+                    self.set_data_batch_window, self._send_set_data_batches
+                )
+        elif self._set_data_flush is None:
+            self._set_data_flush = self.create_catching_task(
+                self._flush_set_data_batches()
+            )
+
+        return future
+
+    async def _flush_set_data_batches(self) -> None:
+        """Send the set_data commands batched since this task was started."""
+
+        self._set_data_flush = None
+        self._send_set_data_batches()
+
+    def _send_set_data_batches(self) -> None:
+        """Send the pending set_data commands."""
+
+        if self._set_data_timer is not None:
+            self._set_data_timer.cancel()
+            self._set_data_timer = None
+
+        batches, self._set_data_batches = self._set_data_batches, {}
+        for (expect_reply, manufacturer), (tuya_command, future) in batches.items():
+            self.endpoint.device.tuya_command_pipeline.send(
+                tuya_command,
+                expect_reply=expect_reply,
+                manufacturer=manufacturer,
+                future=future,
+            )
+
+    def _dp_mappings_by_attribute(
+        self, rebuild: bool = False
+    ) -> dict[tuple[Optional[int], str], dict[int, DPToAttributeMapping]]:
+        """Index the data point mappings by the attributes they are written from.
+
+        The index is rebuilt when dp_to_attribute is replaced or changes size.
+        """
+
+        dp_to_attribute = self.dp_to_attribute
+        cached = type(self)._dp_index
+        if (
+            not rebuild
+            and cached is not None
+            and cached[0] is dp_to_attribute
+            and cached[1] == len(dp_to_attribute)
+        ):
+            return cached[2]
+
+        index: dict[tuple[Optional[int], str], dict[int, DPToAttributeMapping]] = {}
+        for dp, dp_mapping in dp_to_attribute.items():
+            attribute_names = dp_mapping.attribute_name
+            if not isinstance(attribute_names, tuple):
+                attribute_names = (attribute_names,)
+            for attribute_name in attribute_names:
+                index.setdefault((dp_mapping.endpoint_id, attribute_name), {})[dp] = (
+                    dp_mapping
+                )
+        type(self)._dp_index = (dp_to_attribute, len(dp_to_attribute), index)
+        return index
+
     def get_dp_mapping(
         self, endpoint_id: int, attribute_name: str
-    ) -> Optional[tuple[int, DPToAttributeMapping]]:
+    ) -> dict[int, DPToAttributeMapping]:
         """Search for the DP in dp_to_attribute."""
 
-        result = {}
-        for dp, dp_mapping in self.dp_to_attribute.items():
-            if (
-                attribute_name == dp_mapping.attribute_name
-                or (
-                    isinstance(dp_mapping.attribute_name, tuple)
-                    and attribute_name in dp_mapping.attribute_name
-                )
-            ) and (
-                (
-                    dp_mapping.endpoint_id is None
-                    and endpoint_id == self.endpoint.endpoint_id
-                )
-                or (endpoint_id == dp_mapping.endpoint_id)
-            ):
-                self.debug("get_dp_mapping --> found DP: %s", dp)
-                result[dp] = dp_mapping
+        result = self._find_dp_mapping(
+            self._dp_mappings_by_attribute(), endpoint_id, attribute_name
+        )
+        if not result or any(
+            self.dp_to_attribute.get(dp) is not mapping
+            for dp, mapping in result.items()
+        ):
+            # a mapping changed in place isn't noticed by the index, look again
+            result = self._find_dp_mapping(
+                self._dp_mappings_by_attribute(rebuild=True),
+                endpoint_id,
+                attribute_name,
+            )
+        if result:
+            self.debug("get_dp_mapping --> found DPs: %s", list(result))
+        return result
+
+    def _find_dp_mapping(
+        self,
+        index: dict[tuple[Optional[int], str], dict[int, DPToAttributeMapping]],
+        endpoint_id: int,
+        attribute_name: str,
+    ) -> dict[int, DPToAttributeMapping]:
+        result = dict(index.get((endpoint_id, attribute_name), {}))
+        if endpoint_id == self.endpoint.endpoint_id:
+            result.update(index.get((None, attribute_name), {}))
         return result
 
+    def handle_set_data_response(self, command: TuyaCommand) -> foundation.Status:
+        """Handle set_data_response, resolving the command it answers."""
+
+        self.endpoint.device.tuya_command_pipeline.handle_response(command)
+        return self.handle_get_data(command)
+
     def handle_mcu_version_response(self, payload: MCUVersion) -> foundation.Status:
         """Handle MCU version response."""
 
@@ -552,6 +805,16 @@ class MoesSwitchManufCluster(TuyaOnOffManufCluster):
 class TuyaLevelControl(LevelControl, TuyaLocalCluster):
     """Tuya MCU Level cluster for dimmable device."""
 
+    # seconds newer levels keep replacing the queued one after a level is sent
+    level_debounce: float = 0
+
+    def __init__(self, *args, **kwargs):
+        """Init."""
+        super().__init__(*args, **kwargs)
+        self._level_coalescer = TuyaCommandCoalescer(
+            self._send_level, self.level_debounce
+        )
+
     async def command(
         self,
         command_id: Union[foundation.GeneralCommand, int, t.uint8_t],
@@ -596,9 +859,12 @@ class TuyaLevelControl(LevelControl, TuyaLocalCluster):
 
         # level 0 --> switched off
         if command_id == 0x0004 and not on_off:
-            return foundation.GENERAL_COMMANDS[
+            rsp = foundation.GENERAL_COMMANDS[
                 foundation.GeneralCommand.Default_Response
             ].schema(command_id=command_id, status=foundation.Status.SUCCESS)
+            # don't turn the device back on with a level still queued
+            self._level_coalescer.clear(rsp)
+            return rsp
 
         # (move_to_level, move, move_to_level_with_on_off)
         if command_id in (0x0000, 0x0001, 0x0004):
@@ -610,10 +876,8 @@ class TuyaLevelControl(LevelControl, TuyaLocalCluster):
                 expect_reply=expect_reply,
                 manufacturer=manufacturer,
             )
-            self.endpoint.device.command_bus.listener_event(
-                TUYA_MCU_COMMAND,
-                cluster_data,
-            )
+            # only the latest of the levels set while one is in flight is sent
+            self._level_coalescer.submit(cluster_data)
             return foundation.GENERAL_COMMANDS[
                 foundation.GeneralCommand.Default_Response
             ].schema(command_id=command_id, status=foundation.Status.SUCCESS)
@@ -623,6 +887,18 @@ class TuyaLevelControl(LevelControl, TuyaLocalCluster):
             foundation.GeneralCommand.Default_Response
         ].schema(command_id=command_id, status=foundation.Status.UNSUP_CLUSTER_COMMAND)
 
+    def _send_level(self, cluster_data: TuyaClusterData) -> asyncio.Future:
+        """Send a level, returning a future done once the device answered it."""
+        futures = self.endpoint.device.command_bus.listener_event(
+            TUYA_MCU_COMMAND,
+            cluster_data,
+        )
+        pipeline = getattr(self.endpoint.device, "tuya_command_pipeline", None)
+        if pipeline is None or not pipeline.sends_responses:
+            # without set_data_response there is no telling when it was handled
+            futures = []
+        return asyncio.gather(*(fut for fut in futures if asyncio.isfuture(fut)))
+
 
 class TuyaInWallLevelControl(TuyaAttributesCluster, TuyaLevelControl):
     """Tuya Level cluster for inwall dimmable device."""
@@ -1,7 +1,9 @@
 """Map from manufacturer to standard clusters for thermostatic valves."""
 
+from collections.abc import Sequence
 import logging
-from typing import Optional, Union
+import struct
+from typing import Any, Optional, Union
 
 from zigpy.profiles import zha
 import zigpy.types as t
@@ -188,6 +190,56 @@ class data144(t.FixedList, item_type=t.uint8_t, length=18):
     """General data, Discrete, 144 bit."""
 
 
+class MoesSchedule:
+    """Codec of a Moes schedule data point.
+
+    The data point holds six (hour, minute, temperature) slots, one byte each,
+    which map to the attributes `attr_ids` (in data point order) with
+    temperatures in centidegrees.
+    """
+
+    FRAME = struct.Struct(">" + "BBB" * 6)
+
+    def __init__(self, attr_ids: Sequence[int], defaults: Sequence[int]) -> None:
+        """Init."""
+        self.attr_ids = tuple(attr_ids)
+        self.defaults = tuple(defaults)
+
+    @classmethod
+    def from_attributes(
+        cls, cluster: type[LocalDataCluster], schedule_attrs: dict[str, int]
+    ) -> "MoesSchedule":
+        """Build the codec of a `{attribute name: default}` slots mapping.
+
+        The mapping lists the slots from last to first, like data144.
+        """
+        names = list(reversed(schedule_attrs))
+        return cls(
+            [cluster.attributes_by_name[name].id for name in names],
+            [schedule_attrs[name] for name in names],
+        )
+
+    def decode(self, value: data144) -> list[int]:
+        """Return the attribute values of a reported schedule."""
+        try:
+            fields = iter(self.FRAME.unpack(bytes(reversed(value))))
+        except struct.error as exc:
+            raise ValueError(f"Wrong schedule length: {len(value)}") from exc
+        values = []
+        for hour, minute, temperature in zip(fields, fields, fields):
+            # top bits of the hour flag the current slot
+            values += (hour & 0x3F, minute, temperature * 100)
+        return values
+
+    def encode(self, values: Sequence[int]) -> data144:
+        """Return the data point value of the schedule attribute values."""
+        fields = []
+        slots = iter(values)
+        for hour, minute, temperature in zip(slots, slots, slots):
+            fields += (hour, minute, round(temperature / 100))
+        return data144(reversed(self.FRAME.pack(*fields)))
+
+
 class MoesManufCluster(TuyaManufClusterAttributes):
     """Manufacturer Specific Cluster of some thermostatic valves."""
 
@@ -513,50 +565,6 @@ class MoesThermostat(TuyaThermostatCluster):
                     self.attributes_by_name["operation_preset"].id, 2
                 )
             }
-        if attribute in self.WORKDAY_SCHEDULE_ATTRS:
-            data = data144()
-            for num, (attr, default) in enumerate(self.WORKDAY_SCHEDULE_ATTRS.items()):
-                if num % 3 == 0:
-                    if attr == attribute:
-                        val = round(value / 100)
-                    else:
-                        val = round(
-                            self._attr_cache.get(
-                                self.attributes_by_name[attr].id, default
-                            )
-                            / 100
-                        )
-                elif attr == attribute:
-                    val = value
-                else:
-                    val = self._attr_cache.get(
-                        self.attributes_by_name[attr].id, default
-                    )
-
-                data.append(val)
-            return {MOES_SCHEDULE_WORKDAY_ATTR: data}
-        if attribute in self.WEEKEND_SCHEDULE_ATTRS:
-            data = data144()
-            for num, (attr, default) in enumerate(self.WEEKEND_SCHEDULE_ATTRS.items()):
-                if num % 3 == 0:
-                    if attr == attribute:
-                        val = round(value / 100)
-                    else:
-                        val = round(
-                            self._attr_cache.get(
-                                self.attributes_by_name[attr].id, default
-                            )
-                            / 100
-                        )
-                elif attr == attribute:
-                    val = value
-                else:
-                    val = self._attr_cache.get(
-                        self.attributes_by_name[attr].id, default
-                    )
-
-                data.append(val)
-            return {MOES_SCHEDULE_WEEKEND_ATTR: data}
 
     def mode_change(self, value):
         """System Mode change."""
@@ -584,132 +592,95 @@ class MoesThermostat(TuyaThermostatCluster):
         )
         self._update_attribute(self.attributes_by_name["occupancy"].id, occupancy)
 
+    @classmethod
+    def schedule_tables(
+        cls,
+    ) -> tuple[dict[int, MoesSchedule], dict[int, tuple[int, int]]]:
+        """Return the schedule codecs and slot fields, built once per class.
+
+        The codecs are keyed by manufacturer attribute, the fields map schedule
+        attribute ids to their (manufacturer attribute, slot field index).
+        """
+        tables = cls.__dict__.get("_schedule_tables")
+        if tables is None:
+            codecs = {
+                MOES_SCHEDULE_WORKDAY_ATTR: MoesSchedule.from_attributes(
+                    cls, cls.WORKDAY_SCHEDULE_ATTRS
+                ),
+                MOES_SCHEDULE_WEEKEND_ATTR: MoesSchedule.from_attributes(
+                    cls, cls.WEEKEND_SCHEDULE_ATTRS
+                ),
+            }
+            fields = {
+                attrid: (manuf_attr, index)
+                for manuf_attr, codec in codecs.items()
+                for index, attrid in enumerate(codec.attr_ids)
+            }
+            tables = cls._schedule_tables = (codecs, fields)
+        return tables
+
     def schedule_change(self, attr, value):
         """Scheduler attribute change."""
 
-        if attr == MOES_SCHEDULE_WORKDAY_ATTR:
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_1_hour"].id, value[17] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_1_minute"].id, value[16]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_1_temperature"].id,
-                value[15] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_2_hour"].id, value[14] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_2_minute"].id, value[13]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_2_temperature"].id,
-                value[12] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_3_hour"].id, value[11] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_3_minute"].id, value[10]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_3_temperature"].id,
-                value[9] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_4_hour"].id, value[8] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_4_minute"].id, value[7]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_4_temperature"].id,
-                value[6] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_5_hour"].id, value[5] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_5_minute"].id, value[4]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_5_temperature"].id,
-                value[3] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_6_hour"].id, value[2] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_6_minute"].id, value[1]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_6_temperature"].id,
-                value[0] * 100,
-            )
-        elif attr == MOES_SCHEDULE_WEEKEND_ATTR:
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_1_hour"].id, value[17] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_1_minute"].id, value[16]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_1_temperature"].id,
-                value[15] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_2_hour"].id, value[14] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_2_minute"].id, value[13]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_2_temperature"].id,
-                value[12] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_3_hour"].id, value[11] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_3_minute"].id, value[10]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_3_temperature"].id,
-                value[9] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_4_hour"].id, value[8] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_4_minute"].id, value[7]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_4_temperature"].id,
-                value[6] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_5_hour"].id, value[5] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_5_minute"].id, value[4]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_5_temperature"].id,
-                value[3] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_6_hour"].id, value[2] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_6_minute"].id, value[1]
+        codecs, _ = self.schedule_tables()
+        codec = codecs.get(attr)
+        if codec is None:
+            return
+
+        try:
+            slot_values = codec.decode(value)
+        except ValueError as exc:
+            self.debug("Dropping schedule report %s: %s", value, exc)
+            return
+
+        # a schedule is reported as a whole, only update the slots that changed
+        cache = self._attr_cache
+        for attrid, slot_value in zip(codec.attr_ids, slot_values):
+            if cache.get(attrid) != slot_value:
+                self._update_attribute(attrid, slot_value)
+
+    async def write_attributes(self, attributes, manufacturer=None):
+        """Write the schedule slots, sending each changed schedule once."""
+
+        codecs, fields = self.schedule_tables()
+        records = self._write_attr_records(attributes)
+        schedule_writes: dict[int, dict[int, Any]] = {}
+        other_attrs = {}
+        for record in records:
+            if record.attrid in fields:
+                manuf_attr, index = fields[record.attrid]
+                schedule_writes.setdefault(manuf_attr, {})[index] = record.value.value
+            else:
+                other_attrs[record.attrid] = record.value.value
+
+        if not schedule_writes:
+            return await super().write_attributes(attributes, manufacturer=manufacturer)
+
+        manufacturer_attrs = {}
+        for manuf_attr, slot_values in schedule_writes.items():
+            codec = codecs[manuf_attr]
+            current = [
+                self._attr_cache.get(attrid, default)
+                for attrid, default in zip(codec.attr_ids, codec.defaults)
+            ]
+            values = list(current)
+            for index, value in slot_values.items():
+                values[index] = value
+            data = codec.encode(values)
+            if data != codec.encode(current):
+                manufacturer_attrs[manuf_attr] = data
+
+        if manufacturer_attrs:
+            await self.endpoint.tuya_manufacturer.write_attributes(
+                manufacturer_attrs, manufacturer=manufacturer
             )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_6_temperature"].id,
-                value[0] * 100,
+        if other_attrs:
+            return await super().write_attributes(
+                other_attrs, manufacturer=manufacturer
             )
 
+        return [[foundation.WriteAttributesStatusRecord(foundation.Status.SUCCESS)]]
+
 
 class MoesThermostatNew(MoesThermostat):
     """Thermostat cluster for the new _TZE200_b6wax7g0 thermostatic valve."""
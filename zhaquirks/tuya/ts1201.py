@@ -4,7 +4,11 @@ Heavily inspired by work from @mak-42
 https://github.com/Koenkk/zigbee-herdsman-converters/blob/9d5e7b902479582581615cbfac3148d66d4c675c/lib/zosung.js
 """
 
+from __future__ import annotations
+
+import asyncio
 import base64
+import functools
 import logging
 from typing import Any, Final, Optional, Union
 
@@ -24,6 +28,7 @@ from zigpy.zcl.clusters.general import (
     Time,
 )
 
+from zhaquirks import TimerWheel
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -35,6 +40,27 @@ from zhaquirks.const import (
 
 _LOGGER = logging.getLogger(__name__)
 
+IR_CHUNK_SIZE = 0x38
+IR_TRANSFER_WINDOW = 3
+IR_TRANSFER_TIMEOUT = 2.0
+IR_TRANSFER_RETRIES = 3
+IR_MSG_STORE_SIZE = 4
+IR_MSG_TIMEOUT = 60
+IR_CODE_CACHE_SIZE = 32
+
+# state of each byte of a transfer
+_MISSING = b"\x00"
+_REQUESTED = b"\x01"
+_RECEIVED = b"\x02"
+_FILL = {
+    state: memoryview(state * 0x100) for state in (_MISSING, _REQUESTED, _RECEIVED)
+}
+
+
+def ir_checksum(data: bytes | memoryview) -> int:
+    """Checksum of an IR message part, the sum of its bytes."""
+    return sum(memoryview(data)) & 0xFF
+
 
 class Bytes(bytes):
     """Bytes serializable class."""
@@ -49,6 +75,203 @@ class Bytes(bytes):
         return cls(data), b""
 
 
+@functools.lru_cache(maxsize=IR_CODE_CACHE_SIZE)
+def ir_send_message(code: str) -> bytes:
+    """Return the encoded message sending an IR code, cached for repeated codes."""
+    return (
+        f'{{"key_num":1,"delay":300,"key1":'
+        f'{{"num":1,"freq":38000,"type":1,"key_code":"{code}"}}}}'
+    ).encode()
+
+
+class ZosungIRMessageStore:
+    """IR messages being sent to a device, by sequence.
+
+    Holds at most `maxsize` messages, evicting the oldest. A message is
+    dropped once the device reports it sent, or after `timeout` seconds.
+    """
+
+    def __init__(
+        self, maxsize: int = IR_MSG_STORE_SIZE, timeout: float = IR_MSG_TIMEOUT
+    ) -> None:
+        """Init."""
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._messages: dict[int, bytes] = {}
+
+    def __len__(self) -> int:
+        """Return the number of stored messages."""
+        return len(self._messages)
+
+    def __contains__(self, seq: int) -> bool:
+        """Return whether the message of a sequence is stored."""
+        return seq in self._messages
+
+    def __getitem__(self, seq: int) -> bytes:
+        """Return the message of a sequence."""
+        return self._messages[seq]
+
+    def get(self, seq: int) -> bytes | None:
+        """Return the message of a sequence, if stored."""
+        return self._messages.get(seq)
+
+    def add(self, seq: int, message: bytes) -> None:
+        """Store the message being sent with a sequence."""
+        self.discard(seq)
+        while len(self._messages) >= self.maxsize:
+            self.discard(next(iter(self._messages)))
+
+        self._messages[seq] = message
+        TimerWheel.for_loop().schedule(
+            (self, seq), self.timeout, functools.partial(self._expire, seq)
+        )
+
+    def discard(self, seq: int) -> None:
+        """Drop the message of a sequence."""
+        if self._messages.pop(seq, None) is not None:
+            TimerWheel.for_loop().cancel((self, seq))
+
+    def _expire(self, seq: int) -> None:
+        if self._messages.pop(seq, None) is not None:
+            _LOGGER.debug("IR message %s was not requested in time", seq)
+
+
+class ZosungIRTransfer:
+    """IR message received from the device in chunks.
+
+    Up to `window` chunks are requested at a time. The device may answer a
+    request with fewer bytes than asked for, the remainder is requested again
+    and the chunk size shrinks to what the device answered. Without progress
+    for `timeout` seconds the outstanding chunks are requested again, up to
+    `retries` times.
+    """
+
+    def __init__(
+        self,
+        cluster: ZosungIRTransmit,
+        seq: int,
+        length: int,
+        *,
+        chunk_size: int = IR_CHUNK_SIZE,
+        window: int = IR_TRANSFER_WINDOW,
+        timeout: float = IR_TRANSFER_TIMEOUT,
+        retries: int = IR_TRANSFER_RETRIES,
+    ) -> None:
+        """Init."""
+        self._cluster = cluster
+        self.seq = seq
+        self.length = length
+        self.chunk_size = chunk_size
+        self.window = window
+        self.timeout = timeout
+        self.retries = retries
+
+        self.data = bytearray(length)
+        self.received = 0
+        self.done = False
+        self._state = bytearray(length)
+        # position -> end of the requested chunks
+        self._in_flight: dict[int, int] = {}
+        self._attempts = 0
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def progress(self) -> float:
+        """Fraction of the message received."""
+        return self.received / self.length if self.length else 1.0
+
+    def start(self) -> None:
+        """Request the first chunks."""
+        self._request_chunks()
+
+    def cancel(self) -> None:
+        """Stop requesting chunks."""
+        self.done = True
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def chunk_received(self, position: int, msgpart: bytes, crc: int) -> bool:
+        """Store a received chunk, return whether the message is complete."""
+        if self.done:
+            return False
+
+        end = self._in_flight.pop(position, None)
+        part = memoryview(msgpart)[: max(self.length - position, 0)]
+        stop = position + len(part)
+        if ir_checksum(msgpart) != crc:
+            _LOGGER.debug(
+                "Checksum mismatch of IR message part at %s from %s",
+                position,
+                self._cluster.endpoint.device.ieee,
+            )
+            stop = position
+        elif part:
+            self.data[position:stop] = part
+            self._state[position:stop] = _FILL[_RECEIVED][: len(part)]
+            self.received = self._state.count(_RECEIVED)
+            self._attempts = 0
+
+        if end is not None and stop < end:
+            if stop > position:
+                self.chunk_size = min(self.chunk_size, stop - position)
+            self._release(stop, end)
+
+        if self.received == self.length:
+            self.cancel()
+            return True
+
+        self._request_chunks()
+        return False
+
+    def _release(self, start: int, end: int) -> None:
+        """Mark the requested bytes of a range as missing again."""
+        self._state[start:end] = self._state[start:end].replace(_REQUESTED, _MISSING)
+
+    def _request_chunks(self) -> None:
+        state = self._state
+        position = 0
+        while len(self._in_flight) < self.window:
+            position = state.find(_MISSING, position)
+            if position < 0:
+                break
+
+            end = min(position + self.chunk_size, self.length)
+            for other in (_REQUESTED, _RECEIVED):
+                found = state.find(other, position, end)
+                if found >= 0:
+                    end = found
+            state[position:end] = _FILL[_REQUESTED][: end - position]
+            self._in_flight[position] = end
+            self._cluster.request_ir_chunk(self.seq, position, end - position)
+            position = end
+
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(
+            self.timeout, self._timed_out
+        )
+
+    def _timed_out(self) -> None:
+        self._timer = None
+        if self._attempts >= self.retries:
+            _LOGGER.warning(
+                "IR message transfer from %s timed out at %s of %s bytes",
+                self._cluster.endpoint.device.ieee,
+                self.received,
+                self.length,
+            )
+            self.cancel()
+            self._cluster.discard_ir_transfer(self.seq)
+            return
+
+        self._attempts += 1
+        for position, end in self._in_flight.items():
+            self._release(position, end)
+        self._in_flight.clear()
+        self._request_chunks()
+
+
 class ZosungIRControl(CustomCluster):
     """Zosung IR Control Cluster (0xE004)."""
 
@@ -120,15 +343,12 @@ class ZosungIRControl(CustomCluster):
                 tsn=tsn,
             )
         elif command_id == self.ServerCommandDefs.IRSend.id:
-            ir_msg = (
-                f'{{"key_num":1,"delay":300,"key1":'
-                f'{{"num":1,"freq":38000,"type":1,"key_code":"{kwargs["code"]}"}}}}'
-            )
+            ir_msg = ir_send_message(kwargs["code"])
             _LOGGER.debug(
                 "Sending IR code: %s to %s", ir_msg, self.endpoint.device.ieee
             )
             seq = self.endpoint.device.next_seq()
-            self.endpoint.device.ir_msg_to_send = {seq: ir_msg}
+            self.endpoint.device.ir_msg_to_send.add(seq, ir_msg)
             self.create_catching_task(
                 self.endpoint.zosung_irtransmit.command(
                     0x00,
@@ -160,9 +380,10 @@ class ZosungIRTransmit(CustomCluster):
     cluster_id = 0xED00
     ep_attribute = "zosung_irtransmit"
 
-    current_position = 0
-    msg_length = 0
-    ir_msg = []
+    def __init__(self, *args, **kwargs):
+        """Init."""
+        super().__init__(*args, **kwargs)
+        self._transfers: dict[int, ZosungIRTransfer] = {}
 
     class ServerCommandDefs(BaseCommandDefs):
         """Server command definitions."""
@@ -282,9 +503,12 @@ class ZosungIRTransmit(CustomCluster):
         if hdr.command_id == self.ServerCommandDefs.receive_ir_frame_00.id:
             _LOGGER.debug("Received IR frame 0x00 from %s", self.endpoint.device.ieee)
 
-            self.current_position = 0
-            self.ir_msg.clear()
-            self.msg_length = args.length
+            transfer = self._transfers.pop(args.seq, None)
+            if transfer is not None:
+                transfer.cancel()
+            transfer = self._transfers[args.seq] = ZosungIRTransfer(
+                self, args.seq, args.length
+            )
 
             cmd_01_args = {
                 "zero": 0,
@@ -299,10 +523,7 @@ class ZosungIRTransmit(CustomCluster):
             self.create_catching_task(
                 super().command(0x01, **cmd_01_args, expect_reply=True)
             )
-            cmd_02_args = {"seq": args.seq, "position": 0, "maxlen": 0x38}
-            self.create_catching_task(
-                super().command(0x02, **cmd_02_args, expect_reply=True)
-            )
+            transfer.start()
         elif hdr.command_id == self.ServerCommandDefs.receive_ir_frame_01.id:
             _LOGGER.debug(
                 "IR-Message-Code01 received, sequence: %s, from %s",
@@ -311,59 +532,55 @@ class ZosungIRTransmit(CustomCluster):
             )
             _LOGGER.debug(
                 "Message to send: %s, to %s",
-                self.endpoint.device.ir_msg_to_send[args.seq],
+                self.endpoint.device.ir_msg_to_send.get(args.seq),
                 self.endpoint.device.ieee,
             )
         elif hdr.command_id == self.ServerCommandDefs.receive_ir_frame_02.id:
             position = args.position
             seq = args.seq
             maxlen = args.maxlen
-            irmsg = self.endpoint.device.ir_msg_to_send[seq]
-            msgpart = irmsg[position : position + maxlen]
-            calculated_crc = 0
-            for x in msgpart:
-                calculated_crc = (calculated_crc + ord(x)) % 0x100
+            irmsg = self.endpoint.device.ir_msg_to_send.get(seq)
+            if irmsg is None:
+                _LOGGER.debug(
+                    "No IR message to send with seq %s to %s",
+                    seq,
+                    self.endpoint.device.ieee,
+                )
+                return
+            msgpart = memoryview(irmsg)[position : position + maxlen]
+            calculated_crc = ir_checksum(msgpart)
             _LOGGER.debug(
                 "Received IR frame 0x02 from %s, msgsrc: %s, position: %s, msgpart: %s",
                 self.endpoint.device.ieee,
                 calculated_crc,
                 position,
-                msgpart,
+                msgpart.tobytes(),
             )
             cmd_03_args = {
                 "zero": 0,
                 "seq": seq,
                 "position": position,
-                "msgpart": msgpart.encode("utf-8"),
+                "msgpart": msgpart.tobytes(),
                 "msgpartcrc": calculated_crc,
             }
             self.create_catching_task(
                 super().command(0x03, **cmd_03_args, expect_reply=True)
             )
         elif hdr.command_id == self.ServerCommandDefs.receive_ir_frame_03.id:
-            msg_part_crc = args.msgpartcrc
-            calculated_crc = 0
-            for x in args.msgpart:
-                calculated_crc = (calculated_crc + x) % 0x100
             _LOGGER.debug(
-                "Received IR frame 0x03 from %s, msgcrc: %s, "
-                "calculated_crc: %s, position: %s",
+                "Received IR frame 0x03 from %s, msgcrc: %s, position: %s",
                 self.endpoint.device.ieee,
-                msg_part_crc,
-                calculated_crc,
+                args.msgpartcrc,
                 args.position,
             )
-            self.ir_msg[args.position :] = args.msgpart
-            if args.position + len(args.msgpart) < self.msg_length:
-                cmd_02_args = {
-                    "seq": args.seq,
-                    "position": args.position + len(args.msgpart),
-                    "maxlen": 0x38,
-                }
-                self.create_catching_task(
-                    super().command(0x02, **cmd_02_args, expect_reply=False)
+            transfer = self._transfers.get(args.seq)
+            if transfer is None:
+                _LOGGER.debug(
+                    "No IR message transfer %s from %s",
+                    args.seq,
+                    self.endpoint.device.ieee,
                 )
-            else:
+            elif transfer.chunk_received(args.position, args.msgpart, args.msgpartcrc):
                 _LOGGER.debug(
                     "IR message completely received from %s", self.endpoint.device.ieee
                 )
@@ -376,13 +593,23 @@ class ZosungIRTransmit(CustomCluster):
             _LOGGER.debug(
                 "IR code has been sent to %s (seq:%s)", self.endpoint.device.ieee, seq
             )
+            self.endpoint.device.ir_msg_to_send.discard(seq)
             cmd_05_args = {"seq": seq, "zero": 0}
             self.create_catching_task(
                 super().command(0x05, **cmd_05_args, expect_reply=False)
             )
         elif hdr.command_id == self.ServerCommandDefs.receive_ir_frame_05.id:
+            self.endpoint.device.ir_msg_to_send.discard(args.seq)
+            transfer = self._transfers.pop(args.seq, None)
+            if transfer is None or not transfer.done:
+                _LOGGER.debug(
+                    "No IR message received with seq %s from %s",
+                    args.seq,
+                    self.endpoint.device.ieee,
+                )
+                return
             self.endpoint.device.last_learned_ir_code = base64.b64encode(
-                bytes(self.ir_msg)
+                transfer.data
             ).decode()
             _LOGGER.info(
                 "IR message really totally received: %s, from %s",
@@ -404,17 +631,28 @@ class ZosungIRTransmit(CustomCluster):
                 self.endpoint.device.ieee,
             )
 
+    def request_ir_chunk(self, seq: int, position: int, maxlen: int) -> None:
+        """Request a chunk of the IR message being received."""
+        cmd_02_args = {"seq": seq, "position": position, "maxlen": maxlen}
+        self.create_catching_task(
+            super().command(0x02, **cmd_02_args, expect_reply=False)
+        )
+
+    def discard_ir_transfer(self, seq: int) -> None:
+        """Forget the IR message being received."""
+        self._transfers.pop(seq, None)
+
 
 class ZosungIRBlaster(CustomDevice):
     """Zosung IR Blaster."""
 
     seq = -1
-    ir_msg_to_send = {}
     last_learned_ir_code = t.CharacterString("")
 
     def __init__(self, *args, **kwargs):
         """Init device."""
         self.seq = 0
+        self.ir_msg_to_send = ZosungIRMessageStore()
         super().__init__(*args, **kwargs)
 
     def next_seq(self):
@@ -4,7 +4,11 @@ See xbee.md for additional information.
 """
 
 import asyncio
+import collections
+from collections.abc import Iterable
+import dataclasses
 import enum
+import functools
 import logging
 from typing import Any, Optional
 
@@ -47,6 +51,11 @@ ATTR_PRESENT_VALUE = 0x0055
 PIN_ANALOG_OUTPUT = 2
 
 REMOTE_AT_COMMAND_TIMEOUT = 30
+REMOTE_AT_MAX_IN_FLIGHT = 4
+# NP, the maximum RF payload of a Zigbee XBee without encryption
+SERIAL_MAX_PAYLOAD = 84
+SERIAL_MAX_IN_FLIGHT = 2
+SERIAL_MAX_QUEUED = 16
 
 
 # https://github.com/zigpy/zigpy-xbee/blob/dev/zigpy_xbee/api.py
@@ -201,6 +210,17 @@ class ATCommandResult(enum.IntEnum):
     TX_FAILURE = 4
 
 
+@dataclasses.dataclass
+class RemoteATResult:
+    """Outcome of a Remote AT command sent with remote_at_many."""
+
+    command: str
+    args: tuple
+    value: Any = None
+    error: Exception | None = None
+    latency: float = 0.0
+
+
 class XBeeBasic(LocalDataCluster, Basic):
     """XBee Basic Cluster."""
 
@@ -295,6 +315,16 @@ class XBeeRemoteATRequest(LocalDataCluster):
             frame_id, future
         )
 
+    def _next_frame_id(self):
+        """Allocate a frame id not used by a request awaiting its response."""
+        response_cluster = self._endpoint.in_clusters[XBEE_AT_RESPONSE_CLUSTER]
+        for _ in range(255):
+            frame_id = self._seq
+            self._seq = (self._seq % 255) + 1
+            if not response_cluster.is_awaiting(frame_id):
+                return frame_id
+        raise RuntimeError("No frame id available for Remote AT command")
+
     def remote_at_command(self, cmd_name, *args, apply_changes=True, **kwargs):
         """Execute a Remote AT Command and Return Response."""
         if hasattr(self._endpoint.device.application, "remote_at_command"):
@@ -326,8 +356,7 @@ class XBeeRemoteATRequest(LocalDataCluster):
 
     async def _command(self, options, command, data, *args):
         _LOGGER.debug("Command %s %s", command, data)
-        frame_id = self._seq
-        self._seq = (self._seq % 255) + 1
+        frame_id = self._next_frame_id()
         schema = (
             t.uint8_t,
             t.uint8_t,
@@ -371,6 +400,44 @@ class XBeeRemoteATRequest(LocalDataCluster):
 
         return future
 
+    async def remote_at_many(
+        self,
+        commands: Iterable[str | tuple],
+        *,
+        apply_changes: bool = True,
+        max_in_flight: int = REMOTE_AT_MAX_IN_FLIGHT,
+    ) -> list[RemoteATResult]:
+        """Execute Remote AT Commands, keeping up to max_in_flight outstanding.
+
+        Commands are given as a name or as a tuple of a name and its arguments.
+        Results are returned in order, failed commands carry their exception.
+        """
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(max_in_flight)
+
+        async def run(command):
+            name, *args = (command,) if isinstance(command, str) else command
+            result = RemoteATResult(name, tuple(args))
+            async with slots:
+                start = loop.time()
+                try:
+                    result.value = await self.remote_at_command(
+                        name, *args, apply_changes=apply_changes
+                    )
+                except Exception as exc:
+                    result.error = exc
+                result.latency = loop.time() - start
+
+            _LOGGER.debug(
+                "Remote AT%s command took %.3fs: %s",
+                name,
+                result.latency,
+                result.error or result.value,
+            )
+            return result
+
+        return list(await asyncio.gather(*(run(command) for command in commands)))
+
     async def command(
         self,
         command_id,
@@ -421,11 +488,24 @@ class XBeeRemoteATResponse(LocalDataCluster):
 
     cluster_id = XBEE_AT_RESPONSE_CLUSTER
 
-    _awaiting = {}
+    def __init__(self, *args, **kwargs):
+        """Init."""
+        super().__init__(*args, **kwargs)
+        self._awaiting = {}
 
     def save_at_request(self, frame_id, future):
         """Save pending request."""
         self._awaiting[frame_id] = (future,)
+        future.add_done_callback(functools.partial(self._discard_at_request, frame_id))
+
+    def is_awaiting(self, frame_id):
+        """Return whether a request with the frame id awaits its response."""
+        return frame_id in self._awaiting
+
+    def _discard_at_request(self, frame_id, future):
+        """Reclaim the frame id of a request done without response, e.g. timed out."""
+        if self._awaiting.get(frame_id, (None,))[0] is future:
+            del self._awaiting[frame_id]
 
     def handle_cluster_request(
         self,
@@ -440,7 +520,11 @@ class XBeeRemoteATResponse(LocalDataCluster):
                 "Remote AT command response: %s",
                 (args.frame_id, args.cmd, args.status, args.value),
             )
-            (fut,) = self._awaiting.pop(args.frame_id)
+            request = self._awaiting.pop(args.frame_id, None)
+            if request is None or request[0].done():
+                _LOGGER.debug("No request awaiting frame id %s", args.frame_id)
+                return
+            (fut,) = request
             try:
                 status = ATCommandResult(args.status)
             except ValueError:
@@ -565,25 +649,28 @@ class XBeeSerialDataCluster(LocalDataCluster):
         tsn=None,
     ):
         """Handle outgoing data."""
-        data = BinaryString(data).serialize()
         return foundation.GENERAL_COMMANDS[
             foundation.GeneralCommand.Default_Response
         ].schema(
             command_id=0x00,
-            status=(
-                await self._endpoint.device.application.request(
-                    self._endpoint.device,
-                    XBEE_PROFILE_ID,
-                    XBEE_DATA_CLUSTER,
-                    XBEE_DATA_ENDPOINT,
-                    XBEE_DATA_ENDPOINT,
-                    self._endpoint.device.application.get_sequence(),
-                    data,
-                    expect_reply=False,
-                )
-            )[0],
+            status=await self.send_frame(BinaryString(data).serialize()),
         )
 
+    async def send_frame(self, data: bytes):
+        """Send serial data in a single frame, return the status."""
+        return (
+            await self._endpoint.device.application.request(
+                self._endpoint.device,
+                XBEE_PROFILE_ID,
+                XBEE_DATA_CLUSTER,
+                XBEE_DATA_ENDPOINT,
+                XBEE_DATA_ENDPOINT,
+                self._endpoint.device.application.get_sequence(),
+                data,
+                expect_reply=False,
+            )
+        )[0]
+
     def handle_cluster_request(
         self,
         hdr: foundation.ZCLHeader,
@@ -592,7 +679,10 @@ class XBeeSerialDataCluster(LocalDataCluster):
         dst_addressing: Optional[t.AddrMode] = None,
     ):
         """Handle incoming data."""
-        if hdr.command_id == DATA_IN_CMD:
+        stream = getattr(self._endpoint.device, "serial_stream", None)
+        if hdr.command_id == DATA_IN_CMD and stream is not None:
+            stream.data_received(args.data.serialize())
+        elif hdr.command_id == DATA_IN_CMD:
             self._endpoint.out_clusters[LevelControl.cluster_id].handle_cluster_request(
                 hdr, {"data": args.data}
             )
@@ -616,9 +706,129 @@ class XBeeSerialDataCluster(LocalDataCluster):
     }
 
 
+class XBeeSerialStream:
+    """Byte stream over the serial data cluster of an XBee device.
+
+    Writes are split into frames of at most max_payload bytes, up to
+    max_in_flight of them being sent at a time. drain waits until at most
+    max_queued frames are left to send. Once a frame fails, the frames behind
+    it are dropped and the stream is broken, so the peer never gets data with
+    a hole in it. Received data is buffered in the reader instead of being
+    relayed as a receive_data event per frame.
+    """
+
+    def __init__(
+        self,
+        device: "XBeeCommon",
+        *,
+        max_payload: int = SERIAL_MAX_PAYLOAD,
+        max_in_flight: int = SERIAL_MAX_IN_FLIGHT,
+        max_queued: int = SERIAL_MAX_QUEUED,
+        limit: int = 2**16,
+    ) -> None:
+        """Init."""
+        self._device = device
+        self._cluster = device.endpoints[XBEE_DATA_ENDPOINT].out_clusters[
+            XBEE_DATA_CLUSTER
+        ]
+        self.max_payload = max_payload
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.reader = asyncio.StreamReader(limit=limit)
+        self._frames: collections.deque[bytes] = collections.deque()
+        self._sending: set[asyncio.Task] = set()
+        self._exception: Exception | None = None
+        self._closed = False
+
+        self.bytes_sent = 0
+        self.frames_sent = 0
+        self.bytes_received = 0
+        self.frames_received = 0
+
+    @property
+    def is_closing(self) -> bool:
+        """Return whether the stream is closed."""
+        return self._closed
+
+    def write(self, data: bytes) -> None:
+        """Queue data to be sent, call drain to wait for the queue to go down."""
+        if self._closed:
+            raise ConnectionError("XBee serial stream is closed")
+        if self._exception is not None:
+            raise ConnectionError("XBee serial stream is broken") from self._exception
+
+        view = memoryview(data)
+        for offset in range(0, len(view), self.max_payload):
+            self._frames.append(bytes(view[offset : offset + self.max_payload]))
+        self._send_queued()
+
+    async def drain(self) -> None:
+        """Wait until at most max_queued frames are left, raise if a frame failed."""
+        while (
+            self._exception is None
+            and len(self._frames) + len(self._sending) > self.max_queued
+        ):
+            await asyncio.wait(
+                tuple(self._sending), return_when=asyncio.FIRST_COMPLETED
+            )
+
+        if self._exception is not None:
+            raise self._exception
+
+    def close(self) -> None:
+        """Stop buffering received data, it is relayed as events again."""
+        if self._closed:
+            return
+        self._closed = True
+        self.reader.feed_eof()
+        if self._device.serial_stream is self:
+            self._device.serial_stream = None
+
+    def data_received(self, data: bytes) -> None:
+        """Buffer a received frame."""
+        self.bytes_received += len(data)
+        self.frames_received += 1
+        self.reader.feed_data(data)
+
+    def _send_queued(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._frames and len(self._sending) < self.max_in_flight:
+            task = loop.create_task(self._send_frame(self._frames.popleft()))
+            self._sending.add(task)
+            task.add_done_callback(self._frame_sent)
+
+    def _frame_sent(self, task: asyncio.Task) -> None:
+        self._sending.discard(task)
+        self._send_queued()
+
+    async def _send_frame(self, frame: bytes) -> None:
+        try:
+            status = await self._cluster.send_frame(frame)
+            if status != foundation.Status.SUCCESS:
+                raise RuntimeError(f"Serial data frame not sent: {status}")
+        except Exception as exc:
+            _LOGGER.debug("Failed to send serial data frame: %r", exc)
+            if self._exception is None:
+                self._exception = exc
+            # the frames behind a failed one are dropped, the stream is broken
+            self._frames.clear()
+            return
+
+        self.bytes_sent += len(frame)
+        self.frames_sent += 1
+
+
 class XBeeCommon(CustomDevice):
     """XBee common class."""
 
+    serial_stream: XBeeSerialStream | None = None
+
+    def open_serial_stream(self, **kwargs) -> XBeeSerialStream:
+        """Receive and send the serial data of the device through a stream."""
+        if self.serial_stream is None:
+            self.serial_stream = XBeeSerialStream(self, **kwargs)
+        return self.serial_stream
+
     def remote_at(self, command, *args, **kwargs):
         """Remote at command."""
         return (
@@ -627,6 +837,14 @@ class XBeeCommon(CustomDevice):
             .remote_at_command(command, *args, apply_changes=True, **kwargs)
         )
 
+    def remote_at_many(self, commands, **kwargs):
+        """Remote at commands, several outstanding at a time."""
+        return (
+            self.endpoints[XBEE_AT_ENDPOINT]
+            .out_clusters[XBEE_AT_REQUEST_CLUSTER]
+            .remote_at_many(commands, **kwargs)
+        )
+
     def deserialize(self, endpoint_id, cluster_id, data):
         """Deserialize."""
         if endpoint_id == 0:
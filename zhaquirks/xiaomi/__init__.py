@@ -2,7 +2,8 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable, Iterator
+from collections.abc import Callable
+import dataclasses
 import logging
 import math
 from typing import Any
@@ -110,6 +111,222 @@ XIAOMI_NODE_DESC = NodeDescriptor(
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclasses.dataclass(frozen=True)
+class AqaraAttributeTarget:
+    """Endpoint cluster updated with a value of the Aqara attribute report."""
+
+    ep_attribute: str
+    attribute_id: int | None = None
+    # Cluster method called with the value instead of updating an attribute
+    method: str | None = None
+    scale: Callable[[Any], Any] | None = None
+    # Only some quirks implement the target, skip it for the others
+    optional: bool = False
+    # Debug message logged when an optional target is skipped
+    skipped_message: str | None = None
+
+    def is_implemented(self, endpoint) -> bool:
+        """Return whether the quirk implements the target on `endpoint`."""
+        target = getattr(endpoint, self.ep_attribute, None)
+        if target is None:
+            return False
+        return self.method is None or callable(getattr(target, self.method, None))
+
+    def update(self, cluster: CustomCluster, value: Any) -> None:
+        """Update the target cluster of the endpoint of `cluster`."""
+        if self.optional and not self.is_implemented(cluster.endpoint):
+            if self.skipped_message is not None:
+                _LOGGER.debug(
+                    "%s - %s", cluster.endpoint.device.ieee, self.skipped_message
+                )
+            return
+
+        target = getattr(cluster.endpoint, self.ep_attribute)
+        if self.scale is not None:
+            value = self.scale(value)
+        if self.method is not None:
+            getattr(target, self.method)(value)
+        else:
+            target.update_attribute(self.attribute_id, value)
+
+
+def _consumption(value):
+    return round(value * 1000)
+
+
+# Standard clusters updated for each parsed attribute of the Aqara attribute report
+AQARA_ATTRIBUTE_TARGETS: dict[str, tuple[AqaraAttributeTarget, ...]] = {
+    # many Xiaomi devices report this, but not all quirks implement the
+    # XiaomiPowerConfiguration cluster
+    BATTERY_VOLTAGE_MV: (
+        AqaraAttributeTarget(
+            "power",
+            method="battery_reported",
+            optional=True,
+            skipped_message=(
+                "Xiaomi battery voltage attribute received but"
+                " XiaomiPowerConfiguration not used"
+            ),
+        ),
+    ),
+    TEMPERATURE_MEASUREMENT: (
+        AqaraAttributeTarget(
+            "temperature", TemperatureMeasurement.AttributeDefs.measured_value.id
+        ),
+    ),
+    HUMIDITY_MEASUREMENT: (
+        AqaraAttributeTarget(
+            "humidity", RelativeHumidity.AttributeDefs.measured_value.id
+        ),
+    ),
+    PRESSURE_MEASUREMENT: (
+        AqaraAttributeTarget(
+            "pressure", PressureMeasurement.AttributeDefs.measured_value.id
+        ),
+    ),
+    PRESSURE_MEASUREMENT_PRECISION: (
+        AqaraAttributeTarget(
+            "pressure",
+            PressureMeasurement.AttributeDefs.measured_value.id,
+            scale=lambda value: value / 100,
+        ),
+    ),
+    POWER: (
+        AqaraAttributeTarget(
+            "electrical_measurement",
+            ElectricalMeasurement.AttributeDefs.active_power.id,
+            scale=lambda value: round(value * 10),
+        ),
+    ),
+    CONSUMPTION: (
+        AqaraAttributeTarget(
+            "electrical_measurement",
+            ElectricalMeasurement.AttributeDefs.total_active_power.id,
+            scale=_consumption,
+        ),
+        AqaraAttributeTarget(
+            "smartenergy_metering",
+            Metering.AttributeDefs.current_summ_delivered.id,
+            scale=_consumption,
+        ),
+    ),
+    VOLTAGE: (
+        AqaraAttributeTarget(
+            "electrical_measurement",
+            ElectricalMeasurement.AttributeDefs.rms_voltage.id,
+            scale=lambda value: value * 0.1,
+        ),
+    ),
+    ILLUMINANCE_MEASUREMENT: (
+        AqaraAttributeTarget(
+            "illuminance", IlluminanceMeasurement.AttributeDefs.measured_value.id
+        ),
+    ),
+    TVOC_MEASUREMENT: (AqaraAttributeTarget("voc_level", 0x0000),),
+    TEMPERATURE: (
+        AqaraAttributeTarget(
+            "device_temperature",
+            DeviceTemperature.AttributeDefs.current_temperature.id,
+            scale=lambda value: value * 100,
+            optional=True,
+        ),
+    ),
+    BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE: (
+        AqaraAttributeTarget("power", method="battery_percent_reported"),
+    ),
+    SMOKE: (AqaraAttributeTarget("ias_zone", IasZone.AttributeDefs.zone_status.id),),
+}
+
+# Tags of the Aqara attribute report sent by all devices
+AQARA_COMMON_ATTRIBUTE_NAMES: dict[int, str] = {
+    1: BATTERY_VOLTAGE_MV,
+    3: TEMPERATURE,
+    4: XIAOMI_ATTR_4,
+    5: XIAOMI_ATTR_5,
+    6: XIAOMI_ATTR_6,
+    10: PATH,
+}
+
+_TEMPERATURE_SENSOR_ATTRIBUTE_NAMES = {
+    # Temperature sensors send temperature/humidity/pressure updates through this
+    # cluster instead of the respective clusters
+    100: TEMPERATURE_MEASUREMENT,
+    101: HUMIDITY_MEASUREMENT,
+    102: PRESSURE_MEASUREMENT,
+}
+_PLUG_ATTRIBUTE_NAMES = {149: CONSUMPTION, 150: VOLTAGE, 152: POWER}
+
+# Tags of the Aqara attribute report specific to a model
+_MODEL_ATTRIBUTE_NAMES: dict[str, dict[int, str]] = {
+    **dict.fromkeys(
+        ("lumi.sensor_ht", "lumi.sens", "lumi.sensor_ht.agl02"),
+        _TEMPERATURE_SENSOR_ATTRIBUTE_NAMES,
+    ),
+    "lumi.weather": {
+        **_TEMPERATURE_SENSOR_ATTRIBUTE_NAMES,
+        102: PRESSURE_MEASUREMENT_PRECISION,
+    },
+    "lumi.airmonitor.acn01": {
+        **_TEMPERATURE_SENSOR_ATTRIBUTE_NAMES,
+        102: TVOC_MEASUREMENT,
+    },
+    **dict.fromkeys(
+        (
+            "lumi.plug",
+            "lumi.plug.maus01",
+            "lumi.plug.maeu01",
+            "lumi.plug.mmeu01",
+            "lumi.relay.c2acn01",
+            "lumi.switch.n0agl1",
+            "lumi.switch.n0acn2",
+        ),
+        _PLUG_ATTRIBUTE_NAMES,
+    ),
+    "lumi.sensor_motion.aq2": {11: ILLUMINANCE_MEASUREMENT},
+    "lumi.curtain.acn002": {101: BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE},
+    **dict.fromkeys(
+        ("lumi.motion.agl02", "lumi.motion.acn001"), {101: ILLUMINANCE_MEASUREMENT}
+    ),
+    "lumi.motion.ac02": {
+        101: ILLUMINANCE_MEASUREMENT,
+        105: DETECTION_INTERVAL,
+        106: MOTION_SENSITIVITY,
+    },
+    "lumi.motion.agl04": {
+        102: DETECTION_INTERVAL,
+        105: MOTION_SENSITIVITY,
+        258: DETECTION_INTERVAL,
+        268: MOTION_SENSITIVITY,
+    },
+    "lumi.motion.ac01": {
+        5: POWER_OUTAGE_COUNT,
+        101: PRESENCE_DETECTED,
+        102: PRESENCE_EVENT,
+        103: MONITORING_MODE,
+        105: APPROACH_DISTANCE,
+        268: MOTION_SENSITIVITY,
+        322: PRESENCE_DETECTED,
+        323: PRESENCE_EVENT,
+        324: MONITORING_MODE,
+        326: APPROACH_DISTANCE,
+    },
+    "lumi.sensor_smoke.acn03": {
+        160: SMOKE,
+        161: SMOKE_DENSITY,
+        162: SELF_TEST,
+        163: BUZZER_MANUAL_MUTE,
+        164: HEARTBEAT_INDICATOR,
+        165: LINKAGE_ALARM,
+    },
+}
+
+# Complete tag to attribute name tables, compiled once for each model
+AQARA_ATTRIBUTE_NAMES: dict[str, dict[int, str]] = {
+    model: {**AQARA_COMMON_ATTRIBUTE_NAMES, **names}
+    for model, names in _MODEL_ATTRIBUTE_NAMES.items()
+}
+
+
 class XiaomiCustomDevice(CustomDevice):
     """Custom device representing xiaomi devices."""
 
@@ -127,14 +344,24 @@ class XiaomiQuickInitDevice(XiaomiCustomDevice, QuickInitDevice):
 class XiaomiCluster(CustomCluster):
     """Xiaomi cluster implementation."""
 
-    def _iter_parse_attr_report(
-        self, data: bytes
-    ) -> Iterator[tuple[foundation.Attribute, bytes]]:
-        """Yield all interpretations of the first attribute in a Xiaomi report."""
+    def _parse_attr_report(
+        self,
+        data: bytes,
+        pos: int,
+        tails: dict[int, bytes],
+        offsets: tuple[int, ...] = (0, -1, 1),
+    ) -> list[tuple[foundation.Attribute, int]]:
+        """Return all interpretations of the attribute at `pos` and where each ends.
+
+        `tails` maps positions to the remainder of `data` from there, as returned by
+        earlier deserialization, so the remainder isn't copied for every attribute.
+        """
+
+        if len(data) < pos + 3:
+            raise ValueError("Data is too short to contain an attribute")
 
         # Peek at the attribute report
-        attr_id, data = t.uint16_t.deserialize(data)
-        attr_type, data = t.uint8_t.deserialize(data)
+        attr_id = int.from_bytes(data[pos : pos + 2], "little")
 
         if (
             attr_id
@@ -143,80 +370,130 @@ class XiaomiCluster(CustomCluster):
                 XIAOMI_MIJA_ATTRIBUTE,
                 XIAOMI_AQARA_ATTRIBUTE_E1,
             )
-            or attr_type != 0x42  # "Character String"
+            or data[pos + 2] != 0x42  # "Character String"
         ):
             # Assume other attributes are reported correctly
-            data = attr_id.serialize() + attr_type.serialize() + data
-            attribute, data = foundation.Attribute.deserialize(data)
+            tail = tails.get(pos)
+            if tail is None:
+                tail = tails[pos] = data[pos:]
+            attribute, rest = foundation.Attribute.deserialize(tail)
+            end = len(data) - len(rest)
+            tails[end] = rest
+            return [(attribute, end)]
 
-            yield attribute, data
-            return
+        if len(data) < pos + 4:
+            raise ValueError("Data is too short to contain a string")
 
         # Length of the "string" can be wrong
-        val_len, data = t.uint8_t.deserialize(data)
+        val_len = data[pos + 3]
+        start = pos + 4
+        parsed = []
 
         # Try every offset. Start with 0 to pass unbroken reports through.
-        for offset in (0, -1, 1):
-            fixed_len = val_len + offset
+        for offset in offsets:
+            end = start + val_len + offset
 
-            if len(data) < fixed_len:
+            if end < start or end > len(data):
                 continue
 
-            val, final_data = data[:fixed_len], data[fixed_len:]
-            attr_val = t.LVBytes(val)
-            attr_type = 0x41  # The data type should be "Octet String"
-
-            yield (
-                foundation.Attribute(
-                    attrid=attr_id,
-                    value=foundation.TypeValue(type=attr_type, value=attr_val),
-                ),
-                final_data,
+            parsed.append(
+                (
+                    foundation.Attribute(
+                        attrid=t.uint16_t(attr_id),
+                        value=foundation.TypeValue(
+                            # The data type should be "Octet String"
+                            type=0x41,
+                            value=t.LVBytes(data[start:end]),
+                        ),
+                    ),
+                    end,
+                )
             )
 
+        return parsed
+
     def _interpret_attr_reports(
-        self, data: bytes
-    ) -> Iterable[tuple[foundation.Attribute]]:
-        """Yield all valid interprations of a Xiaomi attribute report."""
+        self, data: bytes | memoryview
+    ) -> list[tuple[foundation.Attribute, ...]]:
+        """Return valid interpretations of a Xiaomi attribute report.
 
-        if not data:
-            yield ()
-            return
+        Only the first interpretation and, if the report is ambiguous, a second one
+        are returned. Interpretations of the remainder of the report are memoized by
+        position, so every attribute is parsed at most once per offset.
+        """
+
+        data = bytes(data)
+        tails = {0: data}
+
+        # Fast path: reports with correct string lengths parse in a single pass
+        attrs = []
+        pos = 0
 
         try:
-            parsed = list(self._iter_parse_attr_report(data))
+            while pos < len(data):
+                parsed = self._parse_attr_report(data, pos, tails, offsets=(0,))
+                if not parsed:
+                    break
+                attr, pos = parsed[0]
+                attrs.append(attr)
         except (KeyError, ValueError):
-            return
+            pass
+        else:
+            if pos == len(data):
+                return [tuple(attrs)]
+
+        memo: dict[int, list[tuple[foundation.Attribute, ...]]] = {len(data): [()]}
+
+        def interpret(pos: int) -> list[tuple[foundation.Attribute, ...]]:
+            if pos in memo:
+                return memo[pos]
 
-        for attr, remaining_data in parsed:
-            for remaining_attrs in self._interpret_attr_reports(remaining_data):
-                yield (attr,) + remaining_attrs
+            try:
+                parsed = self._parse_attr_report(data, pos, tails)
+            except (KeyError, ValueError):
+                parsed = []
+
+            reports = memo[pos] = []
+            for attr, end in parsed:
+                for remaining_attrs in interpret(end):
+                    reports.append((attr,) + remaining_attrs)
+                    if len(reports) == 2:
+                        return reports
+
+            return reports
+
+        return interpret(0)
 
     def deserialize(self, data):
         """Deserialize cluster data."""
-        hdr, data = foundation.ZCLHeader.deserialize(data)
+        hdr, payload = foundation.ZCLHeader.deserialize(data)
 
         # Only handle attribute reports differently
         if (
             hdr.frame_control.frame_type != foundation.FrameType.GLOBAL_COMMAND
             or hdr.command_id != foundation.GeneralCommand.Report_Attributes
         ):
-            return super().deserialize(hdr.serialize() + data)
+            return super().deserialize(data)
 
-        reports = list(self._interpret_attr_reports(data))
+        reports = self._interpret_attr_reports(payload)
 
         if not reports:
-            _LOGGER.warning("Failed to parse Xiaomi attribute report: %r", data)
-            return super().deserialize(hdr.serialize() + data)
+            _LOGGER.warning("Failed to parse Xiaomi attribute report: %r", payload)
+            return super().deserialize(data)
         elif len(reports) > 1:
             _LOGGER.warning(
                 "Xiaomi attribute report has multiple valid interpretations: %r",
                 reports,
             )
 
-        fixed_data = b"".join(attr.serialize() for attr in reports[0])
+        # The fixed up attributes are already parsed, there is no need to serialize
+        # them only for the frame to be parsed again
+        command = foundation.GENERAL_COMMANDS[
+            foundation.GeneralCommand.Report_Attributes
+        ]
+        hdr.frame_control.direction = command.direction
 
-        return super().deserialize(hdr.serialize() + fixed_data)
+        return hdr, command.schema(attribute_reports=list(reports[0]))
 
     def _update_attribute(self, attrid, value):
         if attrid in (XIAOMI_AQARA_ATTRIBUTE, XIAOMI_AQARA_ATTRIBUTE_E1):
@@ -256,172 +533,15 @@ class XiaomiCluster(CustomCluster):
             attrid,
             attributes,
         )
-        if BATTERY_VOLTAGE_MV in attributes:
-            # many Xiaomi devices report this, but not all quirks implement the XiaomiPowerConfiguration cluster,
-            # so we might error out if the method doesn't exist
-            if hasattr(self.endpoint.power, "battery_reported") and callable(
-                self.endpoint.power.battery_reported
-            ):
-                self.endpoint.power.battery_reported(attributes[BATTERY_VOLTAGE_MV])
-            else:
-                # log a debug message if the cluster is not implemented
-                _LOGGER.debug(
-                    "%s - Xiaomi battery voltage attribute received but XiaomiPowerConfiguration not used",
-                    self.endpoint.device.ieee,
-                )
-
-        if TEMPERATURE_MEASUREMENT in attributes:
-            self.endpoint.temperature.update_attribute(
-                TemperatureMeasurement.AttributeDefs.measured_value.id,
-                attributes[TEMPERATURE_MEASUREMENT],
-            )
-
-        if HUMIDITY_MEASUREMENT in attributes:
-            self.endpoint.humidity.update_attribute(
-                RelativeHumidity.AttributeDefs.measured_value.id,
-                attributes[HUMIDITY_MEASUREMENT],
-            )
-
-        if PRESSURE_MEASUREMENT in attributes:
-            self.endpoint.pressure.update_attribute(
-                PressureMeasurement.AttributeDefs.measured_value.id,
-                attributes[PRESSURE_MEASUREMENT],
-            )
-
-        if PRESSURE_MEASUREMENT_PRECISION in attributes:
-            self.endpoint.pressure.update_attribute(
-                PressureMeasurement.AttributeDefs.measured_value.id,
-                attributes[PRESSURE_MEASUREMENT_PRECISION] / 100,
-            )
-
-        if POWER in attributes:
-            self.endpoint.electrical_measurement.update_attribute(
-                ElectricalMeasurement.AttributeDefs.active_power.id,
-                round(attributes[POWER] * 10),
-            )
-
-        if CONSUMPTION in attributes:
-            zcl_consumption = round(attributes[CONSUMPTION] * 1000)
-            self.endpoint.electrical_measurement.update_attribute(
-                ElectricalMeasurement.AttributeDefs.total_active_power.id,
-                zcl_consumption,
-            )
-            self.endpoint.smartenergy_metering.update_attribute(
-                Metering.AttributeDefs.current_summ_delivered.id, zcl_consumption
-            )
-
-        if VOLTAGE in attributes:
-            self.endpoint.electrical_measurement.update_attribute(
-                ElectricalMeasurement.AttributeDefs.rms_voltage.id,
-                attributes[VOLTAGE] * 0.1,
-            )
-
-        if ILLUMINANCE_MEASUREMENT in attributes:
-            self.endpoint.illuminance.update_attribute(
-                IlluminanceMeasurement.AttributeDefs.measured_value.id,
-                attributes[ILLUMINANCE_MEASUREMENT],
-            )
-
-        if TVOC_MEASUREMENT in attributes:
-            self.endpoint.voc_level.update_attribute(
-                0x0000, attributes[TVOC_MEASUREMENT]
-            )
-
-        if TEMPERATURE in attributes:
-            if hasattr(self.endpoint, "device_temperature"):
-                self.endpoint.device_temperature.update_attribute(
-                    DeviceTemperature.AttributeDefs.current_temperature.id,
-                    attributes[TEMPERATURE] * 100,
-                )
-
-        if BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE in attributes:
-            self.endpoint.power.battery_percent_reported(
-                attributes[BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE]
-            )
-
-        if SMOKE in attributes:
-            self.endpoint.ias_zone.update_attribute(
-                IasZone.AttributeDefs.zone_status.id, attributes[SMOKE]
-            )
+        for name, attr_value in attributes.items():
+            for target in AQARA_ATTRIBUTE_TARGETS.get(name, ()):
+                target.update(self, attr_value)
 
     def _parse_aqara_attributes(self, value):
         """Parse non-standard attributes."""
-        attributes = {}
-        attribute_names = {
-            1: BATTERY_VOLTAGE_MV,
-            3: TEMPERATURE,
-            4: XIAOMI_ATTR_4,
-            5: XIAOMI_ATTR_5,
-            6: XIAOMI_ATTR_6,
-            10: PATH,
-        }
-
-        if self.endpoint.device.model in [
-            "lumi.sensor_ht",
-            "lumi.sens",
-            "lumi.weather",
-            "lumi.airmonitor.acn01",
-            "lumi.sensor_ht.agl02",
-        ]:
-            # Temperature sensors send temperature/humidity/pressure updates through this
-            # cluster instead of the respective clusters
-            attribute_names.update(
-                {
-                    100: TEMPERATURE_MEASUREMENT,
-                    101: HUMIDITY_MEASUREMENT,
-                    102: TVOC_MEASUREMENT
-                    if self.endpoint.device.model == "lumi.airmonitor.acn01"
-                    else PRESSURE_MEASUREMENT_PRECISION
-                    if self.endpoint.device.model == "lumi.weather"
-                    else PRESSURE_MEASUREMENT,
-                }
-            )
-        elif self.endpoint.device.model in [
-            "lumi.plug",
-            "lumi.plug.maus01",
-            "lumi.plug.maeu01",
-            "lumi.plug.mmeu01",
-            "lumi.relay.c2acn01",
-            "lumi.switch.n0agl1",
-            "lumi.switch.n0acn2",
-        ]:
-            attribute_names.update({149: CONSUMPTION, 150: VOLTAGE, 152: POWER})
-        elif self.endpoint.device.model == "lumi.sensor_motion.aq2":
-            attribute_names.update({11: ILLUMINANCE_MEASUREMENT})
-        elif self.endpoint.device.model == "lumi.curtain.acn002":
-            attribute_names.update({101: BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE})
-        elif self.endpoint.device.model in [
-            "lumi.motion.agl02",
-            "lumi.motion.ac02",
-            "lumi.motion.acn001",
-        ]:
-            attribute_names.update({101: ILLUMINANCE_MEASUREMENT})
-            if self.endpoint.device.model == "lumi.motion.ac02":
-                attribute_names.update({105: DETECTION_INTERVAL})
-                attribute_names.update({106: MOTION_SENSITIVITY})
-        elif self.endpoint.device.model == "lumi.motion.agl04":
-            attribute_names.update({102: DETECTION_INTERVAL})
-            attribute_names.update({105: MOTION_SENSITIVITY})
-            attribute_names.update({258: DETECTION_INTERVAL})
-            attribute_names.update({268: MOTION_SENSITIVITY})
-        elif self.endpoint.device.model == "lumi.motion.ac01":
-            attribute_names.update({5: POWER_OUTAGE_COUNT})
-            attribute_names.update({101: PRESENCE_DETECTED})
-            attribute_names.update({102: PRESENCE_EVENT})
-            attribute_names.update({103: MONITORING_MODE})
-            attribute_names.update({105: APPROACH_DISTANCE})
-            attribute_names.update({268: MOTION_SENSITIVITY})
-            attribute_names.update({322: PRESENCE_DETECTED})
-            attribute_names.update({323: PRESENCE_EVENT})
-            attribute_names.update({324: MONITORING_MODE})
-            attribute_names.update({326: APPROACH_DISTANCE})
-        elif self.endpoint.device.model == "lumi.sensor_smoke.acn03":
-            attribute_names.update({160: SMOKE})
-            attribute_names.update({161: SMOKE_DENSITY})
-            attribute_names.update({162: SELF_TEST})
-            attribute_names.update({163: BUZZER_MANUAL_MUTE})
-            attribute_names.update({164: HEARTBEAT_INDICATOR})
-            attribute_names.update({165: LINKAGE_ALARM})
+        attribute_names = AQARA_ATTRIBUTE_NAMES.get(
+            self.endpoint.device.model, AQARA_COMMON_ATTRIBUTE_NAMES
+        )
         result = {}
 
         # Some attribute reports end with a stray null byte
@@ -429,15 +549,11 @@ class XiaomiCluster(CustomCluster):
             skey = int(value[0])
             svalue, value = foundation.TypeValue.deserialize(value[1:])
             result[skey] = svalue.value
-        for item, val in result.items():
-            key = (
-                attribute_names[item]
-                if item in attribute_names
-                else "0xff01-" + str(item)
-            )
-            attributes[key] = val
 
-        return attributes
+        return {
+            attribute_names.get(item) or "0xff01-" + str(item): val
+            for item, val in result.items()
+        }
 
     def _parse_mija_attributes(self, value):
         """Parse non-standard attributes."""
@@ -730,6 +846,11 @@ class OnOffCluster(OnOff, CustomCluster):
         )
 
 
+# ZCL frame control bits of a global command and its manufacturer code
+_ZCL_FRAME_TYPE_MASK = 0b00000011
+_ZCL_MANUFACTURER_SPECIFIC = 0b00000100
+
+
 def handle_quick_init(
     sender: zigpy.device.Device,
     profile: int,
@@ -739,7 +860,19 @@ def handle_quick_init(
     message: bytes,
 ) -> bool | None:
     """Handle message from an uninitialized device which could be a xiaomi."""
-    if src_ep == 0:
+    if src_ep == 0 or cluster != Basic.cluster_id or not message:
+        return
+
+    # only a global Report_Attributes command can carry the model, check the
+    # header bytes before parsing anything
+    frame_control = message[0]
+    if frame_control & _ZCL_FRAME_TYPE_MASK:
+        return
+    command_offset = 4 if frame_control & _ZCL_MANUFACTURER_SPECIFIC else 2
+    if (
+        len(message) <= command_offset
+        or message[command_offset] != foundation.GeneralCommand.Report_Attributes
+    ):
         return
 
     hdr, data = foundation.ZCLHeader.deserialize(message)
@@ -751,12 +884,6 @@ def handle_quick_init(
         hdr,
         data,
     )
-    if hdr.frame_control.is_cluster:
-        return
-
-    if hdr.command_id not in foundation.COMMANDS:
-        sender.debug("Unknown ZCL global command: %s", hdr.command_id)
-        return
 
     try:
         params, data = foundation.COMMANDS[hdr.command_id].schema.deserialize(data)
@@ -766,12 +893,6 @@ def handle_quick_init(
 
     sender.debug("Uninitialized device command '%s' params: %s", hdr.command_id, params)
 
-    if (
-        hdr.command_id != foundation.GeneralCommand.Report_Attributes
-        or cluster != 0x0000
-    ):
-        return
-
     for attr_rec in params.attribute_reports:
         # model_name
         if attr_rec.attrid == 0x0005:
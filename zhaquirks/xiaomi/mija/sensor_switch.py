@@ -1,7 +1,5 @@
 """Xiaomi mija button device."""
 
-import asyncio
-
 from zigpy.profiles import zha
 from zigpy.zcl.clusters.general import (
     Basic,
@@ -13,7 +11,7 @@ from zigpy.zcl.clusters.general import (
     Scenes,
 )
 
-from zhaquirks import CustomCluster
+from zhaquirks import CustomCluster, MultiPressDetector
 from zhaquirks.const import (
     ARGS,
     BUTTON,
@@ -79,8 +77,11 @@ class MijaButton(XiaomiQuickInitDevice):
         def __init__(self, *args, **kwargs):
             """Init."""
             self._current_state = {}
-            self._loop = asyncio.get_running_loop()
-            self._timer_handle = None
+            self._presses = MultiPressDetector(
+                on_long_press=self._hold_timeout,
+                multi_press_window=0,
+                long_press_delay=self.hold_duration,
+            )
             super().__init__(*args, **kwargs)
 
         def _update_attribute(self, attrid, value):
@@ -91,14 +92,8 @@ class MijaButton(XiaomiQuickInitDevice):
                 value = not value
 
                 if value:
-                    if self._timer_handle:
-                        self._timer_handle.cancel()
-                    self._timer_handle = self._loop.call_later(
-                        self.hold_duration, self._hold_timeout
-                    )
-                elif self._timer_handle:
-                    self._timer_handle.cancel()
-                    self._timer_handle = None
+                    self._presses.down(attrid)
+                elif self._presses.up(attrid):
                     click_type = COMMAND_SINGLE
                 else:
                     self.listener_event(ZHA_SEND_EVENT, COMMAND_RELEASE, [])
@@ -114,10 +109,9 @@ class MijaButton(XiaomiQuickInitDevice):
 
             super()._update_attribute(attrid, value)
 
-        def _hold_timeout(self):
+        def _hold_timeout(self, button):
             """Handle hold timeout."""
 
-            self._timer_handle = None
             self.listener_event(ZHA_SEND_EVENT, COMMAND_HOLD, [])
 
     signature = {